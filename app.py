@@ -1,42 +1,63 @@
-import streamlit as st
-import pandas as pd
+import hashlib
+import io
 import os
+import tempfile
+import zipfile
+import streamlit as st
 from datetime import datetime, time
-import requests
-from bs4 import BeautifulSoup
-import matplotlib.pyplot as plt
+from time import perf_counter
+
+# Data, scraping and stats live in the headless maradonners package; this
+# file is only the Streamlit front end (see `python -m maradonners --help`).
+from maradonners import cache, core, instrument
+from maradonners.config import FORM_WINDOW, INSTRUMENT_LOG_FILE, METRICS_PORT
+from maradonners.core import (
+    compute_league_table, compute_partnerships, compute_team_analytics, heatmap_chart, load_league_results,
+    load_league_standings,
+    load_local_data, load_match_index, load_opponent_index, load_player_stats, load_ratings, load_roster,
+    load_standings_history,
+    load_team_metrics, render_charts, save_match, season_charts, simulate_season, squad_names, standings_charts,
+    strength_of_schedule,
+)
+from maradonners.ratings import ratings_table
+from maradonners.league_table import compare_tables, parse_scores, what_if
+from maradonners.roster import DEFAULT_TEAM_ID, RosterError, current_season, season_labels
+from maradonners.stats_engine import player_stats_table
+from maradonners.table_view import PAGE_SIZES, highlight_team, match_filter, paginate, results_filter
 
 # --------------------------------------------------------------------
-#                         FILE CONFIG
+#                 CREATE LOCAL STORE IF NEEDED
 # --------------------------------------------------------------------
-LOCAL_DATA_FILE = "maradonners_fc_results.csv"
-LEAGUE_STANDINGS_FILE = "league_standings.csv"
-LEAGUE_MATCH_RESULTS_FILE = "match_results.csv"
+@st.cache_resource
+def initialize_store():
+    """Create / migrate the match database once per server process, not on every rerun."""
+    core.initialize_store()
 
-# Squad
-SQUAD = [
-    "AJ", "Himza", "Bir", "Bhavs", "Speirs", "Jakes",
-    "Viv", "Minal", "Deelan", "Rush B", "Rush N", "Joe",
-    "Filler"
-]
+initialize_store()
 
 # --------------------------------------------------------------------
-#                 CREATE LOCAL CSV IF NEEDED
+#                       INSTRUMENTATION
 # --------------------------------------------------------------------
-def initialize_csv():
-    """Ensures we have the columns in the exact format you want."""
-    if not os.path.exists(LOCAL_DATA_FILE):
-        columns = [
-            "Date", "Time", "Pitch", "Opposition",
-            "Goals Scored", "Goals Conceded", "Own Goals",
-            "Players", "Scorers", "Assists",
-            "Blue Cards", "Yellow Cards", "Red Cards",
-            "Missed"
-        ]
-        df = pd.DataFrame(columns=columns)
-        df.to_csv(LOCAL_DATA_FILE, index=False)
-
-initialize_csv()
+@st.cache_resource
+def start_instrumentation():
+    """
+    JSON span log and Prometheus endpoint, once per server process (see
+    config). Returns the metrics server, or None if it is off or the port
+    is taken (another Streamlit process already serves it).
+    """
+    if INSTRUMENT_LOG_FILE:
+        instrument.log_to(INSTRUMENT_LOG_FILE)
+    if METRICS_PORT:
+        try:
+            return instrument.serve_metrics(METRICS_PORT)
+        except OSError:
+            return None
+    return None
+
+metrics_server = start_instrumentation()
+# Spans finished after this mark (in this thread) belong to this rerun
+rerun_mark = instrument.mark()
+rerun_started = perf_counter()
 
 # --------------------------------------------------------------------
 #                      SIMPLE LOGIN SYSTEM
@@ -82,265 +103,30 @@ if st.sidebar.button("🚪 Logout"):
     st.session_state["user_role"] = None
     st.rerun()  # Refresh app to enforce logout
 
-# --------------------------------------------------------------------
-#               LOADING AND SAVING LOCAL MATCH DATA
-# --------------------------------------------------------------------
-def load_local_data():
-    if os.path.exists(LOCAL_DATA_FILE):
-        # Important: the CSV now has 'Goals Scored', 'Goals Conceded', 'Own Goals'
-        return pd.read_csv(
-            LOCAL_DATA_FILE,
-            dtype={"Goals Scored": "Int64", "Goals Conceded": "Int64", "Own Goals": "object"}  # Own Goals are stored as strings (player (1))
-        ).fillna("")
-    return pd.DataFrame(columns=[
-        "Date", "Time", "Pitch", "Opposition", "Goals Scored", "Goals Conceded", "Own Goals",
-        "Players", "Scorers", "Assists", "Blue Cards", "Yellow Cards", "Red Cards", "Missed"
-    ])
-
-def save_local_data(df):
-    """Save the local data to CSV, preserving column order."""
-    df.to_csv(LOCAL_DATA_FILE, index=False)
-
-# --------------------------------------------------------------------
-#           EXACT SCRAPING CODE (YOUR VERSION)
-# --------------------------------------------------------------------
-def scrape_league_data():
-    """
-    Scrapes league standings & results from the given URL,
-    saving to league_standings.csv & match_results.csv.
-    """
-    url = (
-        "https://discoverysoccerpark.spawtz.com/Leagues/Standings"
-        "?SportId=0&VenueId=2&LeagueId=34&SeasonId=842&DivisionId=3430"
+# 🔹 Team picker (offered once a second team is added under 👥 Squad & roster)
+teams = load_roster().teams
+if len(teams) > 1:
+    st.sidebar.selectbox("👥 Team", list(teams), format_func=teams.get, key="team_id")
+
+# 🔹 Timings, counters & cache hits (Manager only; filled in at the end of the script)
+if st.session_state["user_role"] == "Manager":
+    diagnostics = st.sidebar.expander("🩺 Diagnostics")
+    diagnostics.toggle(
+        "Record timings", value=instrument.enabled(), key="instrument_on",
+        on_change=lambda: instrument.enable(st.session_state["instrument_on"]),
     )
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-            " AppleWebKit/537.36 (KHTML, like Gecko)"
-            " Chrome/132.0.0.0 Safari/537.36"
-        )
-    }
-
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # ---- League Standings ----
-    standings_table = soup.find("table", class_="STTable")
-    standings_data = []
-    standings_df = pd.DataFrame()  # fallback if no table found
-
-    if standings_table:
-        # Exclude the first column
-        headers_row = [th.text.strip() for th in standings_table.find_all("td")[1:13]]
-        for row in standings_table.find_all("tr")[1:]:
-            cols = row.find_all("td")[1:13]
-            if cols:
-                standings_data.append([col.text.strip() for col in cols])
-
-        standings_df = pd.DataFrame(standings_data, columns=headers_row)
-
-        # Extract just the numeric part from "Pts"
-        if "Pts" in standings_df.columns:
-            standings_df["Pts"] = (
-                standings_df["Pts"].str.extract(r"(\d+)").astype(int)
-            )
-
-        standings_df.to_csv(LEAGUE_STANDINGS_FILE, index=False)
-
-    # ---- Match Results ----
-    results_tables = soup.find_all("table", class_="FTable")  # Find ALL tables
-    results_data = []
-
-    if results_tables:
-        for table in results_tables:  # Iterate through all tables
-            rows = table.find_all("tr")
-            match_date = ""
-
-            for row in rows:
-                if "FHeader" in row.get("class", []):
-                    match_date = row.text.strip()  # Store match date
-                cols = row.find_all("td")
-                if len(cols) == 5:
-                    # Extract match details: Date, Time, Pitch, Home Team, Score, Away Team
-                    match_info = [match_date] + [col.text.strip() for col in cols]
-                    results_data.append(match_info)
-
-        # Convert to DataFrame
-        results_headers = ["Date", "Time", "Pitch", "Home Team", "Score", "Away Team"]
-        results_df = pd.DataFrame(results_data, columns=results_headers)
-
-        # Remove "LIVE" from score text
-        results_df["Score"] = results_df["Score"].str.replace("LIVE", "").str.strip()
-
-        # Save to CSV
-        results_df.to_csv(LEAGUE_MATCH_RESULTS_FILE, index=False)
-
-    return standings_df, results_df
-
-def load_league_standings():
-    if os.path.exists(LEAGUE_STANDINGS_FILE):
-        return pd.read_csv(LEAGUE_STANDINGS_FILE)
-    return pd.DataFrame()
-
-def load_league_results():
-    if os.path.exists(LEAGUE_MATCH_RESULTS_FILE):
-        return pd.read_csv(LEAGUE_MATCH_RESULTS_FILE)
-    return pd.DataFrame()
 
 # --------------------------------------------------------------------
-#                        STATS FUNCTIONS
+#                     LEAGUE SCRAPING
 # --------------------------------------------------------------------
-def compute_local_stats(df):
-    """
-    Build stats from local data:
-    - Appearances, Goals, Assists, Missed Games, Own Goals, Blue Cards, Yellow Cards, Red Cards
-    """
-    stats = {
-        p: {
-            "Appearances": 0,
-            "Goals": 0,
-            "Own Goals": 0,
-            "Assists": 0,
-            "Missed Games": 0,
-            "Blue Cards": 0,
-            "Yellow Cards": 0,
-            "Red Cards": 0
-        }
-        for p in SQUAD
-    }
-
-    for _, row in df.iterrows():
-        # Players who played
-        players = row["Players"].split(", ") if row["Players"] else []
-        # Players who missed
-        missed_list = row["Missed"].split(", ") if "Missed" in df.columns and row["Missed"] else []
-        # Scorers
-        scorers_list = row["Scorers"].split(", ") if row["Scorers"] else []
-        # Own Goals
-        own_goals_list = row["Own Goals"].split(", ") if row["Own Goals"] else []
-        # Assists
-        assists_list = row["Assists"].split(", ") if row["Assists"] else []
-        
-        # Cards
-        blue_cards_list = row["Blue Cards"].split(", ") if row["Blue Cards"] else []
-        yellow_cards_list = row["Yellow Cards"].split(", ") if row["Yellow Cards"] else []
-        red_cards_list = row["Red Cards"].split(", ") if row["Red Cards"] else []
-
-        # Count Appearances & Missed Games
-        for p in players:
-            stats[p]["Appearances"] += 1
-        for p in missed_list:
-            stats[p]["Missed Games"] += 1
-
-        # Count Goals
-        for s in scorers_list:
-            try:
-                name, val = s.rsplit(" (", 1)
-                stats[name.strip()]["Goals"] += int(val.rstrip(")"))
-            except:
-                pass
-
-        # Count Own Goals
-        for og in own_goals_list:
-            try:
-                name, val = og.rsplit(" (", 1)
-                stats[name.strip()]["Own Goals"] += int(val.rstrip(")"))
-            except:
-                pass
-
-        # Count Assists
-        for a in assists_list:
-            try:
-                name, val = a.rsplit(" (", 1)
-                stats[name.strip()]["Assists"] += int(val.rstrip(")"))
-            except:
-                pass
-
-        # Count Cards
-        for bc in blue_cards_list:
-            try:
-                name, val = bc.rsplit(" (", 1)
-                stats[name.strip()]["Blue Cards"] += int(val.rstrip(")"))
-            except:
-                pass
-
-        for yc in yellow_cards_list:
-            try:
-                name, val = yc.rsplit(" (", 1)
-                stats[name.strip()]["Yellow Cards"] += int(val.rstrip(")"))
-            except:
-                pass
-
-        for rc in red_cards_list:
-            try:
-                name, val = rc.rsplit(" (", 1)
-                stats[name.strip()]["Red Cards"] += int(val.rstrip(")"))
-            except:
-                pass
-
-    # Convert to DataFrame
-    stats_df = pd.DataFrame.from_dict(stats, orient="index").reset_index()
-    stats_df.rename(columns={"index": "Player"}, inplace=True)
-
-    return stats_df
-
-
-
-def compute_team_metrics(df):
+@st.cache_resource
+def get_league_refresher():
     """
-    Compute team performance metrics from match data.
+    One background refresher per server process. It scrapes every
+    LEAGUE_REFRESH_INTERVAL seconds and rewrites league_standings.csv &
+    match_results.csv only when the parsed tables changed.
     """
-    if df.empty:
-        return {
-            "Total Games": 0,
-            "Total Goals Scored": 0,
-            "Total Goals Conceded": 0,
-            "Total Points": 0,
-            "Avg Goals Scored": 0,
-            "Avg Goals Conceded": 0,
-            "Win Rate": 0,
-            "Clean Sheets": 0
-        }
-
-    # Extract data safely
-    total_games = df.shape[0]
-    # Convert columns to numeric if needed
-    df["Goals Scored"] = pd.to_numeric(df["Goals Scored"], errors="coerce").fillna(0)
-    df["Goals Conceded"] = pd.to_numeric(df["Goals Conceded"], errors="coerce").fillna(0)
-
-    total_goals_scored = df["Goals Scored"].sum()
-    total_goals_conceded = df["Goals Conceded"].sum()
-
-    # Calculate points
-    total_points = sum(
-        3 if row["Goals Scored"] > row["Goals Conceded"] else
-        1 if row["Goals Scored"] == row["Goals Conceded"] else 0
-        for _, row in df.iterrows()
-    )
-
-    # Averages & Win Rate
-    avg_goals_scored = total_goals_scored / total_games if total_games > 0 else 0
-    avg_goals_conceded = total_goals_conceded / total_games if total_games > 0 else 0
-    win_rate = (
-        sum(1 for _, row in df.iterrows() if row["Goals Scored"] > row["Goals Conceded"])
-        / total_games
-        if total_games > 0
-        else 0
-    )
-
-    # Count clean sheets (Games where Goals Conceded = 0)
-    clean_sheets = sum(1 for _, row in df.iterrows() if row["Goals Conceded"] == 0)
-
-    return {
-        "Total Games": int(total_games),
-        "Total Goals Scored": int(total_goals_scored),
-        "Total Goals Conceded": int(total_goals_conceded),
-        "Total Points": int(total_points),
-        "Avg Goals Scored": round(avg_goals_scored, 2),
-        "Avg Goals Conceded": round(avg_goals_conceded, 2),
-        "Win Rate": round(win_rate * 100, 2),  # Convert to %
-        "Clean Sheets": clean_sheets
-    }
+    return core.make_league_refresher().start()
 
 # --------------------------------------------------------------------
 #                           STREAMLIT UI
@@ -348,11 +134,48 @@ def compute_team_metrics(df):
 st.title("Maradonners FC")
 st.subheader("👟💨⚽💨🥅")
 
-tab1, tab2, tab3 = st.tabs(["📋 Enter Match Results", "📊 Stats & Metrics", "🏆 League"])
+# Each tab is a fragment: a widget change inside one tab re-runs only that
+# tab instead of the whole script (st.tabs alone only hides tabs client-side).
+def record_render_time(section, started):
+    """Keep the last render time of each section (ms) for benchmarking."""
+    st.session_state.setdefault("render_ms", {})[section] = round((perf_counter() - started) * 1000, 2)
+    instrument.record(f"render.{section}", perf_counter() - started)
+
+def paged_dataframe(df, mask, key, sort_by, descending=False, highlight=(), **dataframe_kwargs):
+    """
+    Sort / page controls and one page of `df` (rows where mask is True).
+    Only that page is sent to the browser; `highlight` columns get 🔥
+    markers on the page only.
+    """
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
+    columns = list(df.columns)
+    sort_by = col1.selectbox("Sort by", columns, index=columns.index(sort_by), key=f"{key}_sort")
+    descending = col2.toggle("Newest / highest first", value=descending, key=f"{key}_desc")
+    page_size = col3.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_size")
+    pages = max(1, -(-int(mask.sum()) // page_size))
+    # Keep the page in range when a filter shrinks the result
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = col4.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key=f"{key}_page")
+
+    view, info = paginate(df, mask, sort_by, descending, page, page_size)
+    if highlight:
+        view = view.assign(**{c: highlight_team(view[c]) for c in highlight if c in view.columns})
+    st.dataframe(view, **dataframe_kwargs)
+    filtered = f" (filtered from {len(df)})" if info.total < len(df) else ""
+    st.caption(f"Rows {info.first}–{info.last} of {info.total}{filtered}")
 
 # ================= TAB 1: ENTER MATCH RESULTS ==================== #
-with tab1:
+@st.fragment
+def render_match_entry():
+    started = perf_counter()
     st.header("📋 Enter Match Results")
+    team_id = st.session_state.get("team_id", DEFAULT_TEAM_ID)
+    roster = load_roster()
+
+    # Message from the save that triggered the last full rerun
+    if "flash" in st.session_state:
+        st.success(st.session_state.pop("flash"))
 
     colA, colB, colC = st.columns(3)
     with colA:
@@ -362,20 +185,33 @@ with tab1:
     with colC:
         pitch = st.text_input("Pitch", "Pitch 4")
 
-    opposition = st.text_input("Opposition", "")
-    score_input = st.text_input("🏆 Final Score (Maradonners 🆚 Opposition) e.g., 4 - 3",
+    # Autocomplete from the scouting index; a team it does not know can still be typed in
+    scouting = load_opponent_index(team_id)
+    opposition = st.selectbox(
+        "Opposition", scouting.options, index=None, accept_new_options=True,
+        placeholder="Start typing a team, or enter a new one", key=f"opposition_{team_id}",
+    ) or ""
+    if opposition and scouting.known(opposition):
+        render_scouting(scouting, opposition)
+
+    score_input = st.text_input(f"🏆 Final Score ({roster.teams[team_id]} 🆚 Opposition) e.g., 4 - 3",
                                 placeholder="Enter score format: 4 - 3")
 
     st.markdown("---")
         
-    # Player selection
+    # Player selection (the squad of the match date's season, by player ID)
     st.subheader("Players (Max 8)")
-    selected_players = st.multiselect(
-        "Select players", SQUAD, default=SQUAD[:8], max_selections=8
+    squad = roster.squad(team_id, season_labels([match_date])[0])
+    if not squad:
+        st.info("ℹ️ This season's squad is empty. A Manager can add players under 👥 Squad & roster.")
+    selected_ids = st.multiselect(
+        "Select players", squad, default=squad[:8], max_selections=8, format_func=roster.name,
+        key=f"players_{team_id}",
     )
+    selected_players = roster.names(selected_ids)
 
     # Missed Players
-    missed_players = list(set(SQUAD) - set(selected_players))
+    missed_players = roster.names([p for p in squad if p not in selected_ids])
 
     st.subheader("📊 Player Contributions")
 
@@ -477,24 +313,172 @@ with tab1:
                     "Missed": ", ".join(missed_players),
                 }
 
-                df_local = load_local_data()
-                df_local = pd.concat([df_local, pd.DataFrame([new_row])], ignore_index=True)
-                save_local_data(df_local)
-                st.success("✅ Match result saved successfully!")
+                try:
+                    save_match(new_row, team_id)
+                except RosterError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    # Full rerun so the Stats tab picks up the new match
+                    st.session_state["flash"] = "✅ Match result saved successfully!"
+                    st.rerun()
+
+    # ====================== BULK IMPORT ====================== #
+    with st.expander("📥 Bulk import past matches"):
+        st.caption(
+            "CSV in the results-file layout (or with a 'Score' column like '4 - 3'), or JSONL. "
+            "Rows are checked like the form above; rejected rows come back with the reason."
+        )
+        upload = st.file_uploader("Backfill file", type=["csv", "jsonl", "ndjson"])
+        if upload is not None and st.button("📥 Import"):
+            data = upload.getvalue()
+            # Named by content, so importing the same file twice is a no-op
+            suffix = os.path.splitext(upload.name)[1]
+            path = os.path.join(tempfile.gettempdir(), f"maradonners-{hashlib.sha1(data).hexdigest()}{suffix}")
+            with open(path, "wb") as f:
+                f.write(data)
+            summary = core.import_matches(path, team_id=team_id)
+            if not summary.read and summary.skipped:
+                st.info("ℹ️ This file was already imported.")
+            else:
+                st.success(f"✅ Imported {summary.imported} of {summary.read} matches.")
+            if summary.report_path and summary.rejected:
+                st.warning(f"⚠️ {summary.rejected} row(s) rejected.")
+                with open(summary.report_path, "rb") as f:
+                    st.download_button("⬇️ Rejected rows", f.read(), file_name="rejected_rows.csv", mime="text/csv")
+            # Kept past the rerun the Add button below triggers
+            st.session_state["import_unknown"] = summary.unknown_players
+
+        unknown = st.session_state.get("import_unknown")
+        if unknown:
+            st.warning(
+                f"👤 Not in the roster: {', '.join(unknown)}. Add them (or, for another spelling of a "
+                "player, an alias under 👥 Squad & roster), then import the rejected rows."
+            )
+            is_manager = st.session_state["user_role"] == "Manager"
+            if is_manager and st.button(f"➕ Add {len(unknown)} player(s) to this season's squad"):
+                try:
+                    for name in unknown:
+                        core.add_player(name, (), team_id, current_season())
+                except RosterError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    del st.session_state["import_unknown"]
+                    st.session_state["flash"] = f"✅ Added {len(unknown)} player(s). Import the rejected rows now."
+                    st.rerun()
+
+    # ====================== SQUAD & ROSTER (Manager) ====================== #
+    if st.session_state["user_role"] == "Manager":
+        with st.expander("👥 Squad & roster"):
+            render_roster_editor(roster, team_id)
+
+    record_render_time("Enter Match Results", started)
+
+
+def render_scouting(scouting, opposition):
+    """Head-to-head, recent form and upcoming fixtures of the opponent picked in the form."""
+    name = scouting.name(opposition)
+    with st.expander(f"🔎 Scouting: {name}", expanded=True):
+        record = scouting.record(name)
+        form, points = scouting.form(name, FORM_WINDOW)
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🤝 Head to head (W-D-L)", f"{record['Won']}-{record['Drawn']}-{record['Lost']}")
+        col2.metric("⚽ Goals for - against", f"{record['For']} - {record['Against']}")
+        col3.metric(f"📋 Their form (last {FORM_WINDOW})", form or "N/A", f"{points} pts", delta_color="off")
+
+        dates = {"Date": st.column_config.DateColumn(format="ddd D MMM YYYY")}
+        for title, table in (
+            ("**Our meetings**", scouting.head_to_head(name)),
+            ("**Their recent league results** (Result is theirs)", scouting.league_results(name, FORM_WINDOW)),
+            ("**Upcoming**", scouting.upcoming(name)),
+        ):
+            if not table.empty:
+                st.markdown(title)
+                st.dataframe(table, use_container_width=True, hide_index=True, column_config=dates)
+
+
+def render_roster_editor(roster, team_id):
+    """Season squads, new players, aliases and teams; every change reruns the app."""
+    def apply(change, message, *args):
+        try:
+            change(*args)
+        except RosterError as e:
+            st.error(f"❌ {e}")
+        else:
+            st.session_state["flash"] = message
+            st.rerun()
+
+    seasons = sorted(set(roster.seasons(team_id)) | {current_season()})
+    season = st.selectbox("Season", seasons, index=len(seasons) - 1, key="roster_season")
+    squad = roster.squad(team_id, season)
+    picked = st.multiselect(
+        f"{roster.teams[team_id]} squad", list(roster.players), default=squad, format_func=roster.name,
+        key=f"roster_squad_{team_id}_{season}",
+    )
+    if st.button("💾 Save squad"):
+        def change():
+            core.add_to_squad(team_id, season, picked)
+            core.remove_from_squad(team_id, season, [p for p in squad if p not in picked])
+        apply(change, f"✅ {season} squad saved ({len(picked)} players).")
+
+    st.markdown("**New player**")
+    col1, col2 = st.columns(2)
+    name = col1.text_input("Name", key="roster_new_name")
+    aliases = col2.text_input("Also known as (comma separated)", key="roster_new_aliases")
+    if st.button("➕ Add to squad"):
+        apply(core.add_player, f"✅ {name.strip()} added to the {season} squad.",
+              name, [a for a in aliases.split(",") if a.strip()], team_id, season)
+
+    st.markdown("**Alias** (another spelling that should count as the same player)")
+    col1, col2 = st.columns(2)
+    player_id = col1.selectbox("Player", list(roster.players), format_func=roster.name, key="roster_alias_player")
+    alias = col2.text_input("Alias", key="roster_alias")
+    if st.button("🔗 Add alias") and player_id is not None:
+        apply(core.add_alias, f"✅ '{alias.strip()}' now counts as {roster.players[player_id]}.", player_id, alias)
+
+    st.markdown("**New team**")
+    team_name = st.text_input("Team name", key="roster_team")
+    if st.button("➕ Add team"):
+        apply(core.add_team, f"✅ Team {team_name.strip()} added; pick it in the sidebar.", team_name)
 
 # ================= TAB 2: STATS & METRICS ==================== #
-# ================= TAB 2: STATS & METRICS ==================== #
-with tab2:
+@st.fragment
+def render_stats():
+    started = perf_counter()
     st.header("📊 Stats & Metrics")
+    team_id = st.session_state.get("team_id", DEFAULT_TEAM_ID)
+    roster = load_roster()
 
-    df_local = load_local_data()
+    df_local = load_local_data(team_id)
 
     if df_local.empty:
         st.warning("⚠️ No data found. Please add match results first.")
     else:
+        # ========= PERIOD SELECTOR =========
+        index = load_match_index(team_id)
+        periods = ["All time"] + list(reversed(index.seasons)) + ["Custom range"]
+        period = st.selectbox("📆 Period", periods)
+
+        start = end = None
+        season = period if period in index.seasons else None  # squad: that season's, else everyone's
+        if period == "Custom range" and index.seasons:
+            first = index.season_range(next(iter(index.seasons)))[0].date()
+            last = index.season_range(list(index.seasons)[-1])[1].date()
+            picked = st.date_input("Date range", value=(first, last), format="DD/MM/YYYY")
+            # Only one end is set while the user is still picking
+            start, end = (picked[0], picked[-1]) if picked else (first, last)
+        elif period in index.seasons:
+            start, end = index.season_range(period)
+
         # ========= COMPUTE METRICS =========
-        tm = compute_team_metrics(df_local)
-        ps_df = compute_local_stats(df_local)
+        if start is None and end is None:
+            # Read from the aggregates maintained on every save (no history scan)
+            tm = load_team_metrics(team_id)
+            ps_df = load_player_stats(team_id)
+        else:
+            # Binary-search slice of the date index (see match_index)
+            tm = index.team_metrics(start, end)
+            ps_df = index.player_stats(roster.squad(team_id, season), start, end, names=roster.players)
+            df_local = df_local.iloc[index.history_rows(start, end)].reset_index(drop=True)
 
         # ========= FIND MULTIPLE TOP SCORERS & MOST APPEARANCES =========
         top_goal_count = ps_df["Goals"].max()
@@ -537,6 +521,31 @@ with tab2:
         with col8:
             st.metric("🧤 Clean Sheets", tm["Clean Sheets"])
 
+        # ========= FORM & STREAKS =========
+        ta = compute_team_analytics(df_local)
+        streaks = ta["streaks"]
+
+        st.subheader("📈 Form & Streaks")
+        col_f1, col_f2, col_f3, col_f4 = st.columns(4)
+        with col_f1:
+            st.metric(f"📋 Form (last {FORM_WINDOW})", ta["form"] or "N/A", f"{ta['form_points']} pts", delta_color="off")
+        with col_f2:
+            st.metric("🔥 Longest Win Streak", streaks["Longest Win Streak"])
+        with col_f3:
+            st.metric("🛡️ Longest Unbeaten Run", streaks["Longest Unbeaten Streak"])
+        with col_f4:
+            st.metric("🥶 Longest Scoreless Run", streaks["Longest Scoreless Streak"])
+
+        # Drawn on the server and cached by data content (see charts): a rerun
+        # that did not change the matches sends the same images again
+        pngs = render_charts(season_charts(df_local))
+        st.image(pngs["points"], use_container_width=True)
+        col_c1, col_c2 = st.columns(2)
+        with col_c1:
+            st.image(pngs["goals"], use_container_width=True)
+        with col_c2:
+            st.image(pngs["player_goals"], use_container_width=True)
+
         # Already calculated:
         #   top_scorers
         #   most_appearances
@@ -591,84 +600,97 @@ with tab2:
         # ============ PLAYER STATS (Detailed) ============
         st.subheader("🏅 Player Statistics")
 
-        # Initialize a dictionary so *every* SQUAD member appears even if zero stats
-        squad_stats = {
-            p: {
-                "Appearances": 0,
-                "Missed Games": 0,
-                "Goals": 0,
-                "Own Goals": 0,
-                "Assists": 0,
-                "Blue Cards": 0,
-                "Yellow Cards": 0,
-                "Red Cards": 0
-            }
-            for p in SQUAD
-        }
-
-        # Merge stats from ps_df into squad_stats
-        # ps_df columns now:
-        # [Player, Appearances, Goals, Own Goals, Assists, Missed Games,
-        #  Blue Cards, Yellow Cards, Red Cards]
-        for idx, row in ps_df.iterrows():
-            p = row["Player"]
-            if p in squad_stats:
-                squad_stats[p]["Appearances"] = row["Appearances"]
-                squad_stats[p]["Missed Games"] = row["Missed Games"]
-                squad_stats[p]["Goals"] = row["Goals"]
-                squad_stats[p]["Own Goals"] = row["Own Goals"]
-                squad_stats[p]["Assists"] = row["Assists"]
-                squad_stats[p]["Blue Cards"] = row["Blue Cards"]
-                squad_stats[p]["Yellow Cards"] = row["Yellow Cards"]
-                squad_stats[p]["Red Cards"] = row["Red Cards"]
-
-        # Build final DF
-        ps_df_full = pd.DataFrame.from_dict(squad_stats, orient="index").reset_index()
-        ps_df_full.rename(columns={"index": "Player"}, inplace=True)
-
-        # Sort primarily by Goals (descending), then by Player name
-        ps_df_full = ps_df_full.sort_values(by=["Goals", "Player"], ascending=[False, True])
-
-        # Optionally reorder columns for neat display
-        columns_order = [
-            "Player", "Appearances", "Missed Games", "Goals",
-            "Assists", "Blue Cards", "Yellow Cards", "Red Cards", "Own Goals"
-        ]
-        ps_df_full = ps_df_full[columns_order]
-
-        # Reset index to ensure a clean append
-        ps_df_full = ps_df_full.reset_index(drop=True)
-
-        # Create a totals row
-        totals_dict = {}
-        for col in columns_order:
-            if col == "Player":
-                totals_dict[col] = "TOTAL"
-            else:
-                # Sum up numeric columns
-                totals_dict[col] = ps_df_full[col].sum(numeric_only=True)
-
-        # Append the totals row to the end
-        ps_df_full = pd.concat([ps_df_full, pd.DataFrame([totals_dict])], ignore_index=True)
+        # Every squad member (zeros if no stats), sorted by Goals, with a TOTAL row
+        ps_df_full = player_stats_table(ps_df, squad_names(team_id, season))
 
         # Display DataFrame with totals row
         st.dataframe(ps_df_full, use_container_width=True, hide_index=True, height=492)
 
+        # ============ PARTNERSHIPS & LINE-UPS ============
+        with st.expander("🤝 Partnerships & Line-ups"):
+            pairs = compute_partnerships(df_local)
+            heatmaps = {
+                "Games together": ("together", "Blues", "{:.0f}"),
+                "Points per game together": ("pair_points", "RdYlGn", "{:.1f}"),
+                "Goal difference per game together": ("pair_dif", "RdYlGn", "{:+.1f}"),
+            }
+            choice = st.selectbox("Heatmap", list(heatmaps))
+            key, cmap, fmt = heatmaps[choice]
+            if pairs["players"]:
+                heatmap = heatmap_chart(pairs[key], choice, cmap=cmap, fmt=fmt)
+                st.image(render_charts({"heatmap": heatmap})["heatmap"], use_container_width=True)
+
+            st.markdown("**On the pitch** (team results with each player playing)")
+            st.dataframe(pairs["player"], use_container_width=True, hide_index=True)
+
+            st.markdown("**Best line-ups of 8** (at least 3 games together)")
+            if pairs["lineups"].empty:
+                st.info("No line-up of 8 has played 3 games together yet.")
+            else:
+                st.dataframe(pairs["lineups"].head(10), use_container_width=True, hide_index=True)
+
+        # ============ PRINTABLE REPORTS (Manager) ============
+        if st.session_state["user_role"] == "Manager":
+            with st.expander("🖨️ Reports"):
+                st.caption(
+                    "A season report and one per player (HTML, optionally PDF) in the reports folder. "
+                    "Players whose stats have not changed since the last run are skipped."
+                )
+                col_r1, col_r2 = st.columns(2)
+                with_pdf = col_r1.checkbox("Also PDF", key="reports_pdf")
+                rebuild = col_r2.checkbox("Rebuild all", key="reports_force")
+                if st.button("🖨️ Generate reports"):
+                    with st.spinner("Rendering reports..."):
+                        summary = core.generate_reports(pdf=with_pdf, force=rebuild, team_id=team_id)
+                    st.success(
+                        f"✅ {len(summary.generated)} report(s) written, {len(summary.skipped)} unchanged "
+                        f"({os.path.abspath(summary.directory)})."
+                    )
+                    buffer = io.BytesIO()
+                    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+                        for folder, _, files in os.walk(summary.directory):
+                            for name in files:
+                                if name.endswith((".html", ".pdf")):
+                                    path = os.path.join(folder, name)
+                                    archive.write(path, os.path.relpath(path, summary.directory))
+                    st.download_button("⬇️ All reports (.zip)", buffer.getvalue(), file_name="reports.zip",
+                                       mime="application/zip")
+
         st.markdown("---")
         
         # ========= MATCH HISTORY =========
         st.subheader("📜 Match History")
-        st.dataframe(df_local, use_container_width=True, hide_index=True, height=420)
+        col1, col2 = st.columns(2)
+        opponents = sorted(df_local["Opposition"].astype(object).unique())
+        opponent = col1.selectbox("Opponent", ["All"] + opponents, key="history_opponent")
+        player = col2.selectbox("Player", ["All"] + list(squad_names(team_id)), key="history_player")
+        mask = match_filter(
+            df_local, opponent=None if opponent == "All" else opponent, player=None if player == "All" else player,
+        )
+        paged_dataframe(df_local, mask, "history", "Date", descending=True, use_container_width=True, hide_index=True)
 
 
+    record_render_time("Stats & Metrics", started)
+
 # ================= TAB 3: LEAGUE (SCRAPED) ==================== #
-with tab3:
+@st.fragment
+def render_league():
+    started = perf_counter()
     st.header("🏆 League Standings & Results")
 
+    # Scraping happens in the background; this tab only reads the CSVs
+    refresher = get_league_refresher()
     if st.button("Get latest League Data"):
-        with st.spinner("Getting the latest league data..."):
-            standings_df, results_df = scrape_league_data()
-        st.success("League data updated!")
+        refresher.request_refresh()
+        st.info("🔄 Refresh requested. The tables update in the background when the league site changes.")
+
+    status = refresher.status
+    st.caption(
+        f"Last checked: {status['last_checked'] or 'never'} · "
+        f"last change: {status['last_changed'] or 'none seen'} (UTC)"
+    )
+    if status["last_error"]:
+        st.warning(f"⚠️ Last refresh failed: {status['last_error']}")
 
     st.subheader("League Standings")
     league_standings = load_league_standings()
@@ -680,9 +702,8 @@ with tab3:
 
         # 🔥 Mark Maradonners
         if "Team" in league_standings.columns:
-            league_standings["Team"] = league_standings["Team"].apply(
-                lambda x: f"🔥{x}🔥" if "Maradonners" in x else x
-            )
+            # Decorated names are display-only strings, not team categories
+            league_standings["Team"] = highlight_team(league_standings["Team"]).astype(object)
             # Mark top 2 up-arrow, bottom 2 down-arrow
             if len(league_standings) >= 2:
                 league_standings.loc[1:2, "Team"] += " ⬆️"
@@ -692,6 +713,85 @@ with tab3:
     else:
         st.info("No league standings data. Click 'Get latest League Data' to scrape.")
 
+    # ====================== STANDINGS OVER TIME ====================== #
+    history = load_standings_history()
+    if not history.empty and history["Taken At"].nunique() > 1:
+        with st.expander("📈 Standings over time"):
+            st.image(render_charts(standings_charts(history))["positions"], use_container_width=True)
+            positions = history.pivot_table(index="Team", columns="Taken At", values="Position")
+            st.dataframe(positions.sort_values(positions.columns[-1]), use_container_width=True)
+
+    # ================ TABLE FROM RESULTS & WHAT-IF ================ #
+    fixtures = load_league_results()
+    if not fixtures.empty and {"Home Team", "Score", "Away Team"} <= set(fixtures.columns):
+        with st.expander("🧮 Table from results & what-if"):
+            st.caption("Recomputed offline from every fixture's score. Edit scores below to see what-if tables.")
+            tiebreak = st.radio(
+                "Tiebreak", ["goal_difference", "head_to_head"], horizontal=True,
+                format_func=lambda t: {"goal_difference": "Goal difference", "head_to_head": "Head-to-head"}[t],
+            )
+            edited = st.data_editor(
+                fixtures[["Date", "Home Team", "Score", "Away Team"]],
+                disabled=["Date", "Home Team", "Away Team"], use_container_width=True, height=250,
+                column_config={"Date": st.column_config.DateColumn(format="ddd D MMM YYYY")},
+                key="what_if_scores",
+            )
+            changed = edited["Score"].astype(object) != fixtures["Score"].astype(object)
+            edits = edited.loc[changed, "Score"].to_dict()
+            computed = compute_league_table(what_if(fixtures, edits), tiebreak)
+            computed.index = computed.index + 1
+            st.dataframe(computed.drop(columns=["FF", "FA", "B"]), use_container_width=True)
+
+            if edits:
+                st.info(f"✏️ What-if table with {len(edits)} edited result(s).")
+            else:
+                # Cross-check against the scraped STTable
+                mismatches = compare_tables(compute_league_table(fixtures, "goal_difference"), load_league_standings())
+                if mismatches.empty:
+                    st.success("✅ Matches the scraped standings.")
+                else:
+                    st.warning("⚠️ Differs from the scraped standings (forfeits, bonus points or a stale scrape?)")
+                    st.dataframe(mismatches, use_container_width=True, hide_index=True)
+
+        # ================ PROMOTION / RELEGATION ODDS ================ #
+        with st.expander("🎲 Promotion & relegation odds"):
+            scores = parse_scores(fixtures["Score"])
+            remaining = int((scores["Home"].isna() | scores["Live"]).sum())
+            runs = st.select_slider("Simulated seasons", [2000, 10000, 50000], value=10000)
+            odds = simulate_season(fixtures, load_league_standings(), runs)
+            st.caption(f"{remaining} fixture(s) left to play, each season simulated {runs:,} times (fixed seed).")
+            summary = odds[["Team", "Promotion %", "Relegation %", "Expected Position", "Expected Pts"]]
+            st.dataframe(summary, use_container_width=True, hide_index=True)
+            # Finishing-position distribution, one colour per team
+            positions = odds.set_index("Team")[[c for c in odds.columns if c.isdigit()]].T
+            positions.index = positions.index.astype(int).rename("Position")
+            st.bar_chart(positions)
+
+        # ====================== TEAM RATINGS (ELO) ====================== #
+        with st.expander("📊 Team ratings (Elo)"):
+            state = load_ratings()
+            st.caption(
+                f"Goal-difference Elo over every played league fixture (up to {state['last_date']}); "
+                "new results are applied as they are scraped."
+            )
+            st.dataframe(ratings_table(state), use_container_width=True, hide_index=True)
+
+            team_id = st.session_state.get("team_id", DEFAULT_TEAM_ID)
+            local = load_local_data(team_id)
+            if not local.empty:
+                schedule = strength_of_schedule(local, state, team_id)
+                rated = schedule[schedule["Rated"]]
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Avg opponent rating", f"{schedule['Opponent Rating'].mean():.0f}")
+                col2.metric("Expected score / game", f"{schedule['Expected'].mean():.2f}")
+                col3.metric("Actual score / game", f"{schedule['Actual'].mean():.2f}",
+                            delta=f"{schedule['Over Expected'].mean():+.2f} per game")
+                st.caption(
+                    f"Score: win 1, draw 0.5, loss 0. {len(rated)} of {len(schedule)} games against "
+                    "league-rated opponents (others count as an average team)."
+                )
+                st.dataframe(schedule.drop(columns="Rated"), use_container_width=True, hide_index=True)
+
     st.markdown("---")
         
     # ====================== LEAGUE MATCH RESULTS ====================== #
@@ -700,15 +800,58 @@ with tab3:
 
     if not league_results.empty:
         league_results.index = league_results.index + 1
-        # 🔥 Highlight Maradonners
-        if "Home Team" in league_results.columns:
-            league_results["Home Team"] = league_results["Home Team"].apply(
-                lambda x: f"🔥{x}🔥" if "Maradonners" in x else x
+        col1, col2 = st.columns(2)
+        teams = sorted(set(league_results["Home Team"].astype(object)) | set(league_results["Away Team"].astype(object)))
+        team = col1.selectbox("Team", ["All"] + teams, key="results_team")
+        dates = league_results["Date"]
+        start = end = None
+        if dates.dtype.kind == "M" and dates.notna().any():  # parsed league dates
+            picked = col2.date_input(
+                "Dates", value=(dates.min().date(), dates.max().date()), format="DD/MM/YYYY", key="results_dates",
             )
-        if "Away Team" in league_results.columns:
-            league_results["Away Team"] = league_results["Away Team"].apply(
-                lambda x: f"🔥{x}🔥" if "Maradonners" in x else x
-            )
-        st.dataframe(league_results, use_container_width=True)
+            start, end = (picked[0], picked[-1]) if picked else (None, None)
+        mask = results_filter(league_results, team=None if team == "All" else team, start=start, end=end)
+        paged_dataframe(
+            league_results, mask, "results", "Date", highlight=("Home Team", "Away Team"),
+            use_container_width=True,
+            column_config={"Date": st.column_config.DateColumn(format="dddd D MMM YYYY")},
+        )
     else:
         st.info("No match results data. Click 'Get latest League Data' to scrape.")
+
+    record_render_time("League", started)
+
+
+tab1, tab2, tab3 = st.tabs(["📋 Enter Match Results", "📊 Stats & Metrics", "🏆 League"])
+
+with tab1:
+    render_match_entry()
+with tab2:
+    render_stats()
+with tab3:
+    render_league()
+
+instrument.record("render.script", perf_counter() - rerun_started)
+
+# --------------------------------------------------------------------
+#                 DIAGNOSTICS PANEL (MANAGER ONLY)
+# --------------------------------------------------------------------
+# Drawn last so it can list this rerun's spans. A widget change inside a
+# tab re-runs only that tab's fragment, not this panel; those spans still
+# count in the totals.
+if st.session_state["user_role"] == "Manager":
+    with diagnostics:
+        if instrument.enabled():
+            st.markdown("**This rerun**")
+            st.dataframe(instrument.since(rerun_mark), hide_index=True)
+            st.markdown("**Since the server started**")
+            st.dataframe([{"span": name, **t} for name, t in instrument.span_totals().items()], hide_index=True)
+            st.json(instrument.counters())
+            st.button("Reset timings", on_click=instrument.reset)
+        else:
+            st.caption("Timings are off. Switch them on to see where each rerun spends its time.")
+        st.markdown("**Cache**")
+        st.json(cache.stats())
+        if metrics_server is not None:
+            host, port = metrics_server.server_address[:2]
+            st.caption(f"Prometheus: http://{host}:{port}/metrics")
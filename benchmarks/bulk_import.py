@@ -0,0 +1,85 @@
+"""
+Bulk import throughput and peak memory.
+
+Writes a synthetic backfill (with a few percent of deliberately broken
+rows) and imports it with `python -m maradonners import` in a fresh
+process, reporting wall time, rows/s and the child's peak RSS for each
+chunk size. Peak RSS should stay flat as --matches grows.
+
+    python benchmarks/bulk_import.py --matches 100000 --chunk-sizes 1000 5000 20000
+"""
+import argparse
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+from maradonners import match_store, roster  # noqa: E402
+
+BLOCK = 10000  # synthetic rows generated and written at a time
+
+
+def write_backfill(path, n_matches, broken=0.02, seed=0):
+    """Synthetic history CSV, written in blocks, with `broken` of the rows corrupted."""
+    rng = random.Random(seed)
+    for start in range(0, n_matches, BLOCK):
+        df = synthetic.match_history(min(BLOCK, n_matches - start), seed=seed + start).astype(str)
+        for i in rng.sample(range(len(df)), int(len(df) * broken)):
+            column, value = rng.choice([
+                ("Goals Scored", "99"), ("Date", "31/02/2020"), ("Players", ""), ("Scorers", "Nobody (1)"),
+            ])
+            df.loc[i, column] = value
+        df.to_csv(path, mode="a", header=start == 0, index=False)
+
+
+def run_import(workdir, path, chunk_size):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    for name in os.listdir(workdir):
+        if name.startswith("maradonners_fc.db"):
+            os.remove(os.path.join(workdir, name))
+    # Imports only accept players the roster knows
+    match_store.roster_write(os.path.join(workdir, "maradonners_fc.db"), roster.resolve_players,
+                             synthetic.squad_names(13), create=True)
+    before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    started = perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-m", "maradonners", "import", path, "--force", "--any-player",
+         "--chunk-size", str(chunk_size)],
+        cwd=workdir, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    elapsed = perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return elapsed, max(peak, before) / 1024, out.splitlines()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--matches", type=int, default=100000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="maradonners_import_")
+    try:
+        path = os.path.join(workdir, "backfill.csv")
+        write_backfill(path, args.matches)
+        print(f"{args.matches} matches, {os.path.getsize(path) / 2**20:.1f} MiB CSV")
+        print(f"{'chunk':>7} {'seconds':>8} {'rows/s':>8} {'peak RSS (MiB)':>15}  result")
+        # ru_maxrss of children is a high-water mark: run the smallest chunk size first
+        for chunk_size in sorted(args.chunk_sizes):
+            elapsed, peak, result = run_import(workdir, path, chunk_size)
+            print(f"{chunk_size:>7} {elapsed:>8.1f} {args.matches / elapsed:>8.0f} {peak:>15.0f}  {result}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Season-trend chart rendering: cold, cached, and after a new match.
+
+For each history size, renders the Stats tab's charts (points, goals per
+match, top scorers' goals) and the standings chart through the chart
+cache, reporting milliseconds and how many images were drawn:
+
+  cold         empty cache, every chart drawn (in the pool if --workers > 1)
+  memory hit   the same data again: what a normal rerun costs
+  disk hit     memory cleared, as in a fresh server process
+  new match    one 0-0 match appended: only the charts that plot it redraw
+
+    python benchmarks/chart_rendering.py --matches 100 1000 5000 --workers 4
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from time import perf_counter
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+from maradonners import charts, instrument  # noqa: E402
+
+
+def standings_history(n_teams=10, snapshots=20):
+    teams = synthetic.team_names(n_teams)
+    rows = []
+    for i in range(snapshots):
+        order = teams[i % n_teams:] + teams[:i % n_teams]
+        taken_at = pd.Timestamp("2025-01-30T21:00:00+00:00") + pd.Timedelta(days=7 * i)
+        rows += [{"Taken At": taken_at.isoformat(), "Team": t, "Position": p + 1} for p, t in enumerate(order)]
+    return pd.DataFrame(rows)
+
+
+def timed_render(specs, cache, workers):
+    drawn = instrument.counters().get("charts.rendered", 0)
+    started = perf_counter()
+    charts.render_charts(specs, cache, workers=workers)
+    return (perf_counter() - started) * 1000, instrument.counters().get("charts.rendered", 0) - drawn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--matches", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--workers", type=int, default=charts.CHART_WORKERS)
+    args = parser.parse_args()
+
+    instrument.enable()
+    history = standings_history()
+    workdir = tempfile.mkdtemp(prefix="maradonners_charts_")
+    try:
+        print(f"workers: {args.workers}")
+        print(f"{'matches':>8} {'case':<12} {'ms':>9} {'drawn':>6}")
+        for n in args.matches:
+            cache = charts.ChartCache(os.path.join(workdir, str(n)))
+            df = synthetic.match_history(n)
+
+            def specs(frame):
+                return {**charts.season_charts(frame), **charts.standings_charts(history)}
+
+            cases = [("cold", df), ("memory hit", df), ("disk hit", df)]
+            row = df.iloc[[-1]].assign(**{"Date": "01/01/2100", "Goals Scored": 0, "Goals Conceded": 0,
+                                          "Scorers": "", "Assists": "", "Own Goals": ""})
+            cases.append(("new match", pd.concat([df, row], ignore_index=True)))
+            for name, frame in cases:
+                if name == "disk hit":
+                    cache.clear()
+                ms, drawn = timed_render(specs(frame), cache, args.workers)
+                print(f"{n:>8} {name:<12} {ms:>9.1f} {drawn:>6}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
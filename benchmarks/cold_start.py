@@ -0,0 +1,76 @@
+"""
+Cold-start timings for the CLI and the Streamlit app's imports.
+
+Each case runs in a fresh interpreter (so nothing is already imported)
+and the median wall time over --repeat runs is reported:
+
+  cli --help         python -m maradonners --help
+  cli stats --json   python -m maradonners stats --json (synthetic history)
+  app imports (old)  what app.py imported before the core package split
+  app imports (new)  what app.py imports now
+
+    python benchmarks/cold_start.py --repeat 10
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+from maradonners import match_store  # noqa: E402
+
+# app.py before the split imported matplotlib, requests (via scraper) and
+# BeautifulSoup eagerly, then ran initialize_store() at import.
+OLD_APP_IMPORTS = (
+    "import streamlit, pandas, matplotlib.pyplot, requests, bs4, lxml, numpy"
+)
+NEW_APP_IMPORTS = (
+    "import streamlit; from maradonners import cache, core; "
+    "from maradonners.stats_engine import player_stats_table; core.initialize_store()"
+)
+
+
+def time_command(argv, cwd, repeat):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    times = []
+    for _ in range(repeat):
+        started = perf_counter()
+        subprocess.run(argv, cwd=cwd, env=env, check=True, stdout=subprocess.DEVNULL)
+        times.append((perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--matches", type=int, default=1000, help="matches in the synthetic history")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="maradonners_bench_")
+    try:
+        match_store.replace_matches(synthetic.match_history(args.matches), os.path.join(workdir, "maradonners_fc.db"),
+                                    new_players=True)
+        cases = [
+            ("python (baseline)", [sys.executable, "-c", "pass"]),
+            ("cli --help", [sys.executable, "-m", "maradonners", "--help"]),
+            ("cli stats --json", [sys.executable, "-m", "maradonners", "stats", "--json"]),
+            ("app imports (old)", [sys.executable, "-c", OLD_APP_IMPORTS]),
+            ("app imports (new)", [sys.executable, "-c", NEW_APP_IMPORTS]),
+        ]
+        print(f"{'case':<20} {'median (ms)':>12}")
+        for name, argv in cases:
+            print(f"{name:<20} {time_command(argv, workdir, args.repeat):>12.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
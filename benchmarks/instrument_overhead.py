@@ -0,0 +1,80 @@
+"""
+Cost of the instrumentation layer per call.
+
+Times a trivial function bare, wrapped in instrument.timed() with
+recording off and on, the same for a `with instrument.span()` block, and
+a cached loader hit (core.load_local_data on a synthetic history), which
+is the call the app makes most often. "off" is what every user pays.
+
+    python benchmarks/instrument_overhead.py --calls 200000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+from maradonners import instrument, match_store  # noqa: E402
+
+
+def noop():
+    return None
+
+
+timed_noop = instrument.timed("bench.noop")(noop)
+
+
+def span_noop():
+    with instrument.span("bench.span"):
+        return None
+
+
+def per_call_ns(variants, calls, repeat=5):
+    """Best ns per call of each (func, enabled) variant, interleaved so drift hits all alike."""
+    best = [float("inf")] * len(variants)
+    for _ in range(repeat):
+        for i, (func, on) in enumerate(variants):
+            instrument.enable(on)
+            best[i] = min(best[i], timeit.timeit(func, number=calls) / calls * 1e9)
+    instrument.enable(False)
+    instrument.reset()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--matches", type=int, default=1000, help="history size for the loader case")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="maradonners_instrument_")
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        match_store.replace_matches(synthetic.match_history(args.matches), "maradonners_fc.db", new_players=True)
+        from maradonners import core
+        core.load_local_data()  # fill the cache: every timed call below is a hit
+
+        cases = [
+            ("function call", noop, timed_noop, args.calls),
+            ("with span()", lambda: None, span_noop, args.calls),
+            ("load_local_data (hit)", core.load_local_data.__wrapped__, core.load_local_data, args.calls // 20),
+        ]
+        print(f"{'case':<24} {'bare ns':>9} {'off ns':>9} {'on ns':>9} {'off +ns':>8} {'on +ns':>8}")
+        for name, bare, wrapped, calls in cases:
+            bare_ns, off_ns, on_ns = per_call_ns([(bare, False), (wrapped, False), (wrapped, True)], calls)
+            print(f"{name:<24} {bare_ns:>9.0f} {off_ns:>9.0f} {on_ns:>9.0f} "
+                  f"{off_ns - bare_ns:>8.0f} {on_ns - bare_ns:>8.0f}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Games in progress through the real scrape path.
+
+Serves a synthetic league page whose last played fixtures are LIVE over
+a local HTTP server, scrapes it with scraper.scrape_targets, writes and
+reads match_results.csv the way the refresher and the app do, then
+checks that the LIVE fixtures are simulated (not counted as final),
+left out of the scoring-rate fit, and kept out of the Elo ratings until
+their final score arrives (which must not force a rebuild). Exits
+non-zero on a failed check.
+
+    python benchmarks/live_games.py --teams 10 --rounds 9 --live 2
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+from maradonners import scraper  # noqa: E402
+from maradonners.config import LeagueTarget  # noqa: E402
+from maradonners.fileio import write_csv_atomic  # noqa: E402
+from maradonners.league_table import league_table, parse_scores  # noqa: E402
+from maradonners.match_index import parse_league_dates  # noqa: E402
+from maradonners.ratings import league_fixtures, update_ratings  # noqa: E402
+from maradonners.schema import compact_results  # noqa: E402
+from maradonners.simulator import fit_rates, simulate_season  # noqa: E402
+
+
+def serve(page):
+    """A local HTTP server answering every GET with `page`; returns (server, url)."""
+    body = page.encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/Leagues/Standings"
+
+
+def scrape_results(page, workdir):
+    """match_results.csv as the app loads it, after a real scrape of `page`."""
+    server, url = serve(page)
+    try:
+        target = LeagueTarget(sport_id=1, venue_id=1, league_id=1, season_id=1, division_id=1)
+        result = scraper.scrape_targets([target], base_url=url)[target]
+    finally:
+        server.shutdown()
+    if result.error:
+        raise result.error
+    path = os.path.join(workdir, "match_results.csv")
+    write_csv_atomic(result.results, path)
+    results = pd.read_csv(path)
+    results["Date"] = parse_league_dates(results["Date"])
+    return compact_results(results)
+
+
+def check(name, ok, detail):
+    print(f"{'ok  ' if ok else 'FAIL'} {name}: {detail}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=9)
+    parser.add_argument("--live", type=int, default=2, help="LIVE fixtures at the end of the played rounds")
+    parser.add_argument("--sims", type=int, default=5000)
+    args = parser.parse_args()
+
+    page = synthetic.league_page(n_teams=args.teams, n_rounds=args.rounds, live=args.live)
+    workdir = tempfile.mkdtemp(prefix="maradonners_live_")
+    try:
+        results = scrape_results(page, workdir)
+        # The home side scores once more before the final whistle
+        final = scrape_results(re.sub(r">(\d+) - (\d+) LIVE<", lambda m: f">{int(m[1]) + 1} - {m[2]}<", page),
+                               workdir)
+        state_path = os.path.join(workdir, "ratings_state.json")
+        state, _, _ = update_ratings(results, state_path)
+        fixtures = league_fixtures(results)
+        live_keys = set(fixtures.loc[fixtures["Home Goals"].notna() & ~fixtures["Played"], "Key"])
+        applied_live = live_keys & set(state["applied"])
+        _, applied, rebuilt = update_ratings(final, state_path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    scores = parse_scores(results["Score"])
+    live = scores["Live"].to_numpy()
+    ok = check("LIVE survives the scrape", live.sum() == args.live, f"{live.sum()} of {args.live} fixtures marked")
+
+    teams = list(league_table(results)["Team"])
+    fitted = fit_rates(results, teams)
+    final_only = fit_rates(results[~live], teams)
+    ok &= check("rate fit ignores LIVE", all(np.allclose(a, b) for a, b in zip(fitted, final_only)),
+                "attack / defence / mean unchanged without the LIVE rows")
+
+    # Every fixture is played or LIVE, so the LIVE games are all that is left to
+    # simulate: each adds 3 points to the teams' total (a win) or 2 (a draw)
+    odds = simulate_season(results, n_sims=args.sims)
+    current = league_table(results).set_index("Team")["Pts"]
+    added = (odds.set_index("Team")["Expected Pts"] - current.reindex(odds["Team"]).to_numpy()).sum()
+    ok &= check("LIVE games are simulated", 2 * args.live <= added + 0.05 and added - 0.05 <= 3 * args.live,
+                f"{added:.2f} expected points still to play for")
+
+    ok &= check("Elo skips LIVE", not applied_live, f"{len(applied_live)} LIVE fixtures rated")
+    ok &= check("final scores apply without a rebuild", applied == args.live and not rebuilt,
+                f"{applied} fixtures applied, rebuilt={rebuilt}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Memory report for the compact table schema (maradonners.schema).
+
+Builds a large synthetic archive and compares the deep memory use of
+each in-memory table in the old layout (object strings, int64 / Int64
+counters) against the compact one (categoricals, int16 counters,
+categorical player IDs):
+
+    python benchmarks/memory_report.py --matches 50000 --squad 40
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+from maradonners import schema, stats_engine  # noqa: E402
+
+
+def as_objects(df):
+    """The pre-schema layout: every text column as Python strings, 64-bit counters."""
+    df = df.copy()
+    for column in df.columns:
+        dtype = df[column].dtype
+        if pd.api.types.is_integer_dtype(dtype):
+            df[column] = df[column].astype("Int64" if pd.api.types.is_extension_array_dtype(dtype) else "int64")
+        elif not pd.api.types.is_datetime64_any_dtype(dtype):
+            df[column] = df[column].astype(object)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--matches", type=int, default=50000)
+    parser.add_argument("--squad", type=int, default=40)
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=500, help="league rounds in the fixtures table")
+    args = parser.parse_args()
+
+    history = synthetic.match_history(args.matches, squad_size=args.squad)
+    history = history.astype({c: object for c in history.columns if c not in schema.LOCAL_COUNTER_COLUMNS})
+    history[schema.LOCAL_COUNTER_COLUMNS] = history[schema.LOCAL_COUNTER_COLUMNS].astype("Int64")
+    events = stats_engine.explode_events(history)
+    fixtures = synthetic.league_fixtures(args.teams, args.rounds)
+    standings = synthetic.standings_from_fixtures(fixtures)
+
+    tables = [
+        ("local match table", as_objects(history), schema.compact_local_table(history)),
+        ("event table", as_objects(events), events),
+        ("league results", as_objects(fixtures), schema.compact_results(fixtures)),
+        ("league standings", as_objects(standings), schema.compact_standings(standings)),
+    ]
+
+    print(f"{args.matches} matches, {args.squad} players, {len(fixtures)} league fixtures\n")
+    print(f"{'table':<18} {'rows':>9} {'before (MiB)':>13} {'after (MiB)':>12} {'saved':>7}")
+    total_before = total_after = 0
+    for name, before, after in tables:
+        b, a = schema.memory_usage(before), schema.memory_usage(after)
+        total_before += b
+        total_after += a
+        print(f"{name:<18} {len(after):>9} {b / 2**20:>13.2f} {a / 2**20:>12.2f} {1 - a / b:>6.0%}")
+    print(f"{'total':<18} {'':>9} {total_before / 2**20:>13.2f} {total_after / 2**20:>12.2f} "
+          f"{1 - total_after / total_before:>6.0%}")
+
+    ids = schema.player_dictionary(events["Player"])
+    print(f"\nplayer-ID dictionary: {len(ids)} names, e.g. {dict(list(ids.items())[:3])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark for the league page parser.
+
+For every saved page in fixtures/spawtz/ (plus a copy padded with the
+kind of site chrome a live page carries), times:
+
+  full tree    BeautifulSoup(html, "html.parser") over the whole page
+               (how scrape_league_data used to parse)
+  strained     scraper.parse_league_page with html.parser
+  strained+lxml  the same with lxml, if installed
+
+and checks that every variant returns identical DataFrames.
+
+Usage:
+    python benchmarks/parse_benchmark.py [--repeat 20] [--pad 300]
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+from time import perf_counter
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from maradonners import scraper  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "fixtures", "spawtz", "*.html")
+
+
+def full_tree_parse(html):
+    """The original parse: build the whole tree, then search it."""
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", class_="STTable")
+    standings_df = scraper.parse_standings_table(table) if table else pd.DataFrame()
+    tables = soup.find_all("table", class_="FTable")
+    results_df = scraper.parse_results_tables(tables) if tables else pd.DataFrame()
+    return standings_df, results_df
+
+
+def pad_page(html, blocks):
+    """Surround the tables with navigation, scripts and sponsor markup."""
+    chrome = "".join(
+        f'<div class="nav"><ul><li><a href="/l/{i}">League {i}</a></li>'
+        f'<li><a href="/d/{i}">Division {i}</a></li></ul>'
+        f'<script>var x{i} = {{"id": {i}}};</script>'
+        f'<p class="sponsor">Sponsor <b>{i}</b> <img src="/s/{i}.png"></p></div>'
+        for i in range(blocks)
+    )
+    return html.replace("<body>", "<body>" + chrome, 1).replace("</body>", chrome + "</body>", 1)
+
+
+def best_ms(func, html, repeat):
+    times = []
+    for _ in range(repeat):
+        started = perf_counter()
+        func(html)
+        times.append((perf_counter() - started) * 1000)
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--pad", type=int, default=300, help="chrome blocks added to the padded page")
+    args = parser.parse_args()
+
+    variants = [
+        ("full tree", full_tree_parse),
+        ("strained", lambda html: scraper.parse_league_page(html, parser="html.parser")),
+    ]
+    if scraper.HTML_PARSER == "lxml":
+        variants.append(("strained+lxml", lambda html: scraper.parse_league_page(html, parser="lxml")))
+
+    print(f"{'page':<28} {'KiB':>6} {'variant':<14} {'best (ms)':>10} {'median (ms)':>12}")
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path, encoding="utf-8") as f:
+            raw = f.read()
+        name = os.path.basename(path)
+        for label, html in ((name, raw), (name + " (padded)", pad_page(raw, args.pad))):
+            expected = full_tree_parse(html)
+            for variant, func in variants:
+                got = func(html)
+                pd.testing.assert_frame_equal(got[0], expected[0])
+                pd.testing.assert_frame_equal(got[1], expected[1])
+                best, median = best_ms(func, html, args.repeat)
+                print(f"{label:<28} {len(html) / 1024:>6.1f} {variant:<14} {best:>10.2f} {median:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
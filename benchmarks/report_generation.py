@@ -0,0 +1,70 @@
+"""
+Batch report generation: cold, unchanged, and after a new match.
+
+Builds the season and per-player reports for a synthetic history,
+reporting seconds and how many reports were written:
+
+  cold         empty report folder, every report rendered
+  unchanged    the same data again: only fingerprints are compared
+  new match    one match appended with two players: the season page and
+               those two players' pages are rebuilt
+
+    python benchmarks/report_generation.py --matches 100 1000 --workers 4 [--pdf]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from time import perf_counter
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+from maradonners import reports  # noqa: E402
+from maradonners.config import REPORT_WORKERS  # noqa: E402
+from maradonners.stats_engine import compute_player_stats  # noqa: E402
+from maradonners.team_analytics import compute_team_metrics  # noqa: E402
+
+
+def timed_generate(df, squad, out_dir, workers, pdf):
+    started = perf_counter()
+    summary = reports.generate_reports(
+        df, compute_player_stats(df, squad), compute_team_metrics(df), squad, out_dir, pdf=pdf, workers=workers,
+    )
+    return perf_counter() - started, len(summary.generated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--matches", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--workers", type=int, default=REPORT_WORKERS)
+    parser.add_argument("--pdf", action="store_true")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="maradonners_reports_")
+    try:
+        print(f"workers: {args.workers}")
+        print(f"{'matches':>8} {'case':<12} {'s':>8} {'written':>8}")
+        for n in args.matches:
+            df = synthetic.match_history(n)
+            squad = synthetic.squad_names(13)
+            out_dir = os.path.join(workdir, str(n))
+            pair = squad[:2]
+            row = df.iloc[[-1]].assign(**{"Date": "01/01/2100", "Players": ", ".join(pair), "Missed": "",
+                                          "Scorers": f"{pair[0]} (1)", "Assists": f"{pair[1]} (1)",
+                                          "Own Goals": "", "Blue Cards": "", "Yellow Cards": "", "Red Cards": ""})
+            cases = [("cold", df), ("unchanged", df), ("new match", pd.concat([df, row], ignore_index=True))]
+            for name, frame in cases:
+                seconds, written = timed_generate(frame, squad, out_dir, args.workers, args.pdf)
+                print(f"{n:>8} {name:<12} {seconds:>8.2f} {written:>8}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
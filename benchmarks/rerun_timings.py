@@ -0,0 +1,75 @@
+"""
+Per-interaction rerun timings for the Streamlit app.
+
+Builds a synthetic match history in a temporary directory and uses
+Streamlit's AppTest to change one goal counter in "Enter Match Results".
+
+  before  every interaction re-ran the whole script (all three tabs)
+  after   only the "Enter Match Results" fragment re-runs
+
+AppTest always executes the full script, so "before" is the measured
+full rerun and "after" is the time recorded for the entry fragment
+itself (st.session_state["render_ms"]).
+
+Usage:
+    python benchmarks/rerun_timings.py --matches 100 1000 5000
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from maradonners import match_store  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import synthetic  # noqa: E402
+
+def time_interaction(n_matches, repeat):
+    from streamlit.testing.v1 import AppTest
+
+    workdir = tempfile.mkdtemp(prefix="maradonners_bench_")
+    cwd = os.getcwd()
+    try:
+        for name in ("league_standings.csv", "match_results.csv"):
+            shutil.copy(os.path.join(ROOT, name), workdir)
+        os.chdir(workdir)
+        match_store.replace_matches(synthetic.match_history(n_matches), "maradonners_fc.db", new_players=True)
+
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=600)
+        at.session_state["authenticated"] = True
+        at.session_state["user_role"] = "Player"
+        at.run()
+
+        full, fragment = [], []
+        for i in range(repeat):
+            at.number_input[0].set_value(i + 1)
+            started = perf_counter()
+            at.run()
+            full.append((perf_counter() - started) * 1000)
+            fragment.append(at.session_state["render_ms"]["Enter Match Results"])
+        return statistics.median(full), statistics.median(fragment)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--matches", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'matches':>8} {'before (ms)':>12} {'after (ms)':>11}")
+    for n in args.matches:
+        before, after = time_interaction(n, args.repeat)
+        print(f"{n:>8} {before:>12.1f} {after:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Benchmark suite for the stats and scraping hot paths.
+
+Times, at several history sizes:
+  migrate_csv          one-shot CSV -> SQLite import
+  load_local_data      match_store.load_matches
+  compute_local_stats  stats_engine.compute_player_stats
+  compute_team_metrics team_analytics.compute_team_metrics
+  team_analytics       form / streaks / cumulative series
+  stats_table          Stats-tab Player Statistics table assembly
+  load_match_index     match_store.load_index (date-sorted, by season)
+  range_stats          player + team stats for the middle half of the history
+  history_view_full    Match History as before: the whole table serialized
+  history_view_page    filtered by player, sorted by date, one 25-row page
+  results_view_full    League Match Results as before: row-by-row 🔥 apply
+                       over every fixture, whole table serialized
+  results_view_page    filtered by team, sorted, vectorized 🔥 on one page
+  parse_league_page    scraper parser (sizes are fixtures per page)
+
+The *_view_* cases time what st.dataframe does (Arrow serialization)
+and record the payload sent to the browser as payload_kib.
+
+Results are written as JSON so runs can be compared:
+
+    python benchmarks/run_benchmarks.py --output before.json
+    ... change code ...
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+from maradonners import match_store, scraper, stats_engine, table_view, team_analytics  # noqa: E402
+from maradonners.schema import compact_results  # noqa: E402
+
+try:
+    from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes as arrow_bytes
+except ImportError:  # streamlit not installed: the same Arrow IPC stream via pyarrow
+    import pyarrow as pa
+
+    def arrow_bytes(df):
+        table = pa.Table.from_pandas(df)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_SQUAD = 13
+
+
+def measure(func, repeat):
+    """(best_ms, median_ms) over `repeat` calls."""
+    times = []
+    for _ in range(repeat):
+        started = perf_counter()
+        func()
+        times.append((perf_counter() - started) * 1000)
+    return min(times), statistics.median(times)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_local(sizes, squad_size, repeat, workdir):
+    results = []
+    for n in sizes:
+        history = synthetic.match_history(n, squad_size=squad_size)
+        squad = synthetic.squad_names(squad_size)
+        csv_path = os.path.join(workdir, f"history_{n}.csv")
+        history.to_csv(csv_path, index=False)
+
+        db_counter = iter(range(repeat + 1))
+
+        def migrate():
+            db_path = os.path.join(workdir, f"history_{n}_{next(db_counter)}.db")
+            match_store.migrate_csv(csv_path, db_path)
+
+        db_path = os.path.join(workdir, f"history_{n}.db")
+        match_store.migrate_csv(csv_path, db_path)
+        df = match_store.load_matches(db_path)
+        ps_df = stats_engine.compute_player_stats(df, squad)
+        index = match_store.load_index(db_path)
+        roster = match_store.load_roster(db_path)
+        squad_ids = [roster.player_id(name) for name in squad]
+        dates = index.matches["Date"]
+        mid_start, mid_end = dates.iloc[n // 4], dates.iloc[3 * n // 4]
+
+        def range_stats():
+            index.player_stats(squad_ids, mid_start, mid_end, names=roster.players)
+            index.team_metrics(mid_start, mid_end)
+
+        cases = [
+            ("migrate_csv", migrate),
+            ("load_local_data", lambda: match_store.load_matches(db_path)),
+            ("compute_local_stats", lambda: stats_engine.compute_player_stats(df, squad)),
+            ("compute_team_metrics", lambda: team_analytics.compute_team_metrics(df)),
+            ("team_analytics", lambda: team_analytics.team_analytics(df)),
+            ("stats_table", lambda: stats_engine.player_stats_table(ps_df, squad)),
+            ("load_match_index", lambda: match_store.load_index(db_path)),
+            ("range_stats", range_stats),
+        ]
+        for name, func in cases:
+            best, median = measure(func, repeat)
+            results.append({"benchmark": name, "size": n, "best_ms": round(best, 3),
+                            "median_ms": round(median, 3), "repeat": repeat})
+            print(f"{name:<22} {n:>8} {best:>10.2f} {median:>12.2f}")
+        results += bench_views(n, df, squad, repeat)
+    return results
+
+
+def bench_views(n, df, squad, repeat):
+    """Render cost and payload of the Match History and League Match Results views."""
+    n_teams = 10
+    fixtures = compact_results(synthetic.league_fixtures(n_teams, max(1, n // (n_teams // 2))))
+    fixtures["Date"] = pd.to_datetime(fixtures["Date"], format="%A %d %b %Y")
+    player, team = squad[0], fixtures["Home Team"].iloc[0]
+
+    def history_full():
+        return arrow_bytes(df)
+
+    def history_page():
+        view, _ = table_view.paginate(df, table_view.match_filter(df, player=player), "Date", True)
+        return arrow_bytes(view)
+
+    def results_full():
+        shown = fixtures.copy()
+        for column in ("Home Team", "Away Team"):
+            shown[column] = shown[column].apply(lambda x: f"🔥{x}🔥" if "Maradonners" in x else x)
+        return arrow_bytes(shown)
+
+    def results_page():
+        view, _ = table_view.paginate(fixtures, table_view.results_filter(fixtures, team=team), "Date")
+        view = view.assign(**{c: table_view.highlight_team(view[c]) for c in ("Home Team", "Away Team")})
+        return arrow_bytes(view)
+
+    results = []
+    for name, func in [
+        ("history_view_full", history_full), ("history_view_page", history_page),
+        ("results_view_full", results_full), ("results_view_page", results_page),
+    ]:
+        best, median = measure(func, repeat)
+        payload = len(func()) / 1024
+        results.append({"benchmark": name, "size": n, "best_ms": round(best, 3), "median_ms": round(median, 3),
+                        "repeat": repeat, "payload_kib": round(payload, 1)})
+        print(f"{name:<22} {n:>8} {best:>10.2f} {median:>12.2f}   {payload:>9.1f} KiB")
+    return results
+
+
+def bench_parser(sizes, repeat):
+    results = []
+    for n_fixtures in sizes:
+        n_teams = 10
+        n_rounds = max(1, n_fixtures // (n_teams // 2))
+        page = synthetic.league_page(n_teams=n_teams, n_rounds=n_rounds, chrome_blocks=100)
+        best, median = measure(lambda: scraper.parse_league_page(page), repeat)
+        results.append({"benchmark": "parse_league_page", "size": n_fixtures, "best_ms": round(best, 3),
+                        "median_ms": round(median, 3), "repeat": repeat,
+                        "page_kib": round(len(page) / 1024, 1), "parser": scraper.HTML_PARSER})
+        print(f"{'parse_league_page':<22} {n_fixtures:>8} {best:>10.2f} {median:>12.2f}")
+    return results
+
+
+def compare(current, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["benchmark"], r["size"]): r for r in json.load(f)["results"]}
+
+    print(f"\nvs {baseline_path}")
+    print(f"{'benchmark':<22} {'size':>8} {'before':>10} {'after':>10} {'speedup':>8}")
+    for r in current:
+        old = baseline.get((r["benchmark"], r["size"]))
+        if old:
+            speedup = old["median_ms"] / r["median_ms"] if r["median_ms"] else float("inf")
+            print(f"{r['benchmark']:<22} {r['size']:>8} {old['median_ms']:>10.2f} {r['median_ms']:>10.2f} {speedup:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="matches per history")
+    parser.add_argument("--parser-sizes", type=int, nargs="+", default=[50, 500, 5000], help="fixtures per page")
+    parser.add_argument("--squad", type=int, default=DEFAULT_SQUAD, help="squad members")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier JSON output to compare against")
+    args = parser.parse_args()
+
+    print(f"{'benchmark':<22} {'size':>8} {'best (ms)':>10} {'median (ms)':>12}")
+    workdir = tempfile.mkdtemp(prefix="maradonners_bench_")
+    try:
+        results = bench_local(args.sizes, args.squad, args.repeat, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    results += bench_parser(args.parser_sizes, args.repeat)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "squad": args.squad,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Multi-process stress check for concurrent saves and reads.
+
+Starts several processes hammering the same files at once and checks
+that nothing is lost or seen half-written:
+
+  match saves      W writers each save N matches with save_match while a
+                   reader reloads the history; every match must arrive and
+                   every read must see matches and aggregates that agree
+  naive RMW        the old load -> concat -> replace-everything save, for
+                   comparison (expected to lose matches)
+  stale replace    the same, through replace_matches(expected_revision=...);
+                   no match may be lost, stale writers get StaleWriteError
+  atomic CSV       one process rewrites a CSV while readers parse it; every
+                   read must be a complete file
+  locked counter   W processes increment a JSON counter under file_lock
+
+    python benchmarks/stress_concurrency.py --writers 4 --saves 50
+
+Exits non-zero if any check fails.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from maradonners import match_store  # noqa: E402
+from maradonners.fileio import file_lock, write_csv_atomic, write_json_atomic  # noqa: E402
+
+PLAYERS = ["AJ", "Himza", "Bir", "Bhavs", "Speirs"]
+
+
+def match_row(writer, i):
+    return {
+        "Date": "01/02/2025", "Time": f"{writer:02d}:{i:02d}", "Pitch": f"Writer {writer}",
+        "Opposition": f"Team {writer}-{i}", "Goals Scored": 2, "Goals Conceded": 1,
+        "Players": ", ".join(PLAYERS), "Scorers": "AJ (2)", "Assists": "Bir (1)",
+    }
+
+
+# ---- workers (module level so they can be spawned) ----
+def save_worker(db_path, writer, saves, start):
+    start.wait()
+    for i in range(saves):
+        match_store.save_match(match_row(writer, i), db_path, new_players=True)
+
+
+def naive_worker(db_path, writer, saves, start):
+    start.wait()
+    for i in range(saves):
+        df = match_store.load_matches(db_path)
+        df = pd.concat([df.astype(object), pd.DataFrame([match_row(writer, i)])], ignore_index=True)
+        match_store.replace_matches(df.fillna(""), db_path, new_players=True)
+
+
+def stale_worker(db_path, writer, saves, start, rejected):
+    start.wait()
+    for i in range(saves):
+        while True:
+            df = match_store.load_matches(db_path)
+            revision = df.attrs["revision"]
+            df = pd.concat([df.astype(object), pd.DataFrame([match_row(writer, i)])], ignore_index=True)
+            try:
+                match_store.replace_matches(df.fillna(""), db_path, expected_revision=revision, new_players=True)
+                break
+            except match_store.StaleWriteError:
+                with rejected.get_lock():
+                    rejected.value += 1  # reload and try again, like a user would
+
+
+def match_reader(db_path, stop, errors, reads):
+    while not stop.is_set():
+        df = match_store.load_matches(db_path)
+        if (df["Players"].astype(str) != ", ".join(PLAYERS)).any():
+            errors.put(f"match without its players ({len(df)} matches)")
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            with match_store._snapshot(conn):
+                n_matches = conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+                games = conn.execute("SELECT COALESCE(MAX(games), 0) FROM team_totals").fetchone()[0]
+        finally:
+            conn.close()
+        if n_matches != games:
+            errors.put(f"aggregates disagree: {n_matches} matches, team_totals.games {games}")
+        with reads.get_lock():
+            reads.value += 1
+
+
+def csv_writer(path, versions, start):
+    start.wait()
+    for version in range(versions):
+        rows = 200 + 37 * (version % 11)
+        write_csv_atomic(pd.DataFrame({"Version": version, "Rows": rows, "Row": range(rows)}), path)
+
+
+def csv_reader(path, stop, errors, reads):
+    while not stop.is_set():
+        try:
+            df = pd.read_csv(path)
+        except Exception as exc:  # noqa: BLE001 - any parse failure is a torn read
+            errors.put(f"unreadable CSV: {exc}")
+            continue
+        if df.empty or df["Version"].nunique() != 1 or len(df) != df["Rows"].iloc[0]:
+            errors.put(f"partial CSV: {len(df)} rows")
+        with reads.get_lock():
+            reads.value += 1
+
+
+def counter_worker(path, increments, start):
+    start.wait()
+    for _ in range(increments):
+        with file_lock(path):
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)["value"]
+            write_json_atomic(path, {"value": value + 1})
+
+
+# ---- harness ----
+def run(start, workers, readers=()):
+    """Start everything, release the writers together and wait for them."""
+    for p in list(readers) + list(workers):
+        p.start()
+    started = time.perf_counter()
+    start.set()
+    for p in workers:
+        p.join()
+    return time.perf_counter() - started
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get())
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--saves", type=int, default=50, help="matches saved per writer")
+    parser.add_argument("--csv-versions", type=int, default=300)
+    args = parser.parse_args()
+    expected = args.writers * args.saves
+
+    ctx = mp.get_context("spawn")
+    workdir = tempfile.mkdtemp(prefix="maradonners_stress_")
+    failures = []
+    try:
+        # -- match saves, with a reader checking snapshots --
+        db = os.path.join(workdir, "saves.db")
+        match_store.connect(db).close()
+        start, stop, errors, reads = ctx.Event(), ctx.Event(), ctx.Queue(), ctx.Value("i", 0)
+        writers = [ctx.Process(target=save_worker, args=(db, w, args.saves, start)) for w in range(args.writers)]
+        reader = ctx.Process(target=match_reader, args=(db, stop, errors, reads))
+        elapsed = run(start, writers, [reader])
+        stop.set()
+        reader.join()
+        saved = len(match_store.load_matches(db))
+        problems = drain(errors)
+        print(f"match saves     {saved}/{expected} saved in {elapsed:.1f}s, {reads.value} reads, "
+              f"{len(problems)} inconsistent")
+        if saved != expected or problems:
+            failures.append(f"match saves: {saved}/{expected}, {problems[:3]}")
+
+        # -- the old read-modify-write save, for comparison --
+        db = os.path.join(workdir, "naive.db")
+        match_store.connect(db).close()
+        start = ctx.Event()
+        writers = [ctx.Process(target=naive_worker, args=(db, w, args.saves, start)) for w in range(args.writers)]
+        elapsed = run(start, writers)
+        saved = len(match_store.load_matches(db))
+        print(f"naive RMW       {saved}/{expected} saved in {elapsed:.1f}s ({expected - saved} lost, not checked)")
+
+        # -- replace_matches with the revision check --
+        db = os.path.join(workdir, "stale.db")
+        match_store.connect(db).close()
+        start, rejected = ctx.Event(), ctx.Value("i", 0)
+        writers = [
+            ctx.Process(target=stale_worker, args=(db, w, args.saves, start, rejected))
+            for w in range(args.writers)
+        ]
+        elapsed = run(start, writers)
+        saved = len(match_store.load_matches(db))
+        print(f"stale replace   {saved}/{expected} saved in {elapsed:.1f}s, {rejected.value} stale writes rejected")
+        if saved != expected:
+            failures.append(f"stale replace: {saved}/{expected}")
+
+        # -- atomic CSV rewrite under concurrent readers --
+        path = os.path.join(workdir, "match_results.csv")
+        write_csv_atomic(pd.DataFrame({"Version": -1, "Rows": 1, "Row": [0]}), path)
+        start, stop, errors, reads = ctx.Event(), ctx.Event(), ctx.Queue(), ctx.Value("i", 0)
+        readers = [ctx.Process(target=csv_reader, args=(path, stop, errors, reads)) for _ in range(2)]
+        writer = ctx.Process(target=csv_writer, args=(path, args.csv_versions, start))
+        elapsed = run(start, [writer], readers)
+        stop.set()
+        for p in readers:
+            p.join()
+        problems = drain(errors)
+        print(f"atomic CSV      {args.csv_versions} rewrites in {elapsed:.1f}s, {reads.value} reads, "
+              f"{len(problems)} torn")
+        if problems:
+            failures.append(f"atomic CSV: {problems[:3]}")
+
+        # -- read-modify-write of a JSON file under file_lock --
+        path = os.path.join(workdir, "counter.json")
+        write_json_atomic(path, {"value": 0})
+        start = ctx.Event()
+        writers = [ctx.Process(target=counter_worker, args=(path, args.saves, start)) for _ in range(args.writers)]
+        elapsed = run(start, writers)
+        with open(path, encoding="utf-8") as f:
+            value = json.load(f)["value"]
+        print(f"locked counter  {value}/{expected} increments in {elapsed:.1f}s")
+        if value != expected:
+            failures.append(f"locked counter: {value}/{expected}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
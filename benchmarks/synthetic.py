@@ -0,0 +1,189 @@
+"""
+Synthetic data for the benchmarks.
+
+  match_history(n_matches, squad_size)  maradonners_fc_results.csv-format
+                                        histories with "Name (N)" strings
+  league_page(n_teams, n_rounds)        spawtz standings pages with an
+                                        STTable and one FTable per date
+
+Everything is seeded, so the same arguments always give the same data.
+"""
+import html
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+
+# Column order of maradonners_fc_results.csv
+LOCAL_CSV_COLUMNS = [
+    "Date", "Time", "Pitch", "Opposition", "Goals Scored", "Goals Conceded",
+    "Players", "Scorers", "Assists", "Missed",
+    "Blue Cards", "Yellow Cards", "Red Cards", "Own Goals"
+]
+
+FIRST_NAMES = [
+    "AJ", "Himza", "Bir", "Bhavs", "Speirs", "Jakes", "Viv", "Minal", "Deelan",
+    "Rush", "Joe", "Sam", "Theo", "Kabelo", "Sipho", "Liam", "Thabo", "Ravi",
+    "Nate", "Omar", "Zane", "Luca", "Yusuf", "Kyle", "Dylan", "Musa", "Ethan",
+    "Tariq", "Jonty", "Pieter", "Lwazi", "Reece",
+]
+
+TEAM_NAMES = [
+    "Maradonners", "Bryte SA", "Yes4Youth", "Sipholile Blues Fc", "Monocle FC",
+    "Stanlib", "DT WASPS", "Black Arrow 5s", "Stoner FC", '"MNS" Attorneys',
+    "Kick Assets", "Net Gains", "Ball Street", "Toe Pokers", "Real Mal Drunk",
+    "Inter Nos", "Sporting Chance", "Dynamo Kyiv Not", "Expected Toulouse", "Lokomotiv Lethargy",
+]
+
+TIMES = ["18:30", "19:20", "20:10", "21:00"]
+
+
+def squad_names(size):
+    """`size` unique names in the squad's style ("Rush B", "Rush N", ...)."""
+    names = []
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    for i in range(size):
+        first = FIRST_NAMES[i % len(FIRST_NAMES)]
+        suffix = i // len(FIRST_NAMES)
+        names.append(first if suffix == 0 else f"{first} {letters[(suffix - 1) % 26]}{'' if suffix <= 26 else suffix}")
+    return names
+
+
+def team_names(count):
+    return [TEAM_NAMES[i] if i < len(TEAM_NAMES) else f"Team {i + 1} FC" for i in range(count)]
+
+
+def _counts_str(counts):
+    return ", ".join(f"{p} ({n})" for p, n in counts.items() if n > 0)
+
+
+def _spread(rng, total, players):
+    counts = {}
+    for _ in range(total):
+        p = rng.choice(players)
+        counts[p] = counts.get(p, 0) + 1
+    return counts
+
+
+def match_history(n_matches, squad_size=13, seed=0, start=date(2020, 1, 2)):
+    """A local match history in the exact CSV format the app writes."""
+    rng = random.Random(seed)
+    squad = squad_names(squad_size)
+    opponents = team_names(20)[1:]
+    lineup_size = min(8, squad_size)
+    rows = []
+
+    for i in range(n_matches):
+        players = rng.sample(squad, lineup_size)
+        scored = rng.choices(range(10), weights=[6, 10, 14, 15, 14, 11, 8, 5, 3, 2])[0]
+        own_goals = _spread(rng, rng.choices([0, 1], weights=[19, 1])[0], players)
+        scorers = _spread(rng, scored, players)
+        assists = _spread(rng, rng.randint(0, scored), players)
+        blue = _spread(rng, rng.choices([0, 1, 2], weights=[16, 3, 1])[0], players)
+        yellow = _spread(rng, rng.choices([0, 1], weights=[9, 1])[0], players)
+        red = _spread(rng, rng.choices([0, 1], weights=[49, 1])[0], players)
+        conceded = rng.choices(range(10), weights=[6, 10, 14, 15, 14, 11, 8, 5, 3, 2])[0]
+
+        rows.append({
+            "Date": (start + timedelta(days=7 * i)).strftime("%d/%m/%Y"),
+            "Time": rng.choice(TIMES),
+            "Pitch": f"Pitch {rng.randint(1, 5)}",
+            "Opposition": rng.choice(opponents),
+            "Goals Scored": scored,
+            "Goals Conceded": conceded + sum(own_goals.values()),  # includes own goals
+            "Players": ", ".join(players),
+            "Scorers": _counts_str(scorers),
+            "Assists": _counts_str(assists),
+            "Missed": ", ".join(p for p in squad if p not in players),
+            "Blue Cards": _counts_str(blue),
+            "Yellow Cards": _counts_str(yellow),
+            "Red Cards": _counts_str(red),
+            "Own Goals": _counts_str(own_goals),
+        })
+
+    return pd.DataFrame(rows, columns=LOCAL_CSV_COLUMNS)
+
+
+def league_fixtures(n_teams, n_rounds, seed=0, start=date(2025, 1, 30), played_rounds=None, live=1):
+    """
+    Round-robin fixtures as the scraper returns them (Date, Time, Pitch,
+    Home Team, Score, Away Team). Rounds after `played_rounds` have no
+    score ("v"); the last `live` played fixtures carry a "LIVE" marker.
+    """
+    rng = random.Random(seed)
+    teams = team_names(n_teams)
+    played_rounds = n_rounds if played_rounds is None else played_rounds
+    rotation = teams[1:]
+    rows = []
+
+    for r in range(n_rounds):
+        day = start + timedelta(days=14 * r)
+        header = f"{day.strftime('%A')} {day.day} {day.strftime('%b %Y')}"
+        lineup = [teams[0]] + rotation
+        rotation = rotation[-1:] + rotation[:-1]
+        for k in range(n_teams // 2):
+            home, away = lineup[k], lineup[-1 - k]
+            if r % 2:
+                home, away = away, home
+            score = f"{rng.randint(0, 12)} - {rng.randint(0, 12)}" if r < played_rounds else "v"
+            rows.append([header, TIMES[k % len(TIMES)], f"Pitch {k % 5 + 1}", home, score, away])
+
+    if live and played_rounds:
+        last_played = [i for i, row in enumerate(rows) if row[4] != "v"][-live:]
+        for i in last_played:
+            rows[i][4] = rows[i][4] + " LIVE"
+
+    return pd.DataFrame(rows, columns=["Date", "Time", "Pitch", "Home Team", "Score", "Away Team"])
+
+
+def standings_from_fixtures(fixtures):
+    """Spawtz-style standings (Team .. Pts) for the played fixtures."""
+    table = {}
+    for _, row in fixtures.iterrows():
+        score = row["Score"].replace("LIVE", "").strip()
+        if " - " not in score:
+            continue
+        home_goals, away_goals = (int(x) for x in score.split(" - "))
+        for team, gf, ga in ((row["Home Team"], home_goals, away_goals), (row["Away Team"], away_goals, home_goals)):
+            t = table.setdefault(team, dict(Pld=0, W=0, L=0, D=0, FF=0, FA=0, F=0, A=0, Dif=0, B=0, Pts=0))
+            t["Pld"] += 1
+            t["F"] += gf
+            t["A"] += ga
+            t["Dif"] += gf - ga
+            if gf > ga:
+                t["W"] += 1
+                t["Pts"] += 3
+            elif gf == ga:
+                t["D"] += 1
+                t["Pts"] += 1
+            else:
+                t["L"] += 1
+    df = pd.DataFrame.from_dict(table, orient="index").rename_axis("Team").reset_index()
+    return df.sort_values(["Pts", "Dif", "F", "Team"], ascending=[False, False, False, True]).reset_index(drop=True)
+
+
+def league_page(n_teams=10, n_rounds=9, seed=0, played_rounds=None, chrome_blocks=0, live=1):
+    """A spawtz standings page in the STTable/FTable layout."""
+    fixtures = league_fixtures(n_teams, n_rounds, seed=seed, played_rounds=played_rounds, live=live)
+    standings = standings_from_fixtures(fixtures)
+    e = html.escape
+
+    out = ["<!DOCTYPE html>", "<html>", '<head><meta charset="utf-8"><title>Standings</title></head>', "<body>"]
+    out += [
+        f'<div class="nav"><ul><li><a href="/l/{i}">League {i}</a></li></ul>'
+        f'<script>var x{i} = {{"id": {i}}};</script></div>'
+        for i in range(chrome_blocks)
+    ]
+    out.append('<table class="STTable">')
+    out.append('  <tr class="STHeader"><td></td>' + "".join(f"<td>{c}</td>" for c in standings.columns) + "</tr>")
+    for position, row in enumerate(standings.itertuples(index=False), start=1):
+        out.append(f'  <tr class="STRow"><td>{position}</td>' + "".join(f"<td>{e(str(v))}</td>" for v in row) + "</tr>")
+    out.append("</table>")
+    for day, rounds in fixtures.groupby("Date", sort=False):
+        out.append('<table class="FTable">')
+        out.append(f'  <tr class="FHeader"><td colspan="5">{e(day)}</td></tr>')
+        for row in rounds.itertuples(index=False):
+            out.append('  <tr class="FRow">' + "".join(f"<td>{e(str(v))}</td>" for v in row[1:]) + "</tr>")
+        out.append("</table>")
+    out += ["</body>", "</html>", ""]
+    return "\n".join(out)
@@ -0,0 +1,101 @@
+"""
+Local HTTP stand-in for the spawtz standings site.
+
+Serves fixtures/spawtz/division_<DivisionId>.html at /Leagues/Standings
+with ETag and Last-Modified headers and answers conditional GETs with
+304, so the scraper can be exercised offline:
+
+    python fixtures/standin_server.py --port 8765
+    # scraper.scrape_targets(..., base_url="http://127.0.0.1:8765/Leagues/Standings")
+
+--fail N makes the first N requests for each page return 503 to
+exercise the retry/backoff path; --delay adds latency per request.
+"""
+import argparse
+import hashlib
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "spawtz")
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    pages_dir = PAGES_DIR
+    fail_first = 0
+    delay = 0.0
+    failures = {}
+    requests_seen = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        division = parse_qs(url.query).get("DivisionId", [""])[0]
+        path = os.path.join(self.pages_dir, f"division_{division}.html")
+        type(self).requests_seen.append((division, self.headers.get("If-None-Match")))
+
+        if self.delay:
+            time.sleep(self.delay)
+        if url.path != "/Leagues/Standings" or not os.path.exists(path):
+            self.send_error(404)
+            return
+
+        seen = self.failures.get(division, 0)
+        if seen < self.fail_first:
+            self.failures[division] = seen + 1
+            self.send_error(503)
+            return
+
+        with open(path, "rb") as f:
+            body = f.read()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        mtime = int(os.path.getmtime(path))
+        last_modified = formatdate(mtime, usegmt=True)
+
+        if self.headers.get("If-None-Match") == etag or (
+            "If-None-Match" not in self.headers
+            and self.headers.get("If-Modified-Since")
+            and parsedate_to_datetime(self.headers["If-Modified-Since"]).timestamp() >= mtime
+        ):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(port=0, pages_dir=PAGES_DIR, fail_first=0, delay=0.0):
+    """Start the stand-in in a daemon thread; returns (server, standings_url)."""
+    handler = type("Handler", (StandinHandler,), {
+        "pages_dir": pages_dir, "fail_first": fail_first, "delay": delay,
+        "failures": {}, "requests_seen": [],
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/Leagues/Standings"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local spawtz stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail", type=int, default=0)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    server, url = start(args.port, fail_first=args.fail, delay=args.delay)
+    print(f"Serving {PAGES_DIR} at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,15 @@
+"""
+Maradonners FC core library.
+
+Data storage, league scraping and stats, usable without Streamlit:
+
+    from maradonners import core
+    core.compute_local_stats(core.load_local_data())
+
+or from the command line:
+
+    python -m maradonners stats --json
+
+Submodules are imported on demand, so importing the package is cheap
+and only the scrape path loads requests / BeautifulSoup.
+"""
@@ -0,0 +1,151 @@
+import pandas as pd
+
+from .stats_engine import STAT_COLUMNS, squad_with
+
+# --------------------------------------------------------------------
+#                 MATERIALIZED PLAYER & TEAM AGGREGATES
+# --------------------------------------------------------------------
+# Running totals kept in the match database next to the event tables.
+# Saving a match adds only that match's delta; editing or deleting past
+# matches triggers a rebuild of that team. Totals are kept per team and
+# keyed on player IDs; the Stats tab reads one team's rows directly, so
+# its cost does not grow with the match history or the number of teams.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_totals (
+    team_id   INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    stat      TEXT NOT NULL,
+    count     INTEGER NOT NULL,
+    PRIMARY KEY (team_id, player_id, stat)
+);
+
+CREATE TABLE IF NOT EXISTS team_totals (
+    team_id        INTEGER PRIMARY KEY,
+    games          INTEGER NOT NULL,
+    goals_scored   INTEGER NOT NULL,
+    goals_conceded INTEGER NOT NULL,
+    points         INTEGER NOT NULL,
+    wins           INTEGER NOT NULL,
+    clean_sheets   INTEGER NOT NULL
+);
+"""
+
+# Bump when the aggregate definitions change to force a rebuild
+AGGREGATES_VERSION = "2"
+
+
+def apply_delta(conn, first_match_id, team_id=None):
+    """
+    Fold every match with id >= first_match_id (of team_id, or of every
+    team) into the running totals. Must run inside the transaction that
+    inserted those matches.
+    """
+    params = {"first": first_match_id, "team": team_id}
+    conn.execute(
+        """
+        INSERT INTO player_totals (team_id, player_id, stat, count)
+        SELECT team_id, player_id, stat, SUM(count) FROM (
+            SELECT m.team_id, a.player_id,
+                   CASE a.played WHEN 1 THEN 'Appearances' ELSE 'Missed Games' END AS stat,
+                   1 AS count
+            FROM appearances a JOIN matches m ON m.id = a.match_id
+            WHERE a.match_id >= :first AND (:team IS NULL OR m.team_id = :team)
+            UNION ALL
+            SELECT m.team_id, e.player_id, e.stat, e.count
+            FROM player_events e JOIN matches m ON m.id = e.match_id
+            WHERE e.match_id >= :first AND (:team IS NULL OR m.team_id = :team)
+        ) WHERE true
+        GROUP BY team_id, player_id, stat
+        ON CONFLICT (team_id, player_id, stat) DO UPDATE SET count = count + excluded.count
+        """,
+        params,
+    )
+    conn.execute(
+        """
+        INSERT INTO team_totals (team_id, games, goals_scored, goals_conceded, points, wins, clean_sheets)
+        SELECT team_id,
+               COUNT(*),
+               COALESCE(SUM(gs), 0),
+               COALESCE(SUM(gc), 0),
+               COALESCE(SUM(CASE WHEN gs > gc THEN 3 WHEN gs = gc THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(gs > gc), 0),
+               COALESCE(SUM(gc = 0), 0)
+        FROM (
+            SELECT team_id, COALESCE(goals_scored, 0) AS gs, COALESCE(goals_conceded, 0) AS gc
+            FROM matches WHERE id >= :first AND (:team IS NULL OR team_id = :team)
+        ) WHERE true
+        GROUP BY team_id
+        ON CONFLICT (team_id) DO UPDATE SET
+            games          = games + excluded.games,
+            goals_scored   = goals_scored + excluded.goals_scored,
+            goals_conceded = goals_conceded + excluded.goals_conceded,
+            points         = points + excluded.points,
+            wins           = wins + excluded.wins,
+            clean_sheets   = clean_sheets + excluded.clean_sheets
+        """,
+        params,
+    )
+
+
+def rebuild(conn, team_id=None):
+    """Recompute a team's totals (or everyone's) from scratch. Must run inside a transaction."""
+    conn.execute("DELETE FROM player_totals WHERE :team IS NULL OR team_id = :team", {"team": team_id})
+    conn.execute("DELETE FROM team_totals WHERE :team IS NULL OR team_id = :team", {"team": team_id})
+    apply_delta(conn, 0, team_id)
+    conn.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES ('aggregates_version', ?)",
+        (AGGREGATES_VERSION,),
+    )
+
+
+def ensure_built(conn):
+    """Rebuild once for databases created before these aggregates (or this version of them) existed."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'aggregates_version'").fetchone()
+    if row is None or row[0] != AGGREGATES_VERSION:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Earlier versions had other keys: recreate the tables
+            conn.execute("DROP TABLE IF EXISTS player_totals")
+            conn.execute("DROP TABLE IF EXISTS team_totals")
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            rebuild(conn)
+
+
+def player_stats(conn, team_id, squad, names):
+    """
+    Player stats table in the same shape as compute_local_stats(): the
+    squad's player IDs, then anyone else with totals for the team, shown
+    by name (names: {player_id: name}).
+    """
+    totals = pd.read_sql_query(
+        "SELECT player_id, stat, count FROM player_totals WHERE team_id = ?", conn, params=(team_id,)
+    )
+    counts = totals.pivot(index="player_id", columns="stat", values="count")
+    counts = counts.reindex(index=squad_with(squad, counts.index), columns=STAT_COLUMNS).fillna(0).astype("int64")
+    counts.columns.name = None
+    counts.index = pd.Index([names[i] for i in counts.index], name="Player")
+    return counts.reset_index()
+
+
+def team_metrics(conn, team_id):
+    """Team metrics dict in the same shape as compute_team_metrics()."""
+    row = conn.execute(
+        "SELECT games, goals_scored, goals_conceded, points, wins, clean_sheets"
+        " FROM team_totals WHERE team_id = ?",
+        (team_id,),
+    ).fetchone()
+    games, scored, conceded, points, wins, clean_sheets = row or (0, 0, 0, 0, 0, 0)
+
+    return {
+        "Total Games": int(games),
+        "Total Goals Scored": int(scored),
+        "Total Goals Conceded": int(conceded),
+        "Total Points": int(points),
+        "Avg Goals Scored": round(scored / games, 2) if games > 0 else 0,
+        "Avg Goals Conceded": round(conceded / games, 2) if games > 0 else 0,
+        "Win Rate": round(wins / games * 100, 2) if games > 0 else 0,
+        "Clean Sheets": int(clean_sheets)
+    }
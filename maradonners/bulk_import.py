@@ -0,0 +1,277 @@
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from . import match_store
+from .fileio import write_csv_atomic
+from .match_store import LOCAL_COLUMNS
+from .roster import DEFAULT_TEAM_ID, name_key, season_labels
+from .stats_engine import EVENT_COLUMNS, NAME_LIST_COLUMNS, explode_events
+
+# --------------------------------------------------------------------
+#                 STREAMING BULK IMPORT WITH VALIDATION
+# --------------------------------------------------------------------
+# Backfills (CSV, or JSONL with one match per line) are read CHUNK_SIZE
+# rows at a time, so memory stays flat however long the file is. Each
+# chunk is checked with the Enter Match Results rules, vectorized over
+# the whole chunk through the exploded event table:
+#   - a parseable date and score ("4 - 3" in Score, or Goals Scored /
+#     Goals Conceded); own goals are folded into Goals Conceded for Score
+#     rows, exactly like the form does
+#   - player goals add up to Goals Scored
+#   - 1..MAX_PLAYERS players, all known to the roster (by any alias) and
+#     in one of the team's squads (if it has any yet), nobody both in
+#     Players and Missed, and contributions only from players who
+#     played. An unknown name is rejected rather than made into a new
+#     player; the summary lists them so they can be added (or aliased)
+#     and the rejected rows imported again
+#   - every "Name (N)" entry parses
+# Accepted rows of a chunk are written in one transaction together with
+# the import's progress, so an interrupted import resumes where it
+# stopped. Rejected rows go to a CSV report with their line number and
+# the reasons; a resumed import first drops the report rows of the chunk
+# that was interrupted, which is read again.
+
+CHUNK_SIZE = 5000
+MAX_PLAYERS = 8
+
+SCORE_PATTERN = r"^\s*(\d+)\s*-\s*(\d+)\s*$"
+
+# Input columns carried into the rejected-rows report
+REPORT_COLUMNS = ["Line", "Reason", "Score"] + LOCAL_COLUMNS
+
+CONTRIBUTION_COLUMNS = [c for c in EVENT_COLUMNS if c not in NAME_LIST_COLUMNS]
+
+ImportSummary = namedtuple(
+    "ImportSummary", ["read", "imported", "rejected", "skipped", "report_path", "unknown_players"],
+)
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE, skip=0):
+    """Yield DataFrames of at most chunk_size records, all values as strings."""
+    if path.endswith((".jsonl", ".ndjson")):
+        with pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False) as reader:
+            for chunk in reader:
+                if skip >= len(chunk):
+                    skip -= len(chunk)
+                    continue
+                yield chunk.iloc[skip:].astype(object).where(chunk.iloc[skip:].notna(), "").astype(str)
+                skip = 0
+    else:
+        with pd.read_csv(
+            path, chunksize=chunk_size, dtype=str, keep_default_na=False, skiprows=range(1, skip + 1),
+        ) as reader:
+            yield from reader
+
+
+def _names(values):
+    """', '.join of the distinct names in a group, in first-seen order."""
+    return ", ".join(dict.fromkeys(values))
+
+
+def _per_match(events, mask, message):
+    """'<message>: A, B' for every match with events matching `mask`."""
+    flagged = events.loc[mask, ["Match", "Player"]]
+    if flagged.empty:
+        return pd.Series(dtype=object)
+    names = flagged["Player"].astype(str).groupby(flagged["Match"]).agg(_names)
+    return message + ": " + names
+
+
+def _flag(mask, message):
+    """`message` (a string or per-row Series) where mask is True, NaN elsewhere."""
+    mask = pd.Series(np.asarray(mask, dtype=bool))
+    message = message if isinstance(message, pd.Series) else pd.Series(message, index=mask.index)
+    return message.where(mask)
+
+
+def validate_chunk(chunk, roster=None, team_id=DEFAULT_TEAM_ID, max_players=MAX_PLAYERS, check_squad=True):
+    """
+    (accepted, rejected): accepted rows in the local match format, and the
+    rejected input rows with a Reason column. Row labels are kept. With a
+    roster, every name must resolve to a player (the unknown ones are in
+    rejected.attrs["unknown_players"]), players must belong to the team
+    unless not check_squad or the team has no squad yet, and a blank
+    Missed is filled with the rest of that season's squad.
+    """
+    n = len(chunk)
+    text = chunk.reindex(columns=list(dict.fromkeys(["Score"] + LOCAL_COLUMNS)), fill_value="")
+    text = text.astype(object).fillna("").astype(str).apply(lambda s: s.str.strip())
+    text.index = pd.RangeIndex(n)  # explode_events numbers matches by position
+    # A bare "0" in a contribution column means "nobody" (the legacy CSV writes it)
+    text[CONTRIBUTION_COLUMNS] = text[CONTRIBUTION_COLUMNS].replace("0", "")
+    reasons = []
+
+    # ---- date: dd/mm/YYYY, or ISO from JSON exports ----
+    dates = pd.to_datetime(text["Date"], format="%d/%m/%Y", errors="coerce")
+    dates = dates.fillna(pd.to_datetime(text["Date"], format="%Y-%m-%d", errors="coerce"))
+    reasons.append(_flag(dates.isna(), "bad date '" + text["Date"] + "'"))
+
+    # ---- exploded players & contributions ----
+    events = explode_events(text.drop(columns="Score"))
+    goals = events["Stat"] == "Goals"
+    own = events["Stat"] == "Own Goals"
+    played = events["Stat"] == "Appearances"
+    missed = events["Stat"] == "Missed Games"
+    contribution = ~(played | missed)
+    count_of = lambda mask: np.bincount(events.loc[mask, "Match"], events.loc[mask, "Count"], n)  # noqa: E731
+    player_goals = count_of(goals).astype(np.int64)
+    own_goals = count_of(own).astype(np.int64)
+
+    # ---- score: "4 - 3" (form style) or stored Goals Scored / Conceded ----
+    score = text["Score"].str.extract(SCORE_PATTERN).apply(pd.to_numeric).to_numpy(dtype="float64")
+    has_score = (text["Score"] != "").to_numpy()
+    stored = text[["Goals Scored", "Goals Conceded"]].apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+    stored_ok = (stored >= 0).all(axis=1) & (stored == np.floor(stored)).all(axis=1)
+    scored = np.where(has_score, score[:, 0], stored[:, 0])
+    conceded = np.where(has_score, score[:, 1] + own_goals, stored[:, 1])
+    bad_score = np.where(has_score, np.isnan(score).any(axis=1), ~stored_ok)
+    reasons.append(_flag(bad_score, "bad score"))
+    reasons.append(_flag(
+        ~bad_score & (player_goals != np.nan_to_num(scored)),
+        "player goals (" + pd.Series(player_goals).astype(str) + ") != goals scored ("
+        + pd.Series(np.nan_to_num(scored)).astype(np.int64).astype(str) + ")",
+    ))
+    reasons.append(_flag(~has_score & ~bad_score & (own_goals > np.nan_to_num(conceded)),
+                         "own goals exceed goals conceded"))
+
+    # ---- line-up ----
+    n_played = np.bincount(events.loc[played, "Match"], minlength=n)
+    reasons.append(_flag(n_played == 0, "no players"))
+    reasons.append(_flag(n_played > max_players, f"more than {max_players} players"))
+    # Player category codes act as IDs: (match, player) pairs become integers
+    categories = events["Player"].cat.categories
+    codes = events["Player"].cat.codes.to_numpy(dtype=np.int64)
+    unknown = []
+    if roster is not None:
+        ids = [roster.player_id(name) for name in categories]
+        known = np.array([player_id is not None for player_id in ids], dtype=bool)
+        unknown = [name for name, player_id in zip(categories, ids) if player_id is None]
+        reasons.append(_per_match(events, ~known[codes], "unknown player"))
+        members = set(roster.squad(team_id)) if check_squad else set()
+        # A new team has no squad to check against yet: its backfill builds it
+        if members:
+            in_squad = np.array([player_id in members for player_id in ids], dtype=bool)
+            reasons.append(_per_match(events, known[codes] & ~in_squad[codes], "not in squad"))
+        # Two spellings of one player are the same player: compare roster IDs
+        identity, _ = pd.factorize(pd.Series(
+            [f"id:{player_id}" if player_id is not None else f"name:{name_key(name)}"
+             for player_id, name in zip(ids, categories)],
+            dtype=object,
+        ))
+        codes = identity.astype(np.int64)[codes]
+    keys = events["Match"].to_numpy(dtype=np.int64) * len(categories) + codes
+    did_play = np.isin(keys, keys[played.to_numpy()])
+    reasons.append(_per_match(events, missed.to_numpy() & did_play, "in Players and Missed"))
+    reasons.append(_per_match(events, contribution.to_numpy() & ~did_play, "contributions but not in Players"))
+    reasons.append(_per_match(events, (events["Count"] < 0).to_numpy(), "negative count"))
+
+    # ---- entries explode_events could not parse ----
+    contributions = text[CONTRIBUTION_COLUMNS]
+    raw_entries = sum(
+        np.where(contributions[c] == "", 0, contributions[c].str.count(", ") + 1) for c in CONTRIBUTION_COLUMNS
+    )
+    parsed_entries = np.bincount(events.loc[contribution, "Match"], minlength=n)
+    reasons.append(_flag(raw_entries != parsed_entries, 'unparseable "Name (N)" entry'))
+
+    why = pd.concat([r.reindex(text.index) for r in reasons], axis=1, ignore_index=True).stack().dropna()
+    why = why.groupby(level=0).agg("; ".join).reindex(text.index)
+    bad = why.notna().to_numpy()
+
+    # A rejected-rows report can be imported again once it is fixed: its old Line and Reason go
+    rejected = chunk.iloc[bad].drop(columns=["Line", "Reason"], errors="ignore")
+    rejected.insert(0, "Reason", why[bad].to_numpy())
+    rejected.attrs["unknown_players"] = unknown
+
+    accepted = text.iloc[~bad].drop(columns="Score").set_axis(chunk.index[~bad])
+    accepted["Date"] = dates[~bad].dt.strftime("%d/%m/%Y").to_numpy()
+    accepted["Goals Scored"] = scored[~bad].astype(np.int64)
+    accepted["Goals Conceded"] = conceded[~bad].astype(np.int64)
+    if roster is not None:
+        # Like the form: everyone in the season's squad who did not play missed it
+        blank = (accepted["Missed"] == "").to_numpy()
+        seasons = season_labels(dates[~bad][blank])
+        squads = {season: roster.squad(team_id, season) for season in set(seasons)}
+        missed = []
+        for players, season in zip(accepted.loc[blank, "Players"], seasons):
+            lineup = {roster.player_id(p) for p in players.split(", ")}
+            missed.append(", ".join(roster.name(i) for i in squads[season] if i not in lineup))
+        accepted.loc[blank, "Missed"] = missed
+    return accepted, rejected
+
+
+def _migrated(conn, path):
+    """True if the legacy CSV migration already brought this file in (by content; by path in older databases)."""
+    keys = (match_store.migration_key(path), "migrated_csv:" + os.path.abspath(path))
+    return any(match_store.get_meta(conn, key) is not None for key in keys)
+
+
+def import_matches(path, db_path, roster=None, team_id=DEFAULT_TEAM_ID, chunk_size=CHUNK_SIZE, report_path=None,
+                   force=False, check_squad=True):
+    """
+    Stream `path` (.csv, or .jsonl / .ndjson) into a team's matches.
+    Players must be in the roster (read from the database if not given)
+    and, unless not check_squad, in the team's squads.
+    Resumes an interrupted import of the same file unless force=True;
+    a completed file is skipped unless force=True. Rejected rows are
+    written to report_path (default: "<path>.rejected.csv").
+    """
+    source = os.path.abspath(path)
+    report_path = report_path or os.path.splitext(path)[0] + ".rejected.csv"
+    line_offset = 1 if path.endswith((".jsonl", ".ndjson")) else 2  # 1-based, after the CSV header
+    progress_key = f"import:{source}" if team_id == DEFAULT_TEAM_ID else f"import:{team_id}:{source}"
+
+    if roster is None:
+        roster = match_store.load_roster(db_path)
+    unknown = {}
+    conn = match_store.connect(db_path)
+    try:
+        progress = match_store.get_meta(conn, progress_key)
+        progress = json.loads(progress) if progress else {"read": 0, "imported": 0, "rejected": 0}
+        if force or not os.path.exists(path):
+            progress = {"read": 0, "imported": 0, "rejected": 0}
+        elif progress.get("complete") or _migrated(conn, path):
+            return ImportSummary(0, 0, 0, progress["read"], report_path, [])
+
+        skipped = progress["read"]
+        if skipped == 0 and os.path.exists(report_path):
+            os.remove(report_path)
+        elif os.path.exists(report_path):
+            # Rows reported before a crash, for a chunk that never committed
+            report = pd.read_csv(report_path, dtype=str, keep_default_na=False)
+            kept = report[pd.to_numeric(report["Line"]) < skipped + line_offset]
+            if len(kept) < len(report):
+                write_csv_atomic(kept, report_path)
+        totals = {"read": 0, "imported": 0, "rejected": 0}
+        for chunk in read_chunks(path, chunk_size, skip=skipped):
+            start = progress["read"]
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            accepted, rejected = validate_chunk(chunk, roster, team_id, check_squad=check_squad)
+            unknown.update(dict.fromkeys(rejected.attrs["unknown_players"]))
+
+            if not rejected.empty:
+                report = rejected.reindex(columns=REPORT_COLUMNS, fill_value="")
+                report["Line"] = rejected.index + line_offset
+                report.to_csv(report_path, mode="a", header=not os.path.exists(report_path), index=False)
+
+            progress = {
+                "read": start + len(chunk),
+                "imported": progress["imported"] + len(accepted),
+                "rejected": progress["rejected"] + len(rejected),
+            }
+            match_store.append_batch(conn, accepted, {progress_key: json.dumps(progress)}, team_id)
+            totals["read"] += len(chunk)
+            totals["imported"] += len(accepted)
+            totals["rejected"] += len(rejected)
+
+        progress["complete"] = True
+        match_store.append_batch(conn, None, {progress_key: json.dumps(progress)})
+    finally:
+        conn.close()
+    return ImportSummary(
+        totals["read"], totals["imported"], totals["rejected"], skipped,
+        report_path if progress["rejected"] else None, list(unknown),
+    )
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import pandas as pd
+
+from . import instrument
+
+# --------------------------------------------------------------------
+#              FILE-KEYED LRU CACHE FOR LOADERS AND STATS
+# --------------------------------------------------------------------
+# Streamlit re-runs app.py on every widget change. Loaders are cached on
+# (path, mtime, size) of the files they read, and stats functions on a
+# content hash of the DataFrame they receive, so a rerun that did not
+# touch the data costs a dictionary lookup. Writers call invalidate()
+# so changes show up immediately even on coarse-mtime filesystems.
+# The cache lives in this module, which Streamlit imports only once per
+# process, so it is shared by every session.
+
+MAX_ENTRIES = 64
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+_counters = {}
+
+
+def file_signature(paths):
+    """(path, mtime_ns, size) for each path; missing files give None."""
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def frame_signature(value):
+    """Cheap content key for DataFrame arguments (row order counts: streaks and form depend on it)."""
+    if isinstance(value, pd.DataFrame):
+        try:
+            hashed = pd.util.hash_pandas_object(value, index=False)
+        except TypeError:
+            hashed = pd.util.hash_pandas_object(value.astype(str), index=False)
+        digest = hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()
+        return ("frame", tuple(value.columns), len(value), digest)
+    return value
+
+
+def _copy(value):
+    # Callers mutate what they get back (index shifts, inplace drops), including
+    # the frames inside a dict result (charts add columns to analytics["series"])
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    if isinstance(value, tuple):
+        items = [_copy(v) for v in value]
+        return type(value)(*items) if hasattr(value, "_fields") else tuple(items)
+    return value
+
+
+def _count(name, outcome):
+    counter = _counters.setdefault(name, {"hits": 0, "misses": 0})
+    counter[outcome] += 1
+
+
+def _lookup(name, key, paths, compute):
+    with _lock:
+        if key in _entries:
+            _entries.move_to_end(key)
+            _count(name, "hits")
+            instrument.annotate(cache="hit")
+            return _copy(_entries[key][1])
+
+    value = compute()
+
+    with _lock:
+        _count(name, "misses")
+        _entries[key] = (paths, value)
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+    instrument.annotate(cache="miss")
+    return _copy(value)
+
+
+def cached_on_files(*paths):
+    """Cache a loader until one of `paths` changes on disk."""
+    def decorator(func):
+        name = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name, paths, file_signature(paths), args, tuple(sorted(kwargs.items())))
+            return _lookup(name, key, paths, lambda: func(*args, **kwargs))
+
+        return wrapper
+    return decorator
+
+
+def cached_on_frames(func):
+    """Cache a function of DataFrames on the content of its arguments."""
+    name = func.__qualname__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (
+            name,
+            tuple(frame_signature(a) for a in args),
+            tuple((k, frame_signature(v)) for k, v in sorted(kwargs.items())),
+        )
+        return _lookup(name, key, (), lambda: func(*args, **kwargs))
+
+    return wrapper
+
+
+def invalidate(path=None):
+    """Drop entries that read `path`, or everything if no path is given."""
+    with _lock:
+        if path is None:
+            _entries.clear()
+            return
+        for key in [k for k, (paths, _) in _entries.items() if path in paths]:
+            del _entries[key]
+
+
+def stats():
+    """Hit/miss counters per cached function."""
+    with _lock:
+        return {name: dict(counter) for name, counter in _counters.items()}
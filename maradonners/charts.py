@@ -0,0 +1,374 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+from .config import CHART_CACHE_DIR, CHART_CACHE_MAX_BYTES, CHART_MEMORY_ITEMS, CHART_WORKERS, OUR_TEAM
+from .fileio import write_atomic
+from .stats_engine import explode_events
+from .team_analytics import date_order, team_analytics
+
+# --------------------------------------------------------------------
+#                  CACHED SERVER-SIDE CHART RENDERING
+# --------------------------------------------------------------------
+# A chart is a kind, a few options and the small table it plots (built
+# here with vectorized pandas from the match table or the standings
+# history). Its PNG is cached under a SHA-256 of (kind, options, table
+# content), in memory (an LRU of CHART_MEMORY_ITEMS images) and on disk
+# in CHART_CACHE_DIR (LRU by file mtime, trimmed to CHART_CACHE_MAX_BYTES
+# and shared with other processes), so a rerun costs hashing a few
+# hundred numbers and a lookup. A chart whose table did not change keeps
+# its key, so a new match re-renders only the charts that plot it.
+# Misses are drawn together in a process pool (matplotlib is not
+# thread-safe), with the Figure API so no pyplot state is involved.
+
+# Part of every key: bump when a drawer changes so old images are not reused
+CHART_VERSION = 1
+DPI = 100
+FIGSIZE = (8, 3.6)
+TOP_SCORERS = 6  # players drawn in "cumulative goals"
+
+Chart = namedtuple("Chart", ["kind", "data", "options"], defaults=({},))
+
+
+# --------------------------------------------------------------------
+#                         CHART DATA
+# --------------------------------------------------------------------
+def player_goals_data(df, top=TOP_SCORERS):
+    """Cumulative goals of the `top` scorers after each match (dates x players)."""
+    order, dates = date_order(df)
+    events = explode_events(df)
+    goals = events[events["Stat"] == "Goals"]
+    players = goals["Player"].cat.remove_unused_categories()
+    # (match, player) goal matrix from the exploded events, no pivot
+    matrix = np.zeros((len(df), len(players.cat.categories)), dtype=np.int64)
+    np.add.at(matrix, (goals["Match"].to_numpy(), players.cat.codes.to_numpy()), goals["Count"].to_numpy())
+    totals = matrix.sum(axis=0)
+    # Most goals first, ties by name, so the line-up (and the key) is stable
+    best = np.lexsort((players.cat.categories.to_numpy(dtype=str), -totals))[:top]
+    best = best[totals[best] > 0]
+    per_match = matrix[order][:, best]
+    # Only matches where one of them scored: the step lines look the same,
+    # and a match without their goals leaves the chart (and its key) alone
+    scored = per_match.any(axis=1)
+    return pd.DataFrame(
+        np.cumsum(per_match, axis=0)[scored], index=pd.Index(dates.to_numpy()[order][scored], name="Date"),
+        columns=players.cat.categories[best].astype(object),
+    )
+
+
+def positions_data(history):
+    """League position of every team at each recorded standings change (times x teams)."""
+    positions = history.pivot_table(index="Taken At", columns="Team", values="Position", observed=True)
+    positions.index = pd.to_datetime(positions.index, utc=True).tz_localize(None)
+    positions.columns = positions.columns.astype(object)
+    return positions
+
+
+def season_charts(df):
+    """The Stats tab's season-trend charts for a match table: {name: Chart}."""
+    series = team_analytics(df)["series"]  # date-ordered goals and running totals
+    return {
+        "points": Chart("points", series.set_index("Date")[["Cumulative Points", "Cumulative Goal Difference"]]),
+        "goals": Chart("goals", series[["Date", "Goals Scored", "Goals Conceded"]]),
+        "player_goals": Chart("player_goals", player_goals_data(df)),
+    }
+
+
+def standings_charts(history, team=OUR_TEAM):
+    return {"positions": Chart("positions", positions_data(history), {"team": team})}
+
+
+def heatmap_chart(matrix, title, cmap="viridis", fmt="{:.0f}"):
+    """A players x players table (see partnerships) as a heatmap Chart."""
+    return Chart("heatmap", matrix, {"title": title, "cmap": cmap, "fmt": fmt})
+
+
+# --------------------------------------------------------------------
+#                            DRAWING
+# --------------------------------------------------------------------
+def _date_axis(ax):
+    from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+
+    locator = AutoDateLocator(maxticks=8)
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+
+
+def _draw_points(ax, data, options):
+    ax.plot(data.index, data["Cumulative Points"], label="Points", color="tab:blue")
+    ax.plot(data.index, data["Cumulative Goal Difference"], label="Goal difference", color="tab:orange")
+    ax.axhline(0, color="grey", linewidth=0.5)
+    _date_axis(ax)
+    ax.set_title("Points over time")
+    ax.legend(loc="upper left")
+
+
+def _draw_goals(ax, data, options):
+    x = np.arange(len(data))
+    # One LineCollection per side instead of a Rectangle per bar (ax.bar
+    # takes seconds for a few thousand matches); widths fill ~80% of a slot
+    width = max(0.5, 0.8 * FIGSIZE[0] * 72 / max(len(x), 1))
+    ax.vlines(x, 0, data["Goals Scored"], color="tab:green", linewidth=width, capstyle="butt", label="Scored")
+    ax.vlines(x, -data["Goals Conceded"], 0, color="tab:red", linewidth=width, capstyle="butt", label="Conceded")
+    ax.set_xlim(-1, len(x))
+    ax.axhline(0, color="grey", linewidth=0.5)
+    from matplotlib.ticker import MaxNLocator
+
+    # About six date labels whatever the number of matches
+    ticks = x[:: max(1, -(-len(x) // 6))]
+    ax.set_xticks(ticks, labels=[d.strftime("%d %b %y") if pd.notna(d) else "" for d in data["Date"].iloc[ticks]])
+    ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+    ax.yaxis.set_major_formatter(lambda value, _: f"{abs(value):.0f}")
+    ax.set_title("Goals for / against per match")
+    legend = ax.legend(loc="upper left")
+    for handle in legend.legend_handles:
+        handle.set_linewidth(6)
+
+
+def _draw_player_goals(ax, data, options):
+    for player in data.columns:
+        ax.step(data.index, data[player], where="post", label=player)
+    _date_axis(ax)
+    ax.set_title("Cumulative goals (top scorers)")
+    if len(data.columns):
+        ax.legend(loc="upper left", fontsize=8)
+
+
+def _draw_player_trend(ax, data, options):
+    for column in data.columns:
+        ax.step(data.index, data[column], where="post", label=column, marker="o", markersize=3)
+    if data.index.nunique() == 1:  # one match: give the date axis a range to tick
+        ax.set_xlim(data.index[0] - pd.Timedelta(days=7), data.index[0] + pd.Timedelta(days=7))
+    _date_axis(ax)
+    ax.set_title(f"{options.get('player', '')}: cumulative contributions".strip(": "))
+    ax.legend(loc="upper left", fontsize=8)
+
+
+def _draw_positions(ax, data, options):
+    team = options.get("team", "")
+    for name in data.columns:
+        ours = team and team in str(name)
+        ax.plot(data.index, data[name], marker="o", markersize=3, label=name,
+                linewidth=2.5 if ours else 1, zorder=3 if ours else 2)
+    ax.invert_yaxis()
+    _date_axis(ax)
+    if len(data.columns):
+        ax.set_yticks(range(1, len(data.columns) + 1))
+    ax.set_ylabel("Position")
+    ax.set_title("Standings position over time")
+    ax.legend(loc="center left", bbox_to_anchor=(1.0, 0.5), fontsize=7)
+
+
+def _draw_heatmap(ax, data, options):
+    # Square, and growing with the squad so every name stays readable
+    size = max(4.0, 0.45 * len(data) + 1.5)
+    ax.figure.set_size_inches(size, size * 0.85)
+    values = data.to_numpy(dtype=float)
+    image = ax.imshow(values, cmap=options.get("cmap", "viridis"))
+    ax.set_xticks(range(len(data.columns)), labels=data.columns, rotation=90)
+    ax.set_yticks(range(len(data.index)), labels=data.index)
+    if len(data) <= 20:
+        fmt = options.get("fmt", "{:.0f}")
+        for (i, j), value in np.ndenumerate(values):
+            if not np.isnan(value):
+                ax.text(j, i, fmt.format(value), ha="center", va="center", fontsize=7, color="w")
+    ax.set_title(options.get("title", ""))
+    ax.figure.colorbar(image, ax=ax, shrink=0.8)
+
+
+DRAWERS = {
+    "points": _draw_points,
+    "goals": _draw_goals,
+    "player_goals": _draw_player_goals,
+    "player_trend": _draw_player_trend,
+    "positions": _draw_positions,
+    "heatmap": _draw_heatmap,
+}
+
+# Kinds drawn without grid lines
+UNGRIDDED = {"heatmap"}
+
+
+def render_png(kind, data, options):
+    """PNG bytes of one chart (module level, so pool workers can run it)."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=FIGSIZE, dpi=DPI)
+    ax = fig.subplots()
+    if data.empty:
+        ax.text(0.5, 0.5, "No data yet", ha="center", va="center", transform=ax.transAxes)
+        ax.set_axis_off()
+    else:
+        DRAWERS[kind](ax, data, options)
+        if kind not in UNGRIDDED:
+            ax.grid(alpha=0.3)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def _render_job(job):
+    return render_png(*job)
+
+
+def _warm_up():
+    import matplotlib.figure  # noqa: F401 - import once per worker, not per chart
+
+
+# --------------------------------------------------------------------
+#                     TWO-LEVEL LRU IMAGE CACHE
+# --------------------------------------------------------------------
+def chart_key(chart):
+    """Hex digest of the chart version, kind, options and the table's content."""
+    digest = hashlib.sha256(repr((CHART_VERSION, chart.kind, sorted(chart.options.items()))).encode())
+    data = chart.data
+    digest.update(repr((list(data.columns), data.shape)).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ChartCache:
+    """PNG bytes by chart key: an in-memory LRU in front of an on-disk LRU."""
+
+    def __init__(self, directory=CHART_CACHE_DIR, max_bytes=CHART_CACHE_MAX_BYTES, memory_items=CHART_MEMORY_ITEMS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".png")
+
+    def _remember(self, key, png):
+        with self._lock:
+            self._memory[key] = png
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        """(png, "memory" | "disk"), or (None, None) on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key], "memory"
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                png = f.read()
+            os.utime(path)  # mtime is the disk LRU clock
+        except OSError:  # not cached, or trimmed by another process meanwhile
+            return None, None
+        self._remember(key, png)
+        return png, "disk"
+
+    def put(self, key, png):
+        self._remember(key, png)
+        os.makedirs(self.directory, exist_ok=True)
+        write_atomic(self._path(key), lambda f: f.write(png), mode="wb")
+
+    def trim(self):
+        """Delete the least recently used images until the directory fits max_bytes."""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(".png")]
+        except OSError:
+            return
+        files = []
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime_ns, st.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+
+# --------------------------------------------------------------------
+#                       RENDERING IN A POOL
+# --------------------------------------------------------------------
+_default_cache = None
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def default_cache():
+    """The process-wide ChartCache (CHART_CACHE_DIR relative to the working directory)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ChartCache()
+    return _default_cache
+
+
+def _get_pool(workers):
+    # One long-lived pool: starting processes (and importing matplotlib)
+    # per rerun would cost more than drawing. Spawned, not forked, because
+    # the app process has threads.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_warm_up,
+            )
+        return _pool
+
+
+def _render_missing(jobs, workers):
+    global _pool
+    if workers > 1 and len(jobs) > 1 and _pool is not False:
+        try:
+            return list(_get_pool(workers).map(_render_job, jobs))
+        except BrokenProcessPool:  # workers cannot start or died: draw in-process from now on
+            with _pool_lock:
+                _pool = False
+    return [_render_job(job) for job in jobs]
+
+
+def render_charts(charts, cache=None, workers=CHART_WORKERS):
+    """
+    {name: Chart} -> {name: PNG bytes}. Cached images are reused; the
+    charts that miss are rendered together (in a process pool when
+    workers > 1) and stored.
+    """
+    cache = cache or default_cache()
+    pngs, missing = {}, {}
+    with instrument.span("charts", charts=len(charts)) as span:
+        for name, chart in charts.items():
+            key = chart_key(chart)
+            png, level = cache.get(key)
+            if png is None:
+                missing[name] = key
+            else:
+                pngs[name] = png
+                instrument.count(f"charts.{level}_hits")
+        if missing:
+            jobs = [(charts[name].kind, charts[name].data, charts[name].options) for name in missing]
+            for (name, key), png in zip(missing.items(), _render_missing(jobs, workers)):
+                cache.put(key, png)
+                pngs[name] = png
+            cache.trim()
+            instrument.count("charts.rendered", len(missing))
+        span["rendered"] = len(missing)
+    return {name: pngs[name] for name in charts}
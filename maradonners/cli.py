@@ -0,0 +1,404 @@
+import argparse
+import json
+import os
+import sys
+
+from .config import FORM_WINDOW, LEAGUE_REFRESH_INTERVAL, REPORT_WORKERS, REPORTS_DIR, SIMULATION_RUNS, SIMULATION_SEED
+
+# --------------------------------------------------------------------
+#                        COMMAND LINE
+# --------------------------------------------------------------------
+#     python -m maradonners scrape               one scrape of LEAGUE_TARGET
+#     python -m maradonners refresh --interval N scrape every N seconds
+#     python -m maradonners stats [--json]       team & player stats
+#     python -m maradonners import results.csv   validate & add a CSV / JSONL backfill
+#     python -m maradonners table [--check]      standings from match_results.csv
+#     python -m maradonners simulate [--sims N]  promotion / relegation odds
+#     python -m maradonners ratings [--rebuild]  Elo ratings from the results
+#     python -m maradonners scout [OPPONENT]     head-to-head & form of an opponent
+#     python -m maradonners reports [--pdf]      season & per-player reports
+#     python -m maradonners roster list|add|...  teams, players, aliases, squads
+# Each command imports what it needs when it runs, so `--help` and
+# `stats` never load requests / BeautifulSoup. Match commands work on
+# OUR_TEAM unless `--team NAME` picks another team from the roster.
+#     python -m maradonners --profile <command>
+# logs every timed span as a JSON line to stderr (--profile-log PATH
+# appends them to a file instead) and ends with per-span totals;
+# --metrics-port N serves Prometheus /metrics while the command runs
+# (useful with `refresh`).
+
+
+def cmd_scrape(args):
+    from . import core
+
+    outcome = core.make_league_refresher().refresh_once()
+    print(f"League data {outcome}.")
+    return 0
+
+
+def cmd_refresh(args):
+    import time
+
+    from . import core
+
+    refresher = core.make_league_refresher(interval=args.interval).start()
+    print(f"Refreshing every {args.interval}s (Ctrl+C to stop).")
+    try:
+        while True:
+            time.sleep(args.interval)
+            status = refresher.status
+            print(f"{status['last_checked']}: {status['last_error'] or status['last_result']}", flush=True)
+    except KeyboardInterrupt:
+        refresher.stop()
+    return 0
+
+
+def resolve_team(args):
+    """ID of the --team (default team if not given), or None after printing why."""
+    from . import core
+    from .roster import DEFAULT_TEAM_ID
+
+    core.initialize_store()
+    if not args.team:
+        return DEFAULT_TEAM_ID
+    team_id = core.load_roster().team_id(args.team)
+    if team_id is None:
+        print(f"No team called '{args.team}' (see `roster teams`).")
+    return team_id
+
+
+def cmd_stats(args):
+    from . import core
+    from .stats_engine import player_stats_table
+
+    team_id = resolve_team(args)
+    if team_id is None:
+        return 1
+    team = core.load_team_metrics(team_id)
+    players = player_stats_table(core.load_player_stats(team_id), core.squad_names(team_id))
+
+    if args.json:
+        payload = {"team": team, "players": players.to_dict(orient="records")}
+        json.dump(payload, sys.stdout, indent=2, default=str)
+        print()
+    else:
+        for name, value in team.items():
+            print(f"{name:<22} {value}")
+        print()
+        print(players.to_string(index=False))
+    return 0
+
+
+def cmd_import(args):
+    from . import core
+
+    if not os.path.exists(args.path):
+        print(f"{args.path} not found.")
+        return 1
+    team_id = resolve_team(args)
+    if team_id is None:
+        return 1
+    summary = core.import_matches(
+        args.path, force=args.force, check_squad=not args.any_player,
+        chunk_size=args.chunk_size, report_path=args.rejects, team_id=team_id,
+    )
+    if not summary.read and summary.skipped:
+        print(f"Nothing imported ({args.path} was already imported; use --force to re-import).")
+        return 0
+    resumed = f" (resumed after {summary.skipped} rows)" if summary.skipped else ""
+    print(f"Read {summary.read} rows from {args.path}{resumed}: {summary.imported} imported, "
+          f"{summary.rejected} rejected.")
+    if summary.report_path:
+        print(f"Rejected rows and reasons: {summary.report_path}")
+    if summary.unknown_players:
+        print(f"Not in the roster: {', '.join(summary.unknown_players)}. Add them with `roster add NAME` "
+              "(or `roster alias PLAYER NAME` for another spelling), then import the rejected rows.")
+    return 0
+
+
+def cmd_table(args):
+    from . import core
+    from .league_table import compare_tables
+
+    results = core.load_league_results()
+    if results.empty:
+        print("No league results. Run `scrape` first.")
+        return 1
+    table = core.compute_league_table(results, args.tiebreak)
+    table.index = table.index + 1
+    print(table.to_string())
+
+    if args.check:
+        mismatches = compare_tables(core.compute_league_table(results), core.load_league_standings())
+        print()
+        if mismatches.empty:
+            print("Matches the scraped standings.")
+        else:
+            print("Differs from the scraped standings:")
+            print(mismatches.to_string(index=False))
+            return 1
+    return 0
+
+
+def cmd_simulate(args):
+    from . import core
+
+    results = core.load_league_results()
+    if results.empty:
+        print("No league results. Run `scrape` first.")
+        return 1
+    odds = core.simulate_season(results, core.load_league_standings(), args.sims, args.seed, args.workers)
+    columns = ["Team", "Promotion %", "Relegation %", "Expected Position", "Expected Pts"]
+    if args.json:
+        json.dump(odds.to_dict(orient="records"), sys.stdout, indent=2)
+        print()
+    else:
+        print(odds[columns].to_string(index=False))
+    return 0
+
+
+def cmd_ratings(args):
+    from . import core
+    from .ratings import ratings_table
+
+    state, applied, rebuilt = core.update_ratings(rebuild=args.rebuild)
+    if not state["ratings"]:
+        print("No league results. Run `scrape` first.")
+        return 1
+    print(ratings_table(state).to_string(index=False))
+    print()
+    print(f"{'Rebuilt from' if rebuilt else 'Applied'} {applied} fixture(s); last result {state['last_date']}.")
+    return 0
+
+
+def cmd_scout(args):
+    from . import core
+
+    team_id = resolve_team(args)
+    if team_id is None:
+        return 1
+    if args.rebuild:
+        _, added, _ = core.update_scouting(rebuild=True)
+        print(f"Rebuilt the scouting index from {added} fixture(s).")
+    index = core.load_opponent_index(team_id)
+    if not args.opponent:
+        print("\n".join(index.options) if index.options else "No opponents yet. Run `scrape` first.")
+        return 0
+    if not index.known(args.opponent):
+        print(f"No fixtures or matches against '{args.opponent}'.")
+        return 1
+
+    name = index.name(args.opponent)
+    record = index.record(name)
+    form, points = index.form(name, args.last)
+    print(f"{name}: played {record['Played']}, won {record['Won']}, drawn {record['Drawn']}, "
+          f"lost {record['Lost']}, goals {record['For']}-{record['Against']} (our view)")
+    print(f"League form (last {args.last}): {form or 'N/A'} ({points} pts)")
+    for title, table in (
+        ("Head to head", index.head_to_head(name)),
+        ("Recent league results", index.league_results(name, args.last)),
+        ("Upcoming", index.upcoming(name)),
+    ):
+        if not table.empty:
+            print(f"\n{title}")
+            print(table.to_string(index=False))
+    return 0
+
+
+def cmd_reports(args):
+    from . import core
+
+    team_id = resolve_team(args)
+    if team_id is None:
+        return 1
+    roster = core.load_roster()
+    players = None
+    if args.player:
+        ids = {name: roster.player_id(name) for name in args.player}
+        unknown = [name for name, player_id in ids.items() if player_id is None]
+        if unknown:
+            print(f"Unknown player(s): {', '.join(unknown)}")
+            return 1
+        players = roster.names(ids.values())
+    summary = core.generate_reports(
+        args.out, players=players, pdf=args.pdf, force=args.force, workers=args.workers, team_id=team_id,
+    )
+    print(f"{len(summary.generated)} report(s) written, {len(summary.skipped)} unchanged, in {summary.directory}")
+    return 0
+
+
+def cmd_roster(args):
+    from . import core
+    from .roster import RosterError, current_season
+
+    team_id = resolve_team(args)
+    if team_id is None:
+        return 1
+    roster = core.load_roster()
+    season = args.season or current_season()
+
+    if args.action == "teams":
+        for tid, name in roster.teams.items():
+            seasons = ", ".join(roster.seasons(tid)) or "-"
+            print(f"{tid:>4}  {name}  ({len(roster.squad(tid))} players; seasons: {seasons})")
+        return 0
+    if args.action == "list":
+        ids = roster.squad(team_id, None if args.all else season)
+        print(f"{roster.teams[team_id]}, {'all seasons' if args.all else season}: {len(ids)} players")
+        for player_id in ids:
+            aliases = roster.aliases_of(player_id)
+            print(f"{player_id:>4}  {roster.name(player_id)}" + (f"  (also: {', '.join(aliases)})" if aliases else ""))
+        return 0
+
+    try:
+        if args.action == "add-team":
+            print(f"Team {core.add_team(args.name)} created.")
+            return 0
+        player_id = roster.player_id(args.name)
+        if args.action == "add":
+            if player_id is None:
+                player_id = core.add_player(args.name, args.alias or (), team_id, season)
+                print(f"Player {player_id} created and added to {roster.teams[team_id]} {season}.")
+            else:
+                core.add_to_squad(team_id, season, [player_id])
+                for alias in args.alias or ():
+                    core.add_alias(player_id, alias)
+                print(f"{roster.name(player_id)} is in {roster.teams[team_id]} {season}.")
+            return 0
+        if player_id is None:
+            print(f"No player known as '{args.name}'.")
+            return 1
+        if args.action == "drop":
+            core.remove_from_squad(team_id, season, [player_id])
+            print(f"{roster.name(player_id)} removed from {roster.teams[team_id]} {season}.")
+        elif args.action == "alias":
+            core.add_alias(player_id, args.alias_name)
+            print(f"'{' '.join(args.alias_name.split())}' now means {roster.name(player_id)}.")
+        elif args.action == "rename":
+            core.rename_player(player_id, args.new_name)
+            print(f"{roster.name(player_id)} is now shown as {args.new_name}.")
+    except RosterError as exc:
+        print(f"Not changed: {exc}.")
+        return 1
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m maradonners", description="Maradonners FC data tools.")
+    parser.add_argument("--data-dir", help="directory holding the database and CSVs (default: current)")
+    parser.add_argument("--profile", action="store_true", help="log timing spans as JSON lines to stderr")
+    parser.add_argument("--profile-log", metavar="PATH", help="append the JSON lines to PATH instead (implies --profile)")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    parser.add_argument("--team", help="team from the roster for stats / import / reports / roster (default: ours)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("scrape", help="scrape the league once").set_defaults(func=cmd_scrape)
+
+    refresh = sub.add_parser("refresh", help="scrape the league on an interval")
+    refresh.add_argument("--interval", type=int, default=LEAGUE_REFRESH_INTERVAL, help="seconds between scrapes")
+    refresh.set_defaults(func=cmd_refresh)
+
+    stats = sub.add_parser("stats", help="print team and player stats")
+    stats.add_argument("--json", action="store_true", help="machine-readable output")
+    stats.set_defaults(func=cmd_stats)
+
+    imp = sub.add_parser("import", help="validate and import a CSV / JSONL backfill into the match database")
+    imp.add_argument("path", help="CSV in the maradonners_fc_results.csv format (or with a Score column), or JSONL")
+    imp.add_argument("--force", action="store_true", help="import from the start even if imported before")
+    imp.add_argument("--chunk-size", type=int, help="rows validated and written per batch")
+    imp.add_argument("--rejects", help="rejected-rows report (default: <path>.rejected.csv)")
+    imp.add_argument("--any-player", action="store_true",
+                     help="accept roster players from outside the team's squads")
+    imp.set_defaults(func=cmd_import)
+
+    table = sub.add_parser("table", help="league standings computed from the match results")
+    table.add_argument("--tiebreak", choices=["goal_difference", "head_to_head"], default="goal_difference")
+    table.add_argument("--check", action="store_true", help="compare with the scraped standings")
+    table.set_defaults(func=cmd_table)
+
+    simulate = sub.add_parser("simulate", help="Monte Carlo odds for the rest of the season")
+    simulate.add_argument("--sims", type=int, default=SIMULATION_RUNS, help="seasons to simulate")
+    simulate.add_argument("--seed", type=int, default=SIMULATION_SEED)
+    simulate.add_argument("--workers", type=int, default=1, help="processes (batches are seeded, so results match)")
+    simulate.add_argument("--json", action="store_true", help="full position distribution as JSON")
+    simulate.set_defaults(func=cmd_simulate)
+
+    ratings = sub.add_parser("ratings", help="Elo ratings of every team in the league")
+    ratings.add_argument("--rebuild", action="store_true", help="recompute from every fixture, ignoring saved state")
+    ratings.set_defaults(func=cmd_ratings)
+
+    scout = sub.add_parser("scout", help="head-to-head and recent form of an opponent (lists opponents without one)")
+    scout.add_argument("opponent", nargs="?", help="team name, any spelling")
+    scout.add_argument("--last", type=int, default=FORM_WINDOW, help="recent league results to show")
+    scout.add_argument("--rebuild", action="store_true", help="re-index every recorded snapshot first")
+    scout.set_defaults(func=cmd_scout)
+
+    reports = sub.add_parser("reports", help="season and per-player HTML (and PDF) reports")
+    reports.add_argument("--out", help=f"output directory (default: {REPORTS_DIR})")
+    reports.add_argument("--player", action="append", help="only this player's report (repeatable)")
+    reports.add_argument("--pdf", action="store_true", help="also write a PDF of each report")
+    reports.add_argument("--force", action="store_true", help="rebuild reports whose stats have not changed")
+    reports.add_argument("--workers", type=int, default=REPORT_WORKERS, help="processes rendering reports")
+    reports.set_defaults(func=cmd_reports)
+
+    roster = sub.add_parser("roster", help="teams, players, aliases and season squads")
+    actions = roster.add_subparsers(dest="action", required=True)
+    listing = actions.add_parser("list", help="the team's squad for a season")
+    listing.add_argument("--all", action="store_true", help="everyone from every season")
+    actions.add_parser("teams", help="every team")
+    add = actions.add_parser("add", help="add a player (new or existing) to the season's squad")
+    add.add_argument("name")
+    add.add_argument("--alias", action="append", help="another spelling of the name (repeatable)")
+    drop = actions.add_parser("drop", help="take a player out of the season's squad")
+    drop.add_argument("name")
+    alias = actions.add_parser("alias", help="let another spelling resolve to a player")
+    alias.add_argument("name")
+    alias.add_argument("alias_name", metavar="alias")
+    rename = actions.add_parser("rename", help="change the name a player is shown by")
+    rename.add_argument("name")
+    rename.add_argument("new_name", metavar="new-name")
+    add_team = actions.add_parser("add-team", help="create a team")
+    add_team.add_argument("name")
+    for action in (listing, add, drop):
+        action.add_argument("--season", help="season label, e.g. 2025 (default: the current season)")
+    roster.set_defaults(func=cmd_roster, season=None)
+
+    return parser
+
+
+def print_span_totals(out):
+    from . import instrument
+
+    print(f"\n{'span':<34} {'calls':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9}", file=out)
+    for name, t in instrument.span_totals().items():
+        print(f"{name:<34} {t['count']:>6} {t['total_ms']:>10.1f} {t['mean_ms']:>9.2f} {t['max_ms']:>9.1f}", file=out)
+    for name, value in instrument.counters().items():
+        print(f"{name:<34} {value:>6}", file=out)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.profile_log:
+        args.profile_log = os.path.abspath(args.profile_log)
+    args.profile = args.profile or bool(args.profile_log)
+    if args.data_dir:
+        if args.command == "import":
+            args.path = os.path.abspath(args.path)
+            args.rejects = args.rejects and os.path.abspath(args.rejects)
+        if args.command == "reports":
+            args.out = args.out and os.path.abspath(args.out)
+        os.chdir(args.data_dir)
+
+    if args.profile or args.metrics_port:
+        from . import instrument
+
+        instrument.enable()
+        if args.profile:
+            instrument.log_to(args.profile_log or sys.stderr)
+        if args.metrics_port:
+            instrument.serve_metrics(args.metrics_port)
+    try:
+        return args.func(args)
+    finally:
+        if args.profile:
+            print_span_totals(sys.stderr)
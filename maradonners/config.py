@@ -0,0 +1,83 @@
+import os
+from collections import namedtuple
+
+# --------------------------------------------------------------------
+#                         FILE CONFIG
+# --------------------------------------------------------------------
+# Paths are relative to the working directory (the repo root when run
+# with `streamlit run app.py`; see `python -m maradonners --data-dir`).
+LOCAL_DATA_FILE = "maradonners_fc_results.csv"  # legacy CSV, migrated into LOCAL_DB_FILE
+LOCAL_DB_FILE = "maradonners_fc.db"
+LOCAL_DB_FILES = (LOCAL_DB_FILE, LOCAL_DB_FILE + "-wal")  # WAL commits only touch -wal
+LEAGUE_STANDINGS_FILE = "league_standings.csv"
+LEAGUE_MATCH_RESULTS_FILE = "match_results.csv"
+SCRAPE_STATE_FILE = "scrape_state.json"  # ETag / Last-Modified per division
+LEAGUE_HISTORY_FILE = "league_history.db"  # snapshots of every change
+LEAGUE_REFRESH_INTERVAL = 15 * 60  # seconds between background scrapes
+RATINGS_STATE_FILE = "ratings_state.json"  # Elo ratings + fixtures already applied
+SCOUTING_STATE_FILE = "scouting_index.json"  # every opponent's fixtures, across snapshots
+
+# Rendered chart images (see charts): newest kept up to the size limit
+CHART_CACHE_DIR = "chart_cache"
+CHART_CACHE_MAX_BYTES = 50 * 2**20
+CHART_MEMORY_ITEMS = 64  # images also kept in memory per process
+CHART_WORKERS = min(4, os.cpu_count() or 1)  # processes drawing missed charts
+
+# Batch HTML / PDF reports (see reports)
+REPORTS_DIR = "reports"
+REPORT_WORKERS = min(4, os.cpu_count() or 1)
+
+# --------------------------------------------------------------------
+#                        INSTRUMENTATION
+# --------------------------------------------------------------------
+# Timing spans and counters (see instrument). Off unless set here, by the
+# environment (`streamlit run` takes no options of ours), from the Manager
+# diagnostics panel or with `python -m maradonners --profile`.
+INSTRUMENT = os.environ.get("MARADONNERS_INSTRUMENT", "") not in ("", "0")
+INSTRUMENT_LOG_FILE = os.environ.get("MARADONNERS_INSTRUMENT_LOG")  # JSON lines, one per span
+METRICS_PORT = int(os.environ.get("MARADONNERS_METRICS_PORT") or 0)  # Prometheus /metrics on 127.0.0.1; 0 = off
+
+# --------------------------------------------------------------------
+#                        LEAGUE TARGET
+# --------------------------------------------------------------------
+LeagueTarget = namedtuple(
+    "LeagueTarget", ["league_id", "season_id", "division_id", "sport_id", "venue_id"],
+    defaults=(0, 2),
+)
+
+
+def target_key(target):
+    """Stable string key for a target, used for the validator store."""
+    return f"{target.league_id}/{target.season_id}/{target.division_id}"
+
+
+# League, season & division scraped by "Get latest League Data"
+LEAGUE_TARGET = LeagueTarget(league_id=34, season_id=842, division_id=3430)
+
+# Season simulations (fixed seed: the same tables give the same odds)
+SIMULATION_RUNS = 10000
+SIMULATION_SEED = 842
+
+# Other spellings of a team name -> the name used in match_results.csv
+# (case, punctuation and a trailing "FC" are already ignored)
+TEAM_ALIASES = {}
+
+# --------------------------------------------------------------------
+#                            TEAM
+# --------------------------------------------------------------------
+# Our name in the league fixtures
+OUR_TEAM = "Maradonners"
+
+# Games counted in "Form"
+FORM_WINDOW = 5
+
+# Month each season starts in (1 = calendar-year seasons like "2025")
+SEASON_START_MONTH = 1
+
+# Squad the default team (OUR_TEAM) starts with on a new database. After
+# that the roster in the database is the source of truth (see roster)
+SQUAD = [
+    "AJ", "Himza", "Bir", "Bhavs", "Speirs", "Jakes",
+    "Viv", "Minal", "Deelan", "Rush B", "Rush N", "Joe",
+    "Filler"
+]
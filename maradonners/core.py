@@ -0,0 +1,355 @@
+import os
+
+import pandas as pd
+
+from . import cache
+from . import instrument
+from . import match_store
+from . import roster
+from .config import (
+    FORM_WINDOW, LEAGUE_HISTORY_FILE, LEAGUE_MATCH_RESULTS_FILE, LEAGUE_REFRESH_INTERVAL,
+    LEAGUE_STANDINGS_FILE, LEAGUE_TARGET, LOCAL_DATA_FILE, LOCAL_DB_FILE, LOCAL_DB_FILES, OUR_TEAM,
+    RATINGS_STATE_FILE, REPORT_WORKERS, REPORTS_DIR, SCOUTING_STATE_FILE, SCRAPE_STATE_FILE, SEASON_START_MONTH,
+    SIMULATION_RUNS,
+    SIMULATION_SEED, TEAM_ALIASES, target_key,
+)
+from .roster import DEFAULT_TEAM_ID
+from .schema import compact_results, compact_standings
+from .stats_engine import compute_player_stats
+
+# --------------------------------------------------------------------
+#                    HEADLESS DATA & STATS API
+# --------------------------------------------------------------------
+# Everything the Streamlit app and the CLI share. Nothing here imports
+# Streamlit, and the scraping stack (requests, BeautifulSoup, lxml) and
+# the analytics modules are only imported by the functions that use
+# them, so `python -m maradonners stats` never pays for the scraper.
+# Loaders and stats are timed spans (see instrument); each span records
+# whether the cache answered and how many rows went in and came out.
+# Match data is per team (team_id, DEFAULT_TEAM_ID when left out) and
+# players are roster IDs; the names in the tables are display names.
+
+
+# --------------------------------------------------------------------
+#                 CREATE LOCAL STORE IF NEEDED
+# --------------------------------------------------------------------
+def initialize_store():
+    """Creates the match database, migrating the legacy CSV on first run."""
+    match_store.migrate_csv(LOCAL_DATA_FILE, LOCAL_DB_FILE)
+    match_store.connect(LOCAL_DB_FILE).close()
+
+@instrument.timed()
+def import_matches(path, force=False, check_squad=True, chunk_size=None, report_path=None, team_id=DEFAULT_TEAM_ID):
+    """
+    Stream a CSV / JSONL backfill into a team's matches with the match
+    form's validation (see bulk_import). Returns an ImportSummary; names
+    the roster does not know are rejected and listed in unknown_players.
+    """
+    from . import bulk_import
+    summary = bulk_import.import_matches(
+        path, LOCAL_DB_FILE, roster=load_roster(), team_id=team_id, chunk_size=chunk_size or bulk_import.CHUNK_SIZE,
+        report_path=report_path, force=force, check_squad=check_squad,
+    )
+    cache.invalidate(LOCAL_DB_FILE)
+    return summary
+
+# --------------------------------------------------------------------
+#               LOADING AND SAVING LOCAL MATCH DATA
+# --------------------------------------------------------------------
+@instrument.timed()
+@cache.cached_on_files(*LOCAL_DB_FILES)
+def load_local_data(team_id=DEFAULT_TEAM_ID):
+    """Load a team's matches as one row each with "Name (N)" contribution strings."""
+    return match_store.load_matches(LOCAL_DB_FILE, team_id)
+
+@instrument.timed()
+@cache.cached_on_files(*LOCAL_DB_FILES)
+def load_player_stats(team_id=DEFAULT_TEAM_ID):
+    """Per-player counters from the aggregates maintained on every save."""
+    roster = load_roster()
+    return match_store.load_player_stats(LOCAL_DB_FILE, roster.squad(team_id), roster.players, team_id)
+
+@instrument.timed()
+@cache.cached_on_files(*LOCAL_DB_FILES)
+def load_team_metrics(team_id=DEFAULT_TEAM_ID):
+    """Team metrics from the aggregates maintained on every save."""
+    return match_store.load_team_metrics(LOCAL_DB_FILE, team_id)
+
+@instrument.timed()
+@cache.cached_on_files(*LOCAL_DB_FILES)
+def load_match_index(team_id=DEFAULT_TEAM_ID):
+    """Date-sorted, season-partitioned index for period stats, keyed on player IDs (see match_index)."""
+    return match_store.load_index(LOCAL_DB_FILE, SEASON_START_MONTH, team_id)
+
+@instrument.timed()
+def save_match(new_row, team_id=DEFAULT_TEAM_ID):
+    """Append a single match; raises roster.UnknownPlayersError for a name the roster does not know."""
+    match_store.save_match(new_row, LOCAL_DB_FILE, team_id)
+    cache.invalidate(LOCAL_DB_FILE)
+
+@instrument.timed()
+def save_local_data(df, team_id=DEFAULT_TEAM_ID):
+    """
+    Replace a team's whole match history (for edits/deletes; new matches
+    use save_match). Raises match_store.StaleWriteError if `df` came from
+    load_local_data and another session saved a match since.
+    """
+    match_store.replace_matches(df, LOCAL_DB_FILE, expected_revision=df.attrs.get("revision"), team_id=team_id)
+    cache.invalidate(LOCAL_DB_FILE)
+
+# --------------------------------------------------------------------
+#                   ROSTER: TEAMS, PLAYERS, SQUADS
+# --------------------------------------------------------------------
+# Writers raise roster.RosterError for a malformed or taken name.
+@instrument.timed()
+@cache.cached_on_files(*LOCAL_DB_FILES)
+def load_roster():
+    """Teams, players, aliases and season squads with O(1) lookups (see roster)."""
+    return match_store.load_roster(LOCAL_DB_FILE)
+
+def squad_names(team_id=DEFAULT_TEAM_ID, season=None):
+    """Display names of a team's squad for a season (see Roster.squad), for the stats tables."""
+    roster = load_roster()
+    return tuple(roster.names(roster.squad(team_id, season)))
+
+def _roster_write(change, *args):
+    result = match_store.roster_write(LOCAL_DB_FILE, change, *args)
+    cache.invalidate(LOCAL_DB_FILE)
+    return result
+
+def add_team(name):
+    """Create a team; returns its ID."""
+    return _roster_write(roster.add_team, name)
+
+def add_player(name, aliases=(), team_id=None, season=None):
+    """Create a player (and put them in a team's squad for `season`); returns the ID."""
+    def change(conn):
+        player_id = roster.add_player(conn, name, aliases)
+        if team_id is not None:
+            roster.add_to_squad(conn, team_id, season or roster.current_season(), [player_id])
+        return player_id
+
+    return _roster_write(change)
+
+def add_alias(player_id, alias):
+    _roster_write(roster.add_alias, player_id, alias)
+
+def rename_player(player_id, name):
+    """Show the player as `name`; the old name keeps resolving to them."""
+    _roster_write(roster.rename_player, player_id, name)
+
+def add_to_squad(team_id, season, player_ids):
+    _roster_write(roster.add_to_squad, team_id, season, player_ids)
+
+def remove_from_squad(team_id, season, player_ids):
+    """Take players out of a season's squad (their match history stays)."""
+    _roster_write(roster.remove_from_squad, team_id, season, player_ids)
+
+# --------------------------------------------------------------------
+#                     LEAGUE DATA
+# --------------------------------------------------------------------
+def make_league_refresher(interval=LEAGUE_REFRESH_INTERVAL):
+    """
+    A LeagueRefresher for LEAGUE_TARGET that rewrites league_standings.csv
+    & match_results.csv only when the parsed tables changed (not started).
+    """
+    from .league_refresher import LeagueRefresher
+
+    def invalidate(paths):
+        for path in paths:
+            cache.invalidate(path)
+        if LEAGUE_MATCH_RESULTS_FILE in paths:
+            update_ratings()
+            update_scouting()
+
+    return LeagueRefresher(
+        LEAGUE_TARGET, LEAGUE_STANDINGS_FILE, LEAGUE_MATCH_RESULTS_FILE,
+        SCRAPE_STATE_FILE, LEAGUE_HISTORY_FILE,
+        interval=interval, on_change=invalidate,
+    )
+
+@instrument.timed()
+@cache.cached_on_files(LEAGUE_HISTORY_FILE, LEAGUE_HISTORY_FILE + "-wal")
+def load_standings_history():
+    """Every recorded standings version for LEAGUE_TARGET (long format)."""
+    from . import league_history
+    return league_history.standings_history(LEAGUE_HISTORY_FILE, target_key(LEAGUE_TARGET))
+
+@instrument.timed()
+@cache.cached_on_files(LEAGUE_STANDINGS_FILE)
+def load_league_standings():
+    if os.path.exists(LEAGUE_STANDINGS_FILE):
+        return compact_standings(pd.read_csv(LEAGUE_STANDINGS_FILE))
+    return pd.DataFrame()
+
+@instrument.timed()
+@cache.cached_on_files(LEAGUE_MATCH_RESULTS_FILE)
+def load_league_results():
+    """League fixtures with "Thursday 30 Jan 2025" dates parsed once per file change."""
+    if os.path.exists(LEAGUE_MATCH_RESULTS_FILE):
+        from .match_index import parse_league_dates
+        results = pd.read_csv(LEAGUE_MATCH_RESULTS_FILE)
+        if "Date" in results.columns:
+            results["Date"] = parse_league_dates(results["Date"])
+        return compact_results(results)
+    return pd.DataFrame()
+
+@instrument.timed()
+def update_ratings(rebuild=False):
+    """
+    Apply fixtures not yet in ratings_state.json (all of them when
+    rebuild). Returns (state, fixtures applied, rebuilt from scratch).
+    """
+    from . import ratings
+    results = load_league_results()
+    if results.empty:
+        return ratings.load_state(RATINGS_STATE_FILE), 0, False
+    outcome = ratings.update_ratings(results, RATINGS_STATE_FILE, TEAM_ALIASES, rebuild=rebuild)
+    cache.invalidate(RATINGS_STATE_FILE)
+    return outcome
+
+@instrument.timed()
+@cache.cached_on_files(LEAGUE_MATCH_RESULTS_FILE, RATINGS_STATE_FILE)
+def load_ratings():
+    """Elo state, brought up to date with match_results.csv first."""
+    return update_ratings()[0]
+
+@instrument.timed()
+def update_scouting(rebuild=False):
+    """
+    Add the fixtures of league snapshots recorded since the last update,
+    then of match_results.csv, to scouting_index.json (every snapshot
+    when rebuild). Returns (state, fixtures added, scores corrected).
+    """
+    from . import league_history, scouting
+    after = 0 if rebuild else scouting.load_state(SCOUTING_STATE_FILE)["last_snapshot"]
+    last_snapshot, frames = after, []
+    if os.path.exists(LEAGUE_HISTORY_FILE):
+        last_snapshot, frames = league_history.results_since(LEAGUE_HISTORY_FILE, target_key(LEAGUE_TARGET), after)
+    frames.append(load_league_results())
+    outcome = scouting.update_index(frames, SCOUTING_STATE_FILE, TEAM_ALIASES, last_snapshot, rebuild=rebuild)
+    cache.invalidate(SCOUTING_STATE_FILE)
+    return outcome
+
+@instrument.timed()
+@cache.cached_on_files(LEAGUE_MATCH_RESULTS_FILE, SCOUTING_STATE_FILE)
+def load_scouting():
+    """Scouting index state, brought up to date with match_results.csv first."""
+    return update_scouting()[0]
+
+@instrument.timed()
+@cache.cached_on_files(*LOCAL_DB_FILES, LEAGUE_MATCH_RESULTS_FILE, SCOUTING_STATE_FILE)
+def load_opponent_index(team_id=DEFAULT_TEAM_ID):
+    """Opposition names, head-to-heads and form by opponent for a team (see scouting)."""
+    from .scouting import OpponentIndex
+    return OpponentIndex(load_scouting(), load_local_data(team_id), load_roster().teams[team_id], TEAM_ALIASES)
+
+# --------------------------------------------------------------------
+#                        STATS FUNCTIONS
+# --------------------------------------------------------------------
+@instrument.timed()
+@cache.cached_on_frames
+def compute_local_stats(df, squad=None):
+    """
+    Build stats from local data:
+    - Appearances, Goals, Assists, Missed Games, Own Goals, Blue Cards, Yellow Cards, Red Cards
+
+    One row per name in `squad` (default: the default team's squad) and
+    per anyone else named in df. All "Name (N)" columns are exploded once
+    into a long event table and counted with a single groupby (see
+    stats_engine).
+    """
+    return compute_player_stats(df, squad_names() if squad is None else squad)
+
+@instrument.timed()
+@cache.cached_on_frames
+def compute_league_table(results, tiebreak="goal_difference"):
+    """Standings rebuilt from the fixtures' Score column (see league_table)."""
+    from .league_table import league_table
+    return league_table(results, tiebreak=tiebreak)
+
+@instrument.timed()
+@cache.cached_on_frames
+def simulate_season(results, standings, n_sims=SIMULATION_RUNS, seed=SIMULATION_SEED, workers=1):
+    """Finishing-position and promotion/relegation odds (see simulator)."""
+    from . import simulator
+    return simulator.simulate_season(results, standings, n_sims=n_sims, seed=seed, workers=workers)
+
+@instrument.timed()
+@cache.cached_on_frames
+def compute_partnerships(df):
+    """Co-appearance, on-pitch impact and best line-ups (see partnerships)."""
+    from .partnerships import partnerships
+    return partnerships(df)
+
+@instrument.timed()
+@cache.cached_on_frames
+def compute_team_metrics(df):
+    """
+    Compute team performance metrics from match data.
+    (Vectorized over the goal columns; does not modify df.)
+    """
+    from . import team_analytics
+    return team_analytics.compute_team_metrics(df)
+
+@instrument.timed()
+@cache.cached_on_frames
+def compute_team_analytics(df):
+    """Rolling form, streaks and cumulative points/goal difference."""
+    from . import team_analytics
+    return team_analytics.team_analytics(df, form_window=FORM_WINDOW)
+
+# --------------------------------------------------------------------
+#                            CHARTS
+# --------------------------------------------------------------------
+@instrument.timed()
+@cache.cached_on_frames
+def season_charts(df):
+    """Points, goals per match and top scorers' goals as chart specs (see charts)."""
+    from . import charts
+    return charts.season_charts(df)
+
+@instrument.timed()
+@cache.cached_on_frames
+def standings_charts(history):
+    """Standings position over time as a chart spec (see charts)."""
+    from . import charts
+    return charts.standings_charts(history, OUR_TEAM)
+
+def heatmap_chart(matrix, title, cmap="viridis", fmt="{:.0f}"):
+    """A partnerships players x players table as a heatmap chart spec (see charts)."""
+    from . import charts
+    return charts.heatmap_chart(matrix, title, cmap, fmt)
+
+def render_charts(specs):
+    """{name: PNG bytes}: cached images, the rest drawn in the worker pool (see charts)."""
+    from . import charts
+    return charts.render_charts(specs)
+
+# --------------------------------------------------------------------
+#                            REPORTS
+# --------------------------------------------------------------------
+@instrument.timed()
+def generate_reports(out_dir=None, players=None, pdf=False, force=False, workers=REPORT_WORKERS,
+                     team_id=DEFAULT_TEAM_ID):
+    """
+    A team's season and per-player HTML (+ PDF) reports in out_dir
+    (default REPORTS_DIR, in a folder per team for the other teams);
+    players whose stats have not changed since the last run are skipped
+    (see reports).
+    """
+    from . import reports
+    if out_dir is None:
+        out_dir = REPORTS_DIR if team_id == DEFAULT_TEAM_ID else \
+            os.path.join(REPORTS_DIR, reports.slug(load_roster().teams[team_id]))
+    df = load_local_data(team_id)
+    squad = squad_names(team_id)
+    return reports.generate_reports(
+        df, compute_local_stats(df, squad), compute_team_metrics(df), squad, out_dir,
+        players=players, pdf=pdf, force=force, workers=workers,
+    )
+
+def strength_of_schedule(df, state, team_id=DEFAULT_TEAM_ID):
+    """A team's local results against Elo-rated opponents (see ratings)."""
+    from . import ratings
+    return ratings.strength_of_schedule(df, state, load_roster().teams[team_id], TEAM_ALIASES)
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# --------------------------------------------------------------------
+#                ATOMIC WRITES & INTER-PROCESS LOCKS
+# --------------------------------------------------------------------
+# Every file another session may be reading (league CSVs, scrape and
+# ratings state) is written to a temp file in the same directory, synced
+# and renamed over the target, so a reader sees the old file or the new
+# one and never half of either. Read-modify-write sequences that span
+# processes (two Streamlit servers, or the app plus `refresh`) hold an
+# exclusive lock on a "<path>.lock" file beside the data.
+
+# Windows refuses to replace a file another process has open; retry briefly
+REPLACE_RETRIES = 50
+REPLACE_DELAY = 0.02
+
+# mkstemp creates 0600 files; new files get the mode open() would give them.
+# Read once at import: os.umask can only be read by setting it.
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def _replace(src, dst):
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(REPLACE_DELAY)
+
+
+def write_atomic(path, write, mode="w", **open_kwargs):
+    """Call write(f) on a temp file next to `path`, then rename it over `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    suffix = os.path.splitext(path)[1]
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            file_mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            file_mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, file_mode)
+        _replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_csv_atomic(df, path):
+    write_atomic(path, lambda f: df.to_csv(f, index=False), newline="", encoding="utf-8")
+
+
+def write_json_atomic(path, data, **dump_kwargs):
+    write_atomic(path, lambda f: json.dump(data, f, **dump_kwargs), encoding="utf-8")
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive lock on `path` + ".lock", held for the `with` block and
+    released if the process dies. Blocks until the lock is free.
+    """
+    with open(path + ".lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # retries for ~10s, then raises
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,291 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count as _sequence
+
+from .config import INSTRUMENT
+
+# --------------------------------------------------------------------
+#               TIMING SPANS, COUNTERS & METRICS EXPORT
+# --------------------------------------------------------------------
+# Hot paths (loaders, stats, scrapes, each tab's render) are wrapped in
+# named spans, and notable quantities (rows parsed, bytes fetched, 304s)
+# go to counters. Both are kept per process, like the cache counters,
+# and can be shown in the Manager diagnostics panel, logged as JSON lines
+# (one per finished span) and scraped by Prometheus from serve_metrics().
+# Disabled, a span is a shared no-op context manager and timed() costs a
+# flag check per call, so instrumentation can stay in the code for good.
+
+RECENT_SPANS = 2000  # finished spans kept for the per-rerun view
+
+log = logging.getLogger("maradonners.instrument")
+
+_enabled = INSTRUMENT
+_lock = threading.Lock()
+_spans = {}  # name -> {"count", "total", "max"} (seconds)
+_counters = {}
+_recent = deque(maxlen=RECENT_SPANS)
+_seq = _sequence(1)
+_active = threading.local()  # stack of the open spans' field dicts, per thread
+
+
+class _Ignored(dict):
+    """Field dict handed out by disabled spans; writes are dropped."""
+
+    def __setitem__(self, key, value):
+        pass
+
+    def update(self, *args, **kwargs):
+        pass
+
+
+_IGNORED = _Ignored()
+
+
+class _NoSpan:
+    def __enter__(self):
+        return _IGNORED
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    """Switch recording on or off for the whole process."""
+    global _enabled
+    _enabled = bool(on)
+
+
+def record(name, seconds, **fields):
+    """Record a finished span of `seconds` (for timings taken elsewhere)."""
+    if not _enabled:
+        return
+    event = {"span": name, "ms": round(seconds * 1000, 3), **fields}
+    with _lock:
+        totals = _spans.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        totals["count"] += 1
+        totals["total"] += seconds
+        totals["max"] = max(totals["max"], seconds)
+        _recent.append((next(_seq), threading.get_ident(), event))
+    if log.isEnabledFor(logging.INFO):
+        log.info(name, extra={"event": event})
+
+
+@contextmanager
+def _span(name, fields):
+    stack = _active.__dict__.setdefault("stack", [])
+    stack.append(fields)
+    started = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as exc:
+        fields["error"] = type(exc).__name__
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        stack.pop()
+        record(name, elapsed, **fields)
+
+
+def span(name, **fields):
+    """
+    Time a `with` block as `name`. The block gets the span's field dict
+    to add to (rows, status, ...); fields end up in the JSON log line.
+    """
+    if not _enabled:
+        return _NO_SPAN
+    return _span(name, fields)
+
+
+def annotate(**fields):
+    """Add fields to the innermost open span of this thread, if any."""
+    if _enabled:
+        stack = getattr(_active, "stack", None)
+        if stack:
+            stack[-1].update(fields)
+
+
+def timed(name=None):
+    """
+    Decorator: each call is a span ("module.function" by default) with
+    rows_in / rows_out when the first argument / the result is a table.
+    """
+    def decorator(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _span(span_name, {}) as fields:
+                if args and hasattr(args[0], "shape"):
+                    fields["rows_in"] = args[0].shape[0]
+                result = func(*args, **kwargs)
+                if hasattr(result, "shape"):
+                    fields["rows_out"] = result.shape[0]
+                return result
+
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    """Add n to counter `name`."""
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+# --------------------------------------------------------------------
+#                          READING BACK
+# --------------------------------------------------------------------
+def mark():
+    """A position in the span log; since(mark) returns what finished after it."""
+    with _lock:
+        return _recent[-1][0] if _recent else 0
+
+
+def since(position, this_thread=True):
+    """Spans finished after `position` (by default only this thread's), oldest first."""
+    thread = threading.get_ident()
+    with _lock:
+        return [
+            dict(event) for seq, ident, event in _recent
+            if seq > position and (not this_thread or ident == thread)
+        ]
+
+
+def span_totals():
+    """{name: {"count", "total_ms", "mean_ms", "max_ms"}}, slowest total first."""
+    with _lock:
+        totals = {name: dict(t) for name, t in _spans.items()}
+    return {
+        name: {
+            "count": t["count"],
+            "total_ms": round(t["total"] * 1000, 3),
+            "mean_ms": round(t["total"] * 1000 / t["count"], 3),
+            "max_ms": round(t["max"] * 1000, 3),
+        }
+        for name, t in sorted(totals.items(), key=lambda item: -item[1]["total"])
+    }
+
+
+def counters():
+    with _lock:
+        return dict(sorted(_counters.items()))
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _recent.clear()
+
+
+# --------------------------------------------------------------------
+#                           JSON LOGS
+# --------------------------------------------------------------------
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, thread and the span's fields."""
+
+    def format(self, record):
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "thread": record.threadName,
+        }
+        payload.update(getattr(record, "event", None) or {"message": record.getMessage()})
+        return json.dumps(payload, default=str)
+
+
+def log_to(target):
+    """
+    Write every finished span as a JSON line to `target` (a path, appended
+    to, or a stream such as sys.stderr). Returns the handler.
+    """
+    handler = logging.FileHandler(target, encoding="utf-8") if isinstance(target, str) \
+        else logging.StreamHandler(target)
+    handler.setFormatter(JsonFormatter())
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    return handler
+
+
+# --------------------------------------------------------------------
+#                      PROMETHEUS TEXT FORMAT
+# --------------------------------------------------------------------
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Spans, counters and cache hits/misses in the Prometheus text exposition format."""
+    from . import cache
+
+    with _lock:
+        spans = {name: dict(t) for name, t in sorted(_spans.items())}
+        events = dict(sorted(_counters.items()))
+    lines = [
+        "# HELP maradonners_span_seconds Time spent in instrumented spans.",
+        "# TYPE maradonners_span_seconds summary",
+    ]
+    for name, t in spans.items():
+        lines.append(f'maradonners_span_seconds_count{{span="{_label(name)}"}} {t["count"]}')
+        lines.append(f'maradonners_span_seconds_sum{{span="{_label(name)}"}} {t["total"]:.6f}')
+    lines += [
+        "# HELP maradonners_span_seconds_max Slowest single run of each span.",
+        "# TYPE maradonners_span_seconds_max gauge",
+    ]
+    lines += [f'maradonners_span_seconds_max{{span="{_label(name)}"}} {t["max"]:.6f}' for name, t in spans.items()]
+    lines += [
+        "# HELP maradonners_events_total Instrumentation counters.",
+        "# TYPE maradonners_events_total counter",
+    ]
+    lines += [f'maradonners_events_total{{name="{_label(name)}"}} {value}' for name, value in events.items()]
+    lines += [
+        "# HELP maradonners_cache_requests_total Loader / stats cache lookups.",
+        "# TYPE maradonners_cache_requests_total counter",
+    ]
+    for name, outcomes in sorted(cache.stats().items()):
+        for outcome, value in sorted(outcomes.items()):
+            lines.append(
+                f'maradonners_cache_requests_total{{function="{_label(name)}",outcome="{outcome[:-1]}"}} {value}'
+            )
+    lines.append(f"maradonners_instrumentation_enabled {int(_enabled)}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scraped every few seconds; keep the console quiet
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Serve prometheus_text() at http://host:port/metrics from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
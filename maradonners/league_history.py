@@ -0,0 +1,173 @@
+import hashlib
+import io
+import sqlite3
+import zlib
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# --------------------------------------------------------------------
+#                 LEAGUE SNAPSHOT HISTORY (SQLITE)
+# --------------------------------------------------------------------
+# Every time a scrape returns tables that differ from the last ones seen
+# for that division, a timestamped snapshot is recorded. Table contents
+# are stored once per distinct version as zlib-compressed CSV, keyed by
+# their SHA-256, so unchanged standings between snapshots cost nothing.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    id             INTEGER PRIMARY KEY,
+    target         TEXT NOT NULL,
+    taken_at       TEXT NOT NULL,
+    standings_hash TEXT REFERENCES blobs(hash),
+    results_hash   TEXT REFERENCES blobs(hash)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_target ON snapshots(target, taken_at);
+"""
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def table_hash(df):
+    """Content hash of a parsed table; None for a missing/empty table."""
+    if df is None or df.empty:
+        return None
+    return hashlib.sha256(df.to_csv(index=False).encode("utf-8")).hexdigest()
+
+
+def _put_blob(conn, digest, df):
+    if digest is not None:
+        data = zlib.compress(df.to_csv(index=False).encode("utf-8"), 9)
+        conn.execute("INSERT OR IGNORE INTO blobs (hash, data) VALUES (?, ?)", (digest, data))
+
+
+def _get_blob(conn, digest):
+    row = conn.execute("SELECT data FROM blobs WHERE hash = ?", (digest,)).fetchone()
+    if row is None:
+        return pd.DataFrame()
+    return pd.read_csv(io.StringIO(zlib.decompress(row[0]).decode("utf-8")))
+
+
+def latest_hashes(conn, target):
+    """(standings_hash, results_hash) of the newest snapshot, or (None, None)."""
+    row = conn.execute(
+        "SELECT standings_hash, results_hash FROM snapshots"
+        " WHERE target = ? ORDER BY taken_at DESC, id DESC LIMIT 1",
+        (target,),
+    ).fetchone()
+    return row or (None, None)
+
+
+def record_if_changed(db_path, target, standings, results, taken_at=None):
+    """
+    Record a snapshot if either table differs from the latest one for
+    `target`. A missing table keeps the previous version. Returns
+    (standings_changed, results_changed).
+    """
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            old_standings, old_results = latest_hashes(conn, target)
+            new_standings = table_hash(standings) or old_standings
+            new_results = table_hash(results) or old_results
+            changed = (new_standings != old_standings, new_results != old_results)
+            if any(changed):
+                _put_blob(conn, new_standings if changed[0] else None, standings)
+                _put_blob(conn, new_results if changed[1] else None, results)
+                conn.execute(
+                    "INSERT INTO snapshots (target, taken_at, standings_hash, results_hash)"
+                    " VALUES (?, ?, ?, ?)",
+                    (
+                        target,
+                        taken_at or datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                        new_standings,
+                        new_results,
+                    ),
+                )
+            return changed
+    finally:
+        conn.close()
+
+
+def list_snapshots(db_path, target):
+    conn = connect(db_path)
+    try:
+        return pd.read_sql_query(
+            "SELECT id, taken_at, standings_hash, results_hash FROM snapshots"
+            " WHERE target = ? ORDER BY taken_at, id",
+            conn,
+            params=(target,),
+        )
+    finally:
+        conn.close()
+
+
+def load_snapshot(db_path, snapshot_id):
+    """(standings_df, results_df) as they were at a snapshot."""
+    conn = connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT standings_hash, results_hash FROM snapshots WHERE id = ?", (snapshot_id,)
+        ).fetchone()
+        if row is None:
+            return pd.DataFrame(), pd.DataFrame()
+        return _get_blob(conn, row[0]), _get_blob(conn, row[1])
+    finally:
+        conn.close()
+
+
+def standings_history(db_path, target):
+    """
+    Long table of every standings version: one row per (snapshot, team)
+    with "Taken At", "Position" and the standings columns.
+    """
+    conn = connect(db_path)
+    try:
+        snapshots = conn.execute(
+            "SELECT taken_at, standings_hash FROM snapshots"
+            " WHERE target = ? AND standings_hash IS NOT NULL ORDER BY taken_at, id",
+            (target,),
+        ).fetchall()
+        versions = {}
+        frames = []
+        for taken_at, digest in snapshots:
+            if digest not in versions:
+                versions[digest] = _get_blob(conn, digest)
+            df = versions[digest].copy()
+            df.insert(0, "Position", range(1, len(df) + 1))
+            df.insert(0, "Taken At", taken_at)
+            frames.append(df)
+    finally:
+        conn.close()
+
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def results_since(db_path, target, after_id=0):
+    """
+    (last snapshot id, [results_df, ...]): each distinct results version
+    recorded after snapshot `after_id`, oldest first.
+    """
+    conn = connect(db_path)
+    try:
+        snapshots = conn.execute(
+            "SELECT id, results_hash FROM snapshots"
+            " WHERE target = ? AND id > ? AND results_hash IS NOT NULL ORDER BY taken_at, id",
+            (target, after_id),
+        ).fetchall()
+        digests = list(dict.fromkeys(digest for _, digest in snapshots))
+        frames = [_get_blob(conn, digest) for digest in digests]
+    finally:
+        conn.close()
+    return max([after_id] + [snapshot_id for snapshot_id, _ in snapshots]), frames
@@ -0,0 +1,133 @@
+import os
+import threading
+from datetime import datetime, timezone
+
+from . import instrument
+from . import league_history
+from . import scraper
+from .fileio import file_lock, write_csv_atomic
+
+# --------------------------------------------------------------------
+#                 BACKGROUND LEAGUE REFRESHER
+# --------------------------------------------------------------------
+# Scrapes the league on an interval, either in a daemon thread inside
+# the Streamlit process or as a standalone worker:
+#     python -m maradonners refresh --interval 900
+# Tables are hashed after parsing and the CSVs are only rewritten (and a
+# snapshot recorded) when something actually changed; a 304 while a CSV
+# is missing locally re-fetches the page in full. The UI only ever
+# reads the CSVs, so it never waits on the network. CSVs are replaced
+# atomically, and a refresh holds a lock on the scrape state file so a
+# second process refreshing the same files waits its turn.
+
+DEFAULT_INTERVAL = 15 * 60  # seconds
+
+
+class LeagueRefresher:
+    """Periodic, change-detecting scrape of one league division."""
+
+    def __init__(self, target, standings_path, results_path, state_path, history_path,
+                 interval=DEFAULT_INTERVAL, on_change=None):
+        self.target = target
+        self.standings_path = standings_path
+        self.results_path = results_path
+        self.state_path = state_path
+        self.history_path = history_path
+        self.interval = interval
+        self.on_change = on_change
+
+        self.status = {
+            "last_checked": None,
+            "last_changed": None,
+            "last_result": None,
+            "last_error": None,
+        }
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()  # one refresh at a time
+        self._thread = None
+
+    def refresh_once(self):
+        """
+        Scrape, and write + snapshot whatever changed. Returns
+        "not modified", "unchanged" or "updated"; raises on network errors.
+        """
+        with self._lock, file_lock(self.state_path), instrument.span("league.refresh") as span:
+            now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            self.status["last_checked"] = now
+            try:
+                validators = scraper.load_validators(self.state_path)
+                result = scraper.scrape_targets([self.target], validators)[self.target]
+                if result.status == 304 and not (
+                    os.path.exists(self.standings_path) and os.path.exists(self.results_path)
+                ):
+                    # A CSV went missing since the ETag was stored: fetch the page in full
+                    validators.pop(scraper.target_key(self.target), None)
+                    result = scraper.scrape_targets([self.target], validators)[self.target]
+                if result.error:
+                    raise result.error
+
+                if result.status == 304:
+                    outcome = "not modified"
+                else:
+                    standings_changed, results_changed = league_history.record_if_changed(
+                        self.history_path, scraper.target_key(self.target),
+                        result.standings, result.results, taken_at=now,
+                    )
+                    # Also rewrite if a file went missing since the last snapshot
+                    standings_changed |= not os.path.exists(self.standings_path)
+                    results_changed |= not os.path.exists(self.results_path)
+
+                    changed_paths = []
+                    if standings_changed and not result.standings.empty:
+                        write_csv_atomic(result.standings, self.standings_path)
+                        changed_paths.append(self.standings_path)
+                    if results_changed and not result.results.empty:
+                        write_csv_atomic(result.results, self.results_path)
+                        changed_paths.append(self.results_path)
+
+                    if changed_paths:
+                        outcome = "updated"
+                        self.status["last_changed"] = now
+                        if self.on_change:
+                            self.on_change(changed_paths)
+                    else:
+                        outcome = "unchanged"
+
+                    # Only remember the ETag once the tables it describes are on disk
+                    scraper.save_validators(self.state_path, validators)
+            except Exception as exc:
+                self.status["last_error"] = f"{now}: {exc}"
+                raise
+
+            self.status["last_result"] = outcome
+            self.status["last_error"] = None
+            span["outcome"] = outcome
+            return outcome
+
+    # ---- background thread ----
+    def _run(self):
+        while not self._stop.is_set():
+            # Cleared before scraping: a request made from here on wakes the next wait
+            self._wake.clear()
+            try:
+                self.refresh_once()
+            except Exception:
+                pass  # kept in status["last_error"]; try again next tick
+            self._wake.wait(self.interval)
+
+    def start(self):
+        """Start the daemon thread (no-op if already running)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="league-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def request_refresh(self):
+        """Ask the background thread to scrape now instead of at the next tick."""
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
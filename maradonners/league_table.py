@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------------------------
+#              LEAGUE TABLE FROM MATCH RESULTS
+# --------------------------------------------------------------------
+# Rebuilds the spawtz standings from match_results.csv instead of the
+# scraped STTable, so the League tab can recompute (and "what-if") the
+# table offline. Each fixture becomes two team rows (home and away view)
+# and the table is one groupby over them. Scores look like "6 - 4", may
+# carry a "LIVE" marker while a game is on, and are "v" (or empty) for
+# fixtures not yet played.
+
+TABLE_COLUMNS = ["Team", "Pld", "W", "L", "D", "FF", "FA", "F", "A", "Dif", "B", "Pts"]
+
+# Points for a win, draw and loss
+POINTS = (3, 1, 0)
+
+SCORE_PATTERN = r"^\s*(?P<Home>\d+)\s*-\s*(?P<Away>\d+)\s*(?P<Live>LIVE)?\s*$"
+
+TIEBREAKS = ("goal_difference", "head_to_head")
+
+
+def parse_scores(scores):
+    """
+    "6 - 4" / "6 - 4 LIVE" / "v" -> DataFrame of Home, Away (float, NaN
+    when unplayed) and Live (bool), aligned with `scores`.
+    """
+    scores = pd.Series(scores, copy=False)
+    # A season has a few dozen distinct scores: parse each one once
+    codes, distinct = pd.factorize(scores.astype(object).fillna("").astype(str))
+    parsed = pd.Series(distinct, dtype=object).str.extract(SCORE_PATTERN)
+    return pd.DataFrame({
+        "Home": pd.to_numeric(parsed["Home"]).to_numpy()[codes],
+        "Away": pd.to_numeric(parsed["Away"]).to_numpy()[codes],
+        "Live": parsed["Live"].notna().to_numpy()[codes],
+    }, index=scores.index)
+
+
+def what_if(results, edits):
+    """
+    Copy of `results` with some scores replaced: edits maps a row label of
+    `results` to a new Score string ("3 - 3", or "v" to un-play it).
+    """
+    edited = results.copy()
+    if edits:
+        edited["Score"] = edited["Score"].astype(object)
+        for row, score in edits.items():
+            edited.loc[row, "Score"] = score
+    return edited
+
+
+def _team_rows(results, include_live):
+    """One row per (played fixture, team) with goals for and against."""
+    scores = parse_scores(results["Score"])
+    played = scores["Home"].notna().to_numpy()
+    if not include_live:
+        played = played & ~scores["Live"].to_numpy()
+
+    home = results["Home Team"].to_numpy(dtype=object)[played]
+    away = results["Away Team"].to_numpy(dtype=object)[played]
+    home_goals = scores["Home"].to_numpy()[played].astype(np.int64)
+    away_goals = scores["Away"].to_numpy()[played].astype(np.int64)
+
+    return pd.DataFrame({
+        "Team": np.concatenate([home, away]),
+        "Opponent": np.concatenate([away, home]),
+        "F": np.concatenate([home_goals, away_goals]),
+        "A": np.concatenate([away_goals, home_goals]),
+    })
+
+
+def _with_outcomes(rows, points):
+    win, draw, loss = points
+    rows = rows.assign(
+        W=(rows["F"] > rows["A"]).astype(np.int64),
+        D=(rows["F"] == rows["A"]).astype(np.int64),
+        L=(rows["F"] < rows["A"]).astype(np.int64),
+    )
+    rows["Pts"] = rows["W"] * win + rows["D"] * draw + rows["L"] * loss
+    return rows
+
+
+def league_table(results, tiebreak="goal_difference", include_live=False, points=POINTS):
+    """
+    Standings in the scraped STTable layout (TABLE_COLUMNS), sorted by
+    points, then:
+      goal_difference  Dif, F, Team (the order the league site uses)
+      head_to_head     points then goal difference in the games between
+                       the teams level on points, then Dif, F, Team
+    Every team that appears in a fixture is listed, played or not.
+    Forfeits (FF/FA) and bonus points (B) are not in the results feed
+    and are always 0.
+    """
+    if tiebreak not in TIEBREAKS:
+        raise ValueError(f"tiebreak must be one of {TIEBREAKS}, not {tiebreak!r}")
+    if results.empty:
+        return pd.DataFrame(columns=TABLE_COLUMNS)
+
+    teams = pd.unique(np.concatenate([
+        results["Home Team"].to_numpy(dtype=object), results["Away Team"].to_numpy(dtype=object)
+    ]))
+    rows = _with_outcomes(_team_rows(results, include_live), points)
+
+    table = rows.groupby("Team")[["W", "L", "D", "F", "A", "Pts"]].sum()
+    table = table.reindex(teams, fill_value=0)
+    table.index.name = "Team"
+    table["Pld"] = table["W"] + table["L"] + table["D"]
+    table["Dif"] = table["F"] - table["A"]
+    table["FF"] = table["FA"] = table["B"] = 0
+
+    sort_by, ascending = ["Pts"], [False]
+    if tiebreak == "head_to_head":
+        # Mini-league of the games between teams level on points
+        level = rows["Team"].map(table["Pts"]).to_numpy() == rows["Opponent"].map(table["Pts"]).to_numpy()
+        h2h = rows[level].groupby("Team")[["Pts", "F", "A"]].sum().reindex(table.index, fill_value=0)
+        table["H2H Pts"] = h2h["Pts"]
+        table["H2H Dif"] = h2h["F"] - h2h["A"]
+        sort_by += ["H2H Pts", "H2H Dif"]
+        ascending += [False, False]
+    sort_by += ["Dif", "F", "Team"]
+    ascending += [False, False, True]
+
+    table = table.reset_index().sort_values(sort_by, ascending=ascending, kind="stable")
+    return table[TABLE_COLUMNS].astype({c: "int64" for c in TABLE_COLUMNS[1:]}).reset_index(drop=True)
+
+
+def compare_tables(computed, scraped, columns=("Pld", "W", "L", "D", "F", "A", "Dif", "Pts")):
+    """
+    Rows where the computed and scraped standings disagree: one row per
+    (Team, column) with both values. Position differences are reported
+    under "Position". Empty when the tables match.
+    """
+    columns = [c for c in columns if c in computed.columns and c in scraped.columns]
+    left = computed.assign(Position=np.arange(1, len(computed) + 1))
+    right = scraped.assign(Position=np.arange(1, len(scraped) + 1))
+    left["Team"] = left["Team"].astype(object)
+    right["Team"] = right["Team"].astype(object)
+
+    merged = left.merge(right, on="Team", how="outer", suffixes=(" (computed)", " (scraped)"))
+    diffs = []
+    for column in ["Position"] + columns:
+        a, b = merged[f"{column} (computed)"], merged[f"{column} (scraped)"]
+        differ = ~((a == b) | (a.isna() & b.isna()))
+        if differ.any():
+            diffs.append(pd.DataFrame({
+                "Team": merged.loc[differ, "Team"],
+                "Column": column,
+                "Computed": a[differ],
+                "Scraped": b[differ],
+            }))
+    if not diffs:
+        return pd.DataFrame(columns=["Team", "Column", "Computed", "Scraped"])
+    return pd.concat(diffs, ignore_index=True)
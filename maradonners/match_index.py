@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+from .stats_engine import STAT_COLUMNS, squad_with
+from .team_analytics import EMPTY_METRICS, metrics_from_arrays
+
+# --------------------------------------------------------------------
+#              DATE-INDEXED, SEASON-PARTITIONED HISTORY
+# --------------------------------------------------------------------
+# The match store keeps ISO dates, so the whole history can be loaded
+# once as sorted datetime64 arrays. A date range becomes a [lo, hi) slice
+# found with two binary searches, and every match's player events sit in
+# one contiguous block (CSR-style offsets), so a range never touches the
+# matches outside it. Per-season player totals are precomputed: a range
+# query sums the seasons it fully covers and only counts the events of
+# the partial seasons at either end.
+
+STAT_INDEX = {stat: i for i, stat in enumerate(STAT_COLUMNS)}
+
+
+def season_of(dates, start_month=1):
+    """Season start year for each date (seasons begin on the 1st of start_month)."""
+    dates = pd.DatetimeIndex(dates)
+    return dates.year - (dates.month < start_month).astype(int)
+
+
+def season_label(year, start_month=1):
+    """2025 -> "2025" for calendar-year seasons, else "2024/25"."""
+    return str(year) if start_month == 1 else f"{year}/{str(year + 1)[-2:]}"
+
+
+def parse_league_dates(values, fmt="%A %d %b %Y"):
+    """
+    Parse the league site's "Thursday 30 Jan 2025" dates. The values are
+    returned unchanged if any of them does not match the format.
+    """
+    parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+    return values if parsed.isna().any() else parsed
+
+
+class MatchIndex:
+    """
+    Sorted, immutable view of the match history.
+
+    matches  DataFrame of Match Id, Date (datetime64), Opposition,
+             Goals Scored, Goals Conceded in date order; matches with an
+             unparseable date are kept at the end and only appear in
+             whole-history queries
+    seasons  {label: (lo, hi)} row slices of `matches`
+    """
+
+    def __init__(self, matches, events, start_month=1):
+        """
+        matches: match_id, date (ISO text), time, opposition, goals_scored, goals_conceded
+        events:  match_id, player (an ID or name), stat, count (stat is one of STAT_COLUMNS)
+        """
+        dates = pd.to_datetime(matches["date"], format="%Y-%m-%d", errors="coerce")
+        # Last key is primary: dated before undated, then date, time, id
+        order = np.lexsort((
+            matches["match_id"].to_numpy(),
+            matches["time"].to_numpy(dtype=str),
+            dates.to_numpy(dtype="datetime64[ns]").view("int64"),
+            dates.isna().to_numpy(),
+        ))
+        dates = dates.to_numpy(dtype="datetime64[ns]")[order]
+        self.matches = pd.DataFrame({
+            "Match Id": matches["match_id"].to_numpy()[order],
+            "Date": dates,
+            "Opposition": matches["opposition"].to_numpy()[order],
+            "Goals Scored": np.nan_to_num(
+                pd.to_numeric(matches["goals_scored"], errors="coerce").to_numpy(dtype="float64")[order]
+            ).astype(np.int64),
+            "Goals Conceded": np.nan_to_num(
+                pd.to_numeric(matches["goals_conceded"], errors="coerce").to_numpy(dtype="float64")[order]
+            ).astype(np.int64),
+        })
+        self.dated = int((~np.isnat(dates)).sum())
+        self._dates = dates[:self.dated]
+        self._scored = self.matches["Goals Scored"].to_numpy()
+        self._conceded = self.matches["Goals Conceded"].to_numpy()
+
+        # Events grouped by match row, in row order
+        rows = pd.Index(self.matches["Match Id"]).get_indexer(events["match_id"])
+        known = rows >= 0
+        rows = rows[known]
+        players = pd.Categorical(events["player"].to_numpy(dtype=object)[known])  # player-ID dictionary
+        stat_codes = events["stat"].map(STAT_INDEX).to_numpy()[known]
+        counts = events["count"].to_numpy(dtype=np.int64)[known]
+
+        by_row = np.argsort(rows, kind="stable")
+        self.players = players.categories.tolist()
+        self._flat_code = (players.codes.astype(np.int64) * len(STAT_COLUMNS) + stat_codes.astype(np.int64))[by_row]
+        self._counts = counts[by_row]
+        self._offsets = np.searchsorted(rows[by_row], np.arange(len(order) + 1))
+
+        # Season partitions over the dated rows
+        self.start_month = start_month
+        self.seasons = {}
+        self._season_bounds = []
+        self._season_totals = []
+        if self.dated:
+            years = np.asarray(season_of(self._dates, start_month))
+            starts = np.flatnonzero(np.concatenate(([True], years[1:] != years[:-1])))
+            ends = np.append(starts[1:], self.dated)
+            for lo, hi in zip(starts, ends):
+                self.seasons[season_label(int(years[lo]), start_month)] = (int(lo), int(hi))
+                self._season_bounds.append((int(lo), int(hi)))
+                self._season_totals.append(self._count_rows(lo, hi))
+
+    # ---- slicing ----
+    def date_slice(self, start=None, end=None):
+        """Row slice [lo, hi) of the matches dated start..end (inclusive)."""
+        lo = 0 if start is None else int(np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start), "ns"), "left"))
+        if end is None:
+            hi = self.dated
+        else:
+            # Everything on the end date counts, whatever the time
+            day_after = np.datetime64(pd.Timestamp(end).normalize() + pd.Timedelta(days=1), "ns")
+            hi = int(np.searchsorted(self._dates, day_after, "left"))
+        return lo, max(lo, hi)
+
+    def season_range(self, label):
+        """(first, last) match dates of a season."""
+        lo, hi = self.seasons[label]
+        return pd.Timestamp(self._dates[lo]), pd.Timestamp(self._dates[hi - 1])
+
+    def _bounds(self, start, end):
+        if start is None and end is None:
+            return 0, len(self.matches)  # whole history, undated matches included
+        return self.date_slice(start, end)
+
+    def match_ids(self, start=None, end=None):
+        lo, hi = self._bounds(start, end)
+        return self.matches["Match Id"].to_numpy()[lo:hi]
+
+    def history_rows(self, start=None, end=None):
+        """Positions of the range's matches in load_matches() order (by id), by date."""
+        return np.searchsorted(np.sort(self.matches["Match Id"].to_numpy()), self.match_ids(start, end))
+
+    # ---- stats ----
+    def _count_rows(self, lo, hi):
+        """(players x stats) totals for the match rows [lo, hi)."""
+        a, b = self._offsets[lo], self._offsets[hi]
+        size = len(self.players) * len(STAT_COLUMNS)
+        totals = np.bincount(self._flat_code[a:b], weights=self._counts[a:b], minlength=size)
+        return totals.astype(np.int64).reshape(len(self.players), len(STAT_COLUMNS))
+
+    def _range_totals(self, lo, hi):
+        """Whole seasons inside [lo, hi) come from the partitions; the edges are counted."""
+        totals = np.zeros((len(self.players), len(STAT_COLUMNS)), dtype=np.int64)
+        cursor = lo
+        for (s_lo, s_hi), season_totals in zip(self._season_bounds, self._season_totals):
+            if s_hi <= cursor or s_lo >= hi:
+                continue
+            if s_lo >= cursor and s_hi <= hi:
+                if s_lo > cursor:
+                    totals += self._count_rows(cursor, s_lo)
+                totals += season_totals
+                cursor = s_hi
+        if cursor < hi:
+            totals += self._count_rows(cursor, hi)
+        return totals
+
+    def player_stats(self, squad, start=None, end=None, names=None):
+        """
+        Player stats table (same shape as compute_local_stats()) for a date
+        range: the squad, then anyone else with events in the range. With
+        names ({player: name}) the Player column shows names, not keys.
+        """
+        lo, hi = self._bounds(start, end)
+        counts = pd.DataFrame(self._range_totals(lo, hi), index=self.players, columns=STAT_COLUMNS)
+        active = counts.index[counts.to_numpy().any(axis=1)]
+        counts = counts.reindex(index=squad_with(squad, active), fill_value=0).astype("int64")
+        if names is not None:
+            counts.index = [names[p] for p in counts.index]
+        counts.index.name = "Player"
+        return counts.reset_index()
+
+    def team_metrics(self, start=None, end=None):
+        """Team metrics dict (same shape as compute_team_metrics()) for a date range."""
+        lo, hi = self._bounds(start, end)
+        if hi <= lo:
+            return dict(EMPTY_METRICS)
+        return metrics_from_arrays(self._scored[lo:hi], self._conceded[lo:hi])
@@ -0,0 +1,551 @@
+import hashlib
+import os
+import sqlite3
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from . import aggregates, roster
+from .roster import DEFAULT_TEAM_ID
+from .schema import compact_local_table
+from .stats_engine import EVENT_COLUMNS, NAME_LIST_COLUMNS, explode_events
+
+# --------------------------------------------------------------------
+#                   SQLITE MATCH EVENT STORE
+# --------------------------------------------------------------------
+# Matches live in a normalized SQLite database (WAL mode) instead of a
+# CSV that is rewritten on every save:
+#   matches        one row per match, for one team
+#   appearances    who played / missed each match (player IDs)
+#   player_events  goals, assists, cards and own goals per player ID
+# Players and teams live in the roster tables (see roster). Every read
+# is for one team, so serving a team never loads another's matches.
+# load_matches() rebuilds the familiar "Name (N)" DataFrame, with each
+# player's current name, so the UI does not need to know about the tables.
+#
+# Concurrency: every write is one BEGIN IMMEDIATE transaction, so saves
+# from several sessions queue up (busy timeout) instead of overwriting
+# each other, and new matches are only ever appended. Loaders that run
+# several queries do so inside one read transaction, so they see a
+# single committed state even while another session is saving. A
+# per-team revision counter in meta is bumped by every write;
+# replace_matches refuses to overwrite a history that changed since it
+# was loaded.
+
+# Columns of the local match table, in display order
+LOCAL_COLUMNS = [
+    "Date", "Time", "Pitch", "Opposition",
+    "Goals Scored", "Goals Conceded", "Own Goals",
+    "Players", "Scorers", "Assists",
+    "Blue Cards", "Yellow Cards", "Red Cards",
+    "Missed"
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id             INTEGER PRIMARY KEY,
+    team_id        INTEGER NOT NULL DEFAULT 1,
+    date           TEXT NOT NULL,
+    time           TEXT NOT NULL DEFAULT '',
+    pitch          TEXT NOT NULL DEFAULT '',
+    opposition     TEXT NOT NULL DEFAULT '',
+    goals_scored   INTEGER,
+    goals_conceded INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_matches_date ON matches(date);
+CREATE INDEX IF NOT EXISTS idx_matches_team ON matches(team_id, date);
+
+CREATE TABLE IF NOT EXISTS appearances (
+    match_id  INTEGER NOT NULL REFERENCES matches(id) ON DELETE CASCADE,
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    played    INTEGER NOT NULL,
+    position  INTEGER NOT NULL,
+    PRIMARY KEY (match_id, played, position)
+);
+CREATE INDEX IF NOT EXISTS idx_appearances_player ON appearances(player_id);
+
+CREATE TABLE IF NOT EXISTS player_events (
+    match_id  INTEGER NOT NULL REFERENCES matches(id) ON DELETE CASCADE,
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    stat      TEXT NOT NULL,
+    count     INTEGER NOT NULL,
+    position  INTEGER NOT NULL,
+    PRIMARY KEY (match_id, stat, position)
+);
+CREATE INDEX IF NOT EXISTS idx_player_events_player ON player_events(player_id, stat);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Stat name -> source column, e.g. "Goals" -> "Scorers"
+STAT_TO_COLUMN = {stat: column for column, stat in EVENT_COLUMNS.items()}
+APPEARANCE_STATS = [EVENT_COLUMNS[c] for c in NAME_LIST_COLUMNS]
+
+
+class StaleWriteError(RuntimeError):
+    """The match history changed since the DataFrame being saved was loaded."""
+
+
+# Databases this process has created or upgraded the schema of (absolute paths)
+_prepared = set()
+
+
+def connect(db_path):
+    """Open the store, creating the schema (and upgrading old ones) once per process."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    key = os.path.abspath(db_path)
+    # A file deleted and created again since has no tables: prepare it again
+    if key not in _prepared or not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'matches'").fetchone():
+        _prepare(conn)
+        _prepared.add(key)
+    return conn
+
+
+def _prepare(conn):
+    conn.executescript(roster.SCHEMA)
+    _upgrade_to_ids(conn)
+    conn.executescript(SCHEMA + aggregates.SCHEMA)
+    if not conn.execute("SELECT 1 FROM teams").fetchone():
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            roster.seed(conn)
+    aggregates.ensure_built(conn)
+
+
+def _statements(script):
+    # executescript() commits first, so migrations run a script piecewise
+    return [statement for statement in script.split(";") if statement.strip()]
+
+
+def _upgrade_to_ids(conn):
+    """
+    Databases from before the roster stored player names in appearances /
+    player_events and had no teams: register every name as a player, move
+    the events to player IDs and give every match to the default team.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(appearances)")]
+    if "player" not in columns:
+        return  # new database, or already upgraded
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if "player" not in [row[1] for row in conn.execute("PRAGMA table_info(appearances)")]:
+            return  # another process upgraded it while we waited
+        roster.seed(conn)
+        conn.execute("ALTER TABLE matches ADD COLUMN team_id INTEGER NOT NULL DEFAULT 1")
+        names = [row[0] for row in conn.execute("SELECT player FROM appearances UNION SELECT player FROM player_events")]
+        conn.execute("CREATE TEMP TABLE player_ids (player TEXT PRIMARY KEY, player_id INTEGER NOT NULL)")
+        conn.executemany("INSERT INTO player_ids VALUES (?, ?)", zip(names, roster.resolve_players(conn, names, create=True)))
+        for table in ("appearances", "player_events"):
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_by_name")
+        conn.execute("DROP INDEX IF EXISTS idx_appearances_player")
+        conn.execute("DROP INDEX IF EXISTS idx_player_events_player")
+        for statement in _statements(SCHEMA):
+            conn.execute(statement)
+        conn.execute(
+            "INSERT INTO appearances (match_id, player_id, played, position)"
+            " SELECT match_id, player_id, played, position FROM appearances_by_name JOIN player_ids USING (player)"
+        )
+        conn.execute(
+            "INSERT INTO player_events (match_id, player_id, stat, count, position)"
+            " SELECT match_id, player_id, stat, count, position FROM player_events_by_name JOIN player_ids USING (player)"
+        )
+        conn.execute("DROP TABLE appearances_by_name")
+        conn.execute("DROP TABLE player_events_by_name")
+        conn.execute("DROP TABLE player_ids")
+        roster.record_squads(conn, 0)
+        # The totals were keyed on names: have ensure_built() redo them
+        conn.execute("DELETE FROM meta WHERE key = 'aggregates_version'")
+
+
+@contextmanager
+def _snapshot(conn):
+    """Run several reads against one consistent view of the database."""
+    conn.execute("BEGIN")
+    try:
+        yield
+    finally:
+        conn.rollback()
+
+
+def revision(conn, team_id=DEFAULT_TEAM_ID):
+    """Number of writes ever committed to a team's matches."""
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (f"revision:{team_id}",)).fetchone()
+    return int(row[0]) if row else 0
+
+
+def _bump_revision(conn, team_id):
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, '1')"
+        " ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+        (f"revision:{team_id}",),
+    )
+
+
+def _to_iso(date_str):
+    """'30/01/2025' -> '2025-01-30' so the date index sorts correctly."""
+    try:
+        return datetime.strptime(str(date_str), "%d/%m/%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return str(date_str)
+
+
+def _from_iso(iso_dates):
+    """'2025-01-30' -> '30/01/2025' for a whole column; other text is kept as is."""
+    valid = pd.to_datetime(iso_dates, format="%Y-%m-%d", errors="coerce").notna()
+    text = iso_dates.astype(str)
+    flipped = text.str[8:10] + "/" + text.str[5:7] + "/" + text.str[:4]
+    return flipped.astype(object).where(valid, iso_dates)
+
+
+def _int_or_none(value):
+    value = pd.to_numeric(value, errors="coerce")
+    return None if pd.isna(value) else int(value)
+
+
+def _insert_matches(conn, df, team_id, new_players=False):
+    """
+    Insert local-format match rows for a team. Names resolve through the
+    roster aliases; an unknown name raises roster.UnknownPlayersError
+    unless new_players. Must run inside a transaction.
+    """
+    if df.empty:
+        return []
+
+    first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM matches").fetchone()[0]
+    match_ids = list(range(first_id, first_id + len(df)))
+
+    conn.executemany(
+        "INSERT INTO matches (id, team_id, date, time, pitch, opposition, goals_scored, goals_conceded)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                match_id,
+                team_id,
+                _to_iso(row.get("Date", "")),
+                str(row.get("Time", "") or ""),
+                str(row.get("Pitch", "") or ""),
+                str(row.get("Opposition", "") or ""),
+                _int_or_none(row.get("Goals Scored")),
+                _int_or_none(row.get("Goals Conceded")),
+            )
+            for match_id, row in zip(match_ids, df.to_dict("records"))
+        ],
+    )
+
+    events = explode_events(df)
+    events["match_id"] = events["Match"].map(dict(enumerate(match_ids)))
+    events["position"] = events.groupby(["Match", "Stat"], observed=True).cumcount()
+    # One alias lookup per distinct name, taken back by category code
+    player_ids = roster.resolve_players(conn, events["Player"].cat.categories.tolist(), create=new_players)
+    events["player_id"] = np.asarray(player_ids, dtype=np.int64)[events["Player"].cat.codes.to_numpy()]
+
+    is_appearance = events["Stat"].isin(APPEARANCE_STATS)
+    apps = events[is_appearance]
+    conn.executemany(
+        "INSERT INTO appearances (match_id, player_id, played, position) VALUES (?, ?, ?, ?)",
+        zip(
+            apps["match_id"].tolist(),
+            apps["player_id"].tolist(),
+            (apps["Stat"] == "Appearances").astype(int).tolist(),
+            apps["position"].tolist(),
+        ),
+    )
+    contributions = events[~is_appearance]
+    conn.executemany(
+        "INSERT INTO player_events (match_id, player_id, stat, count, position) VALUES (?, ?, ?, ?, ?)",
+        zip(
+            contributions["match_id"].tolist(),
+            contributions["player_id"].tolist(),
+            contributions["Stat"].tolist(),
+            contributions["Count"].tolist(),
+            contributions["position"].tolist(),
+        ),
+    )
+    roster.record_squads(conn, first_id)
+    aggregates.apply_delta(conn, first_id)
+    return match_ids
+
+
+def get_meta(conn, key):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def append_batch(conn, df, meta=None, team_id=DEFAULT_TEAM_ID, new_players=False):
+    """
+    Append a batch of already-validated matches and set `meta` keys in
+    one transaction (bulk import: the batch and its progress commit
+    together). df may be None to only update meta.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if df is not None and not df.empty:
+            _bump_revision(conn, team_id)
+            _insert_matches(conn, df, team_id, new_players)
+        for key, value in (meta or {}).items():
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+
+def save_match(new_row, db_path, team_id=DEFAULT_TEAM_ID, new_players=False):
+    """
+    Append one match in a single transaction and return its id. Raises
+    roster.UnknownPlayersError (saving nothing) for a name the roster does
+    not know, unless new_players.
+    """
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            _bump_revision(conn, team_id)
+            return _insert_matches(conn, pd.DataFrame([new_row]), team_id, new_players)[0]
+    finally:
+        conn.close()
+
+
+def replace_matches(df, db_path, expected_revision=None, team_id=DEFAULT_TEAM_ID, new_players=False):
+    """
+    Replace a team's whole match history (used after edits or deletions).
+    With expected_revision (df.attrs["revision"] from load_matches),
+    raises StaleWriteError instead of dropping matches saved since.
+    Names must be in the roster unless new_players (see save_match).
+    """
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            current = revision(conn, team_id)
+            if expected_revision is not None and current != expected_revision:
+                raise StaleWriteError(
+                    f"match history changed since it was loaded (revision {expected_revision} -> {current})"
+                )
+            _bump_revision(conn, team_id)
+            conn.execute("DELETE FROM matches WHERE team_id = ?", (team_id,))
+            aggregates.rebuild(conn, team_id)
+            _insert_matches(conn, df, team_id, new_players)
+    finally:
+        conn.close()
+
+
+def delete_match(match_id, db_path):
+    """Delete one past match and rebuild its team's aggregates."""
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT team_id FROM matches WHERE id = ?", (match_id,)).fetchone()
+            if row is None:
+                return
+            _bump_revision(conn, row[0])
+            conn.execute("DELETE FROM matches WHERE id = ?", (match_id,))
+            aggregates.rebuild(conn, row[0])
+    finally:
+        conn.close()
+
+
+def load_roster(db_path):
+    """Teams, players, aliases and squads (see roster.Roster)."""
+    conn = connect(db_path)
+    try:
+        return roster.load(conn)
+    finally:
+        conn.close()
+
+
+def roster_write(db_path, change, *args, **kwargs):
+    """Run change(conn, *args) (a roster writer) in its own transaction and return its result."""
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return change(conn, *args, **kwargs)
+    finally:
+        conn.close()
+
+
+def load_player_stats(db_path, squad, names, team_id=DEFAULT_TEAM_ID):
+    """Per-player counters of a team read from the materialized aggregates (squad: player IDs)."""
+    conn = connect(db_path)
+    try:
+        return aggregates.player_stats(conn, team_id, squad, names)
+    finally:
+        conn.close()
+
+
+def load_team_metrics(db_path, team_id=DEFAULT_TEAM_ID):
+    """Team metrics read from the materialized aggregates."""
+    conn = connect(db_path)
+    try:
+        return aggregates.team_metrics(conn, team_id)
+    finally:
+        conn.close()
+
+
+def load_index(db_path, season_start_month=1, team_id=DEFAULT_TEAM_ID):
+    """Date-sorted, season-partitioned MatchIndex of a team's history, keyed on player IDs."""
+    from .match_index import MatchIndex
+
+    conn = connect(db_path)
+    try:
+        with _snapshot(conn):
+            matches = pd.read_sql_query(
+                "SELECT id AS match_id, date, time, opposition, goals_scored, goals_conceded FROM matches"
+                " WHERE team_id = ?",
+                conn, params=(team_id,),
+            )
+            events = pd.read_sql_query(
+                """
+                SELECT a.match_id, a.player_id AS player,
+                       CASE a.played WHEN 1 THEN 'Appearances' ELSE 'Missed Games' END AS stat,
+                       1 AS count
+                FROM appearances a JOIN matches m ON m.id = a.match_id WHERE m.team_id = :team
+                UNION ALL
+                SELECT e.match_id, e.player_id, e.stat, e.count
+                FROM player_events e JOIN matches m ON m.id = e.match_id WHERE m.team_id = :team
+                """,
+                conn, params={"team": team_id},
+            )
+    finally:
+        conn.close()
+    return MatchIndex(matches, events, start_month=season_start_month)
+
+
+def load_matches(db_path, team_id=DEFAULT_TEAM_ID):
+    """
+    Rebuild a team's match table with one row per match and the
+    contribution columns as "Name (N), Name2 (M)" strings, in the compact
+    schema (see schema.compact_local_table). attrs["revision"] records
+    the team's revision it was read at.
+    """
+    conn = connect(db_path)
+    try:
+        with _snapshot(conn):
+            revision_seen = revision(conn, team_id)
+            matches = pd.read_sql_query(
+                "SELECT * FROM matches WHERE team_id = ? ORDER BY id", conn, params=(team_id,)
+            )
+            # Strings are joined by SQLite: GROUP_CONCAT keeps the subquery's order
+            lists = pd.read_sql_query(
+                "SELECT match_id, CASE played WHEN 1 THEN 'Players' ELSE 'Missed' END AS col,"
+                " GROUP_CONCAT(name, ', ') AS text FROM ("
+                "  SELECT a.match_id, a.played, p.name FROM appearances a"
+                "  JOIN matches m ON m.id = a.match_id JOIN players p ON p.id = a.player_id"
+                "  WHERE m.team_id = ? ORDER BY a.match_id, a.played DESC, a.position"
+                ") GROUP BY match_id, played",
+                conn, params=(team_id,),
+            )
+            counts = pd.read_sql_query(
+                "SELECT match_id, stat AS col, GROUP_CONCAT(name || ' (' || count || ')', ', ') AS text FROM ("
+                "  SELECT e.match_id, e.stat, p.name, e.count FROM player_events e"
+                "  JOIN matches m ON m.id = e.match_id JOIN players p ON p.id = e.player_id"
+                "  WHERE m.team_id = ? ORDER BY e.match_id, e.stat, e.position"
+                ") GROUP BY match_id, stat",
+                conn, params=(team_id,),
+            )
+    finally:
+        conn.close()
+
+    df = pd.DataFrame({
+        "Date": _from_iso(matches["date"]),
+        "Time": matches["time"],
+        "Pitch": matches["pitch"],
+        "Opposition": matches["opposition"],
+        "Goals Scored": matches["goals_scored"].astype("Int64"),
+        "Goals Conceded": matches["goals_conceded"].astype("Int64"),
+    })
+    df.index = matches["id"]
+
+    counts["col"] = counts["col"].map(STAT_TO_COLUMN)
+    entries = pd.concat([lists, counts], ignore_index=True)
+    if not entries.empty:
+        df = df.join(entries.pivot(index="match_id", columns="col", values="text"))
+
+    for column in LOCAL_COLUMNS:
+        if column not in df.columns:
+            df[column] = ""
+        if column not in ("Goals Scored", "Goals Conceded"):
+            df[column] = df[column].fillna("").astype(object)
+
+    df = compact_local_table(df[LOCAL_COLUMNS].reset_index(drop=True))
+    df.attrs["revision"] = revision_seen  # for replace_matches(expected_revision=...)
+    return df
+
+
+def migration_key(csv_path):
+    """Meta key marking a legacy CSV as migrated, by content (not path: checkouts move)."""
+    with open(csv_path, "rb") as f:
+        return "migrated_csv:" + hashlib.sha256(f.read()).hexdigest()
+
+
+def _delete_migrated(conn, df):
+    """
+    Delete the default team's matches an earlier migration of `df` added:
+    one match per CSV row with the same date, time, pitch, opposition and
+    score (the oldest first).
+    """
+    rows = Counter(
+        (
+            _to_iso(row.get("Date", "")),
+            str(row.get("Time", "") or ""),
+            str(row.get("Pitch", "") or ""),
+            str(row.get("Opposition", "") or ""),
+            _int_or_none(row.get("Goals Scored")),
+            _int_or_none(row.get("Goals Conceded")),
+        )
+        for row in df.to_dict("records")
+    )
+    for (date, time, pitch, opposition, scored, conceded), n in rows.items():
+        conn.execute(
+            "DELETE FROM matches WHERE id IN (SELECT id FROM matches WHERE team_id = ? AND date = ? AND time = ?"
+            " AND pitch = ? AND opposition = ? AND goals_scored IS ? AND goals_conceded IS ? ORDER BY id LIMIT ?)",
+            (DEFAULT_TEAM_ID, date, time, pitch, opposition, scored, conceded, n),
+        )
+
+
+def migrate_csv(csv_path, db_path, force=False):
+    """
+    One-shot import of the legacy maradonners_fc_results.csv into the
+    default team. Does nothing once any legacy CSV has been migrated into
+    this database, unless force=True, which replaces the matches the
+    earlier migration added instead of adding them a second time.
+    Returns the number of matches imported.
+    """
+    if not os.path.exists(csv_path):
+        return 0
+
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # 'migrated_csv' and 'migrated_csv:<path>' are the older markers
+            done = conn.execute(
+                "SELECT 1 FROM meta WHERE key = 'migrated_csv' OR key LIKE 'migrated_csv:%'"
+            ).fetchone()
+            if done and not force:
+                return 0
+
+            df = pd.read_csv(
+                csv_path,
+                dtype={"Goals Scored": "Int64", "Goals Conceded": "Int64", "Own Goals": "object"},
+            ).fillna("")
+            _bump_revision(conn, DEFAULT_TEAM_ID)
+            if done:
+                _delete_migrated(conn, df)
+                aggregates.rebuild(conn, DEFAULT_TEAM_ID)
+            # The legacy history predates the roster: its names become players
+            _insert_matches(conn, df, DEFAULT_TEAM_ID, new_players=True)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (migration_key(csv_path), datetime.now().isoformat(timespec="seconds")),
+            )
+            return len(df)
+    finally:
+        conn.close()
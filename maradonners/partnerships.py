@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from .stats_engine import explode_events
+from .team_analytics import goal_arrays
+
+try:
+    from scipy import sparse
+except ImportError:  # in requirements.txt; fall back to dense numpy arrays without it
+    sparse = None
+
+# --------------------------------------------------------------------
+#            PLAYER CO-APPEARANCE & ON-PITCH IMPACT
+# --------------------------------------------------------------------
+# The Players column says exactly who played each match. That becomes a
+# (matches x players) 0/1 incidence matrix M (scipy.sparse CSR; a dense
+# array if scipy is missing, 8 bytes per match per player: 4 MB for
+# 10,000 matches of a 50-player pool) and everything else is matrix
+# algebra over it, with no loops over pairs:
+#   M.T @ M                 games each pair played together (diagonal:
+#                           appearances)
+#   M.T @ g                 goals for / against / points with a player on
+#   M.T @ diag(g) @ M       the same for every pair
+# Exact lineups are keyed by a sum of random 64-bit player weights per
+# match, so identical line-ups group together without sorting names.
+
+LINEUP_SIZE = 8
+MIN_LINEUP_GAMES = 3
+
+
+def _incidence(rows, cols, shape):
+    """0/1 matrix with ones at (rows, cols); duplicates count once."""
+    flat = np.unique(rows.astype(np.int64) * shape[1] + cols)
+    rows, cols = np.divmod(flat, shape[1])
+    if sparse is not None:
+        return sparse.csr_matrix((np.ones(len(flat)), (rows, cols)), shape=shape)
+    matrix = np.zeros(shape)
+    matrix[rows, cols] = 1.0
+    return matrix
+
+
+def _dense(matrix):
+    return matrix.toarray() if sparse is not None and sparse.issparse(matrix) else np.asarray(matrix)
+
+
+def _scale_rows(matrix, weights):
+    """diag(weights) @ matrix."""
+    if sparse is not None and sparse.issparse(matrix):
+        return sparse.diags(weights) @ matrix
+    return matrix * weights[:, None]
+
+
+def incidence_matrix(df):
+    """
+    (M, players): the match x player appearance matrix of the local match
+    table and the player names for its columns.
+    """
+    apps = explode_events(df[["Players"]])  # only who played, not who missed
+    players = apps["Player"].cat.remove_unused_categories()
+    names = list(players.cat.categories)
+    matrix = _incidence(apps["Match"].to_numpy(), players.cat.codes.to_numpy(), (len(df), len(names)))
+    return matrix, names
+
+
+def partnerships(df, min_lineup_games=MIN_LINEUP_GAMES):
+    """
+    Co-appearance and on-pitch impact for the local match table:
+      players      player names (matrix order)
+      together     players x players games played together (diagonal:
+                   appearances)
+      player       per-player table: Apps, GF/GA/Points per game with
+                   the player on the pitch
+      pair_points  points per game for each pair (NaN if never together)
+      pair_dif     goal difference per game for each pair
+      lineups      exact line-ups of LINEUP_SIZE players with at least
+                   min_lineup_games games together, best first
+    """
+    matrix, names = incidence_matrix(df)
+    scored, conceded = goal_arrays(df)
+    outcome = np.sign(scored - conceded)
+    points = np.select([outcome > 0, outcome == 0], [3, 1], 0).astype(np.float64)
+    scored, conceded = scored.astype(np.float64), conceded.astype(np.float64)
+
+    together = _dense(matrix.T @ matrix)
+    apps = np.diag(together)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_game = lambda totals, games: np.where(games > 0, totals / games, np.nan)  # noqa: E731
+        player = pd.DataFrame({
+            "Player": names,
+            "Apps": apps.astype(np.int64),
+            "GF / Game": per_game(matrix.T @ scored, apps),
+            "GA / Game": per_game(matrix.T @ conceded, apps),
+            "Points / Game": per_game(matrix.T @ points, apps),
+        })
+        pair_points = per_game(_dense(matrix.T @ _scale_rows(matrix, points)), together)
+        pair_dif = per_game(_dense(matrix.T @ _scale_rows(matrix, scored - conceded)), together)
+
+    return {
+        "players": names,
+        "together": pd.DataFrame(together.astype(np.int64), index=names, columns=names),
+        "player": player.sort_values(["Points / Game", "Apps"], ascending=False).reset_index(drop=True).round(2),
+        "pair_points": pd.DataFrame(pair_points, index=names, columns=names).round(2),
+        "pair_dif": pd.DataFrame(pair_dif, index=names, columns=names).round(2),
+        "lineups": best_lineups(matrix, names, scored, conceded, points, min_games=min_lineup_games),
+    }
+
+
+def best_lineups(matrix, names, scored, conceded, points, size=LINEUP_SIZE, min_games=MIN_LINEUP_GAMES, seed=0):
+    """Line-ups of exactly `size` players that played together, by points then goal difference per game."""
+    columns = ["Lineup", "Games", "Points / Game", "GD / Game", "GF", "GA"]
+    weights = np.random.default_rng(seed).integers(1, 2**63, size=len(names), dtype=np.uint64)
+    m = matrix.tocsr() if sparse is not None and sparse.issparse(matrix) else None
+    if m is not None:
+        rows = np.repeat(np.arange(m.shape[0]), np.diff(m.indptr))
+        cols = m.indices
+    else:
+        rows, cols = np.nonzero(matrix)
+    sizes = np.bincount(rows, minlength=matrix.shape[0])
+    keys = np.zeros(matrix.shape[0], dtype=np.uint64)
+    np.add.at(keys, rows, weights[cols])  # wraps modulo 2**64
+
+    full = np.flatnonzero(sizes == size)
+    if full.size == 0:
+        return pd.DataFrame(columns=columns)
+    games = pd.DataFrame({
+        "Key": keys[full], "Match": full,
+        "GF": scored[full], "GA": conceded[full], "Points": points[full],
+    })
+    grouped = games.groupby("Key").agg(
+        Match=("Match", "first"), Games=("Match", "size"),
+        GF=("GF", "sum"), GA=("GA", "sum"), Points=("Points", "sum"),
+    )
+    grouped = grouped[grouped["Games"] >= min_games]
+
+    # Names of each line-up from its first match
+    first = np.isin(rows, grouped["Match"].to_numpy())
+    lineup_names = pd.Series(np.asarray(names, dtype=object)[cols[first]]).groupby(rows[first]).agg(", ".join)
+    grouped["Lineup"] = lineup_names.reindex(grouped["Match"]).to_numpy()
+    grouped["Points / Game"] = grouped["Points"] / grouped["Games"]
+    grouped["GD / Game"] = (grouped["GF"] - grouped["GA"]) / grouped["Games"]
+    grouped = grouped.sort_values(["Points / Game", "GD / Game", "Games"], ascending=False)
+    result = grouped[columns].reset_index(drop=True).round(2)
+    return result.astype({"Games": "int64", "GF": "int64", "GA": "int64"})
+
@@ -0,0 +1,200 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .fileio import file_lock, write_json_atomic
+from .league_table import parse_scores
+from .match_index import parse_league_dates
+
+# --------------------------------------------------------------------
+#            TEAM NAMES & INCREMENTAL ELO RATINGS
+# --------------------------------------------------------------------
+# Team names are free text in both files ("Sipholile Blues Fc",
+# '"MNS" Attorneys'), so every name is reduced to a key (case, quotes,
+# punctuation and a trailing "FC" ignored) before the local results and
+# the league fixtures are joined. Ratings are a goal-difference Elo over
+# the league fixtures in date order. The state (ratings plus the score
+# of every fixture already applied) is saved as JSON, and an update only
+# applies the fixtures it has not seen. A game still LIVE is skipped
+# until its final score is scraped, so it is applied once, as new. A
+# corrected score, or a result dated before the last one applied,
+# triggers one rebuild from scratch.
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 30.0
+STATE_VERSION = 1
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_SUFFIXES = {"fc", "afc"}
+
+
+def team_key(name, aliases=None):
+    """
+    'Sipholile Blues Fc' -> 'sipholile blues'; '"MNS" Attorneys' -> 'mns attorneys'.
+    `aliases` maps extra spellings to a canonical name first.
+    """
+    name = str(name)
+    if aliases and name in aliases:
+        name = aliases[name]
+    tokens = _NON_ALNUM.sub(" ", name.casefold()).split()
+    while len(tokens) > 1 and tokens[-1] in _SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def goal_multiplier(goal_diff):
+    """World Football Elo margin-of-victory weight: 1, 1.5, then (11 + N) / 8."""
+    goal_diff = np.abs(goal_diff)
+    return np.where(goal_diff <= 1, 1.0, np.where(goal_diff == 2, 1.5, (11 + goal_diff) / 8))
+
+
+def expected_score(rating, opponent_rating):
+    """Elo expected score (win = 1, draw = 0.5) of `rating` against `opponent_rating`."""
+    return 1.0 / (1.0 + 10 ** ((np.asarray(opponent_rating) - np.asarray(rating)) / 400.0))
+
+
+def empty_state():
+    return {"version": STATE_VERSION, "ratings": {}, "games": {}, "names": {}, "applied": {}, "last_date": None}
+
+
+def load_state(path):
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+    return empty_state()
+
+
+def save_state(path, state):
+    write_json_atomic(path, state, indent=1, sort_keys=True)
+
+
+def league_fixtures(results, aliases=None):
+    """
+    Every fixture in date order with Key, Day, Time, Home / Away names and
+    keys, goals (NaN until played), Score ("6-4", "" until played) and
+    Played (final: not LIVE, not unplayed). Key identifies a fixture
+    across scrapes.
+    """
+    scores = parse_scores(results["Score"])
+    played = (scores["Home"].notna() & ~scores["Live"]).to_numpy()
+    dates = results["Date"]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(parse_league_dates(dates.astype(object)), errors="coerce")
+
+    fixtures = pd.DataFrame({
+        "Day": dates.dt.strftime("%Y-%m-%d").fillna("").to_numpy(),
+        "Time": results["Time"].astype(object).fillna("").astype(str).to_numpy() if "Time" in results else "",
+        "Home": results["Home Team"].astype(object).to_numpy(),
+        "Away": results["Away Team"].astype(object).to_numpy(),
+        "Home Goals": scores["Home"].to_numpy(),
+        "Away Goals": scores["Away"].to_numpy(),
+        "Played": played,
+    })
+    fixtures["Home Key"] = [team_key(t, aliases) for t in fixtures["Home"]]
+    fixtures["Away Key"] = [team_key(t, aliases) for t in fixtures["Away"]]
+    fixtures["Key"] = fixtures["Day"] + "|" + fixtures["Time"] + "|" + fixtures["Home Key"] + "|" + fixtures["Away Key"]
+    score = (
+        fixtures["Home Goals"].fillna(0).astype(int).astype(str) + "-"
+        + fixtures["Away Goals"].fillna(0).astype(int).astype(str)
+    )
+    fixtures["Score"] = score.where(fixtures["Played"], "")
+    return fixtures.sort_values(["Day", "Time", "Key"], kind="stable").reset_index(drop=True)
+
+
+def played_fixtures(results, aliases=None):
+    """Final (not LIVE, not unplayed) fixtures of league_fixtures()."""
+    fixtures = league_fixtures(results, aliases)
+    return fixtures[fixtures["Played"]].drop(columns="Played").reset_index(drop=True)
+
+
+def _apply(state, fixtures, k_factor):
+    """Apply fixtures (already in date order) to the ratings, one game at a time."""
+    ratings, games, names, applied = state["ratings"], state["games"], state["names"], state["applied"]
+    for key, day, score, home, away, home_name, away_name, home_goals, away_goals in zip(
+        fixtures["Key"], fixtures["Day"], fixtures["Score"], fixtures["Home Key"], fixtures["Away Key"],
+        fixtures["Home"], fixtures["Away"], fixtures["Home Goals"], fixtures["Away Goals"],
+    ):
+        names.setdefault(home, home_name)
+        names.setdefault(away, away_name)
+        r_home = ratings.get(home, INITIAL_RATING)
+        r_away = ratings.get(away, INITIAL_RATING)
+        diff = home_goals - away_goals
+        actual = 1.0 if diff > 0 else 0.5 if diff == 0 else 0.0
+        change = float(k_factor * goal_multiplier(diff) * (actual - expected_score(r_home, r_away)))
+        ratings[home] = r_home + change
+        ratings[away] = r_away - change
+        games[home] = games.get(home, 0) + 1
+        games[away] = games.get(away, 0) + 1
+        applied[key] = score
+        state["last_date"] = max(state["last_date"] or "", day)
+
+
+def update_ratings(results, state_path, aliases=None, k_factor=K_FACTOR, rebuild=False):
+    """
+    Bring the saved ratings up to date with `results` (match_results.csv).
+    Returns (state, n_applied, rebuilt). The state file is only written
+    when something changed, under a lock so concurrent updates do not
+    apply the same fixtures twice.
+    """
+    fixtures = played_fixtures(results, aliases)
+    with file_lock(state_path):
+        state = empty_state() if rebuild else load_state(state_path)
+        seen = fixtures["Key"].map(state["applied"])
+        corrected = seen.notna() & (seen != fixtures["Score"])
+        new = fixtures[seen.isna()]
+        late = state["last_date"] is not None and (new["Day"] < state["last_date"]).any()
+
+        rebuilt = rebuild
+        if corrected.any() or late:
+            state, new, rebuilt = empty_state(), fixtures, True
+        if not new.empty or rebuild:
+            _apply(state, new, k_factor)
+            save_state(state_path, state)
+    return state, len(new), rebuilt
+
+
+def ratings_table(state):
+    """Team, Rating, Games, Rank: strongest first."""
+    table = pd.DataFrame({
+        "Key": list(state["ratings"]),
+        "Rating": list(state["ratings"].values()),
+    })
+    if table.empty:
+        return pd.DataFrame(columns=["Rank", "Team", "Rating", "Games"])
+    table["Team"] = table["Key"].map(state["names"])
+    table["Games"] = table["Key"].map(state["games"]).astype("int64")
+    table = table.sort_values("Rating", ascending=False).reset_index(drop=True)
+    table["Rank"] = np.arange(1, len(table) + 1)
+    table["Rating"] = table["Rating"].round(1)
+    return table[["Rank", "Team", "Rating", "Games"]]
+
+
+def strength_of_schedule(local, state, our_team, aliases=None):
+    """
+    Our local results against rated opponents: opponent rating, our
+    expected score and actual score (win 1, draw 0.5), and the difference.
+    Unrated opponents (friendlies, other leagues) get INITIAL_RATING.
+    """
+    ratings = state["ratings"]
+    our_rating = ratings.get(team_key(our_team, aliases), INITIAL_RATING)
+    keys = [team_key(name, aliases) for name in local["Opposition"].astype(object)]
+    opponent = np.array([ratings.get(k, INITIAL_RATING) for k in keys], dtype=np.float64)
+    scored = pd.to_numeric(local["Goals Scored"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    conceded = pd.to_numeric(local["Goals Conceded"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    actual = np.where(scored > conceded, 1.0, np.where(scored == conceded, 0.5, 0.0))
+    expected = expected_score(our_rating, opponent)
+
+    return pd.DataFrame({
+        "Date": local["Date"].to_numpy(),
+        "Opposition": local["Opposition"].astype(object).to_numpy(),
+        "Rated": [k in ratings for k in keys],
+        "Opponent Rating": opponent.round(1),
+        "Expected": expected.round(2),
+        "Actual": actual,
+        "Over Expected": (actual - expected).round(2),
+    })
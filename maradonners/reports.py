@@ -0,0 +1,298 @@
+import base64
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from . import charts
+from .config import REPORT_WORKERS
+from .fileio import file_lock, write_atomic, write_json_atomic
+from .stats_engine import STAT_COLUMNS, explode_events, player_stats_table, squad_with
+from .team_analytics import RESULT_LETTERS, date_order
+
+# --------------------------------------------------------------------
+#                BATCH PLAYER & SEASON REPORTS
+# --------------------------------------------------------------------
+# One self-contained HTML page (inline CSS, charts as data: URIs) per
+# squad member and one for the season, built from compute_local_stats /
+# compute_team_metrics and the match table; optionally a PDF of each,
+# drawn with matplotlib's PdfPages so no extra dependency is needed.
+# The parent process explodes the match table once and hands every
+# report its own small payload; reports are rendered in a process pool.
+# Each payload is fingerprinted and the fingerprints kept in
+# manifest.json beside the reports, so a re-run only rebuilds the
+# players whose numbers changed (the season page changes with any match).
+
+# Part of every fingerprint: bump when the layout changes to rebuild all
+REPORT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+LOG_COLUMNS = ["Date", "Opposition", "Result", "Score", "Goals", "Assists", "Own Goals", "Cards"]
+
+ReportSummary = namedtuple("ReportSummary", ["generated", "skipped", "directory"])
+
+CSS = """
+body { font-family: -apple-system, 'Segoe UI', Roboto, sans-serif; margin: 2em auto; max-width: 60em; color: #222; }
+h1 { margin-bottom: 0.2em; } .generated { color: #777; font-size: 0.9em; }
+.tiles { display: flex; flex-wrap: wrap; gap: 0.8em; margin: 1.2em 0; }
+.tile { background: #f4f6f8; border-radius: 6px; padding: 0.6em 1em; min-width: 7em; }
+.tile b { display: block; font-size: 1.5em; }
+table { border-collapse: collapse; width: 100%; font-size: 0.9em; }
+th, td { padding: 0.3em 0.6em; border-bottom: 1px solid #ddd; text-align: left; }
+th { background: #f4f6f8; } img { max-width: 100%; }
+"""
+
+
+def slug(name):
+    """File-name-safe version of a player name."""
+    return re.sub(r"[^a-z0-9]+", "-", str(name).casefold()).strip("-") or "player"
+
+
+# --------------------------------------------------------------------
+#                          PAYLOADS
+# --------------------------------------------------------------------
+def match_log(df):
+    """
+    (matches, contributions): the match table in date order with Result
+    and Score, and per (match, player) stat counts from one explode.
+    """
+    order, dates = date_order(df)
+    scored = pd.to_numeric(df["Goals Scored"], errors="coerce").fillna(0).astype("int64").to_numpy()
+    conceded = pd.to_numeric(df["Goals Conceded"], errors="coerce").fillna(0).astype("int64").to_numpy()
+    matches = pd.DataFrame({
+        "Date": dates.to_numpy(),
+        "Opposition": df["Opposition"].astype(object).to_numpy() if "Opposition" in df.columns else "",
+        "Result": RESULT_LETTERS[np.sign(scored - conceded) + 1],
+        "Score": [f"{s} - {c}" for s, c in zip(scored, conceded)],
+        "Points": np.array([0, 1, 3])[np.sign(scored - conceded) + 1],
+    })
+    events = explode_events(df)
+    contributions = (
+        events.groupby(["Match", "Player", "Stat"], observed=True)["Count"].sum()
+        .unstack("Stat", fill_value=0)
+        .reindex(columns=STAT_COLUMNS, fill_value=0)
+    )
+    return matches.iloc[order], contributions
+
+
+def player_payloads(df, player_stats, squad):
+    """{player: payload} with the stats row, match-by-match log, record and trend table."""
+    matches, contributions = match_log(df)
+    stats = (
+        player_stats.drop_duplicates("Player").set_index("Player")
+        .reindex(index=squad, columns=STAT_COLUMNS).fillna(0).astype("int64")
+    )
+    by_player = dict(tuple(contributions.groupby(level="Player", observed=True)))
+
+    payloads = {}
+    for player in squad:
+        own = by_player.get(player)
+        if own is None or own.empty:
+            own = pd.DataFrame(columns=STAT_COLUMNS, dtype="int64")
+        else:
+            own = own.droplevel("Player")
+        played = own[own["Appearances"] > 0]
+        log = matches.loc[matches.index.intersection(played.index)].join(played)
+        log["Cards"] = log[["Blue Cards", "Yellow Cards", "Red Cards"]].sum(axis=1)
+        record = log["Result"].value_counts().reindex(["W", "D", "L"], fill_value=0)
+        payloads[player] = {
+            "player": player,
+            "stats": {c: int(stats.at[player, c]) for c in STAT_COLUMNS},
+            "record": {k: int(v) for k, v in record.items()},
+            "points_per_game": round(float(log["Points"].mean()), 2) if len(log) else 0.0,
+            "log": log[LOG_COLUMNS].reset_index(drop=True),
+            "trend": log.set_index("Date")[["Goals", "Assists"]].cumsum(),
+        }
+    return payloads
+
+
+def season_payload(df, player_stats, team_metrics, squad):
+    return {
+        "metrics": dict(team_metrics),
+        "table": player_stats_table(player_stats, squad),
+        "charts": {name: chart for name, chart in charts.season_charts(df).items()},
+    }
+
+
+def fingerprint(payload):
+    """SHA-256 over the report version and every value in the payload."""
+    digest = hashlib.sha256(str(REPORT_VERSION).encode())
+
+    def feed(value):
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            labels = list(value.columns) if isinstance(value, pd.DataFrame) else value.name
+            digest.update(repr((labels, value.shape)).encode())
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        elif isinstance(value, dict):
+            for key in sorted(value, key=str):
+                digest.update(repr(key).encode())
+                feed(value[key])
+        elif isinstance(value, (tuple, list)):
+            for item in value:
+                feed(item)
+        else:
+            digest.update(repr(value).encode())
+
+    feed(payload)
+    return digest.hexdigest()
+
+
+# --------------------------------------------------------------------
+#                          RENDERING
+# --------------------------------------------------------------------
+def _img(png):
+    return f'<img alt="" src="data:image/png;base64,{base64.b64encode(png).decode()}">'
+
+
+def _tiles(items):
+    return '<div class="tiles">' + "".join(
+        f'<div class="tile"><b>{html.escape(str(v))}</b>{html.escape(k)}</div>' for k, v in items
+    ) + "</div>"
+
+
+def _page(title, body, generated):
+    return (
+        f"<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>"
+        f"<style>{CSS}</style></head><body><h1>{html.escape(title)}</h1>"
+        f'<p class="generated">Maradonners FC · generated {generated}</p>{body}</body></html>\n'
+    )
+
+
+def _log_html(log):
+    shown = log.assign(Date=pd.to_datetime(log["Date"]).dt.strftime("%d/%m/%Y"))
+    return shown.to_html(index=False, border=0, na_rep="")
+
+
+def player_html(payload, generated, trend_png):
+    s, record = payload["stats"], payload["record"]
+    games = s["Appearances"]
+    body = _tiles([
+        ("Appearances", games), ("Goals", s["Goals"]), ("Assists", s["Assists"]),
+        ("Goals / game", f"{s['Goals'] / games:.2f}" if games else "–"),
+        ("Missed games", s["Missed Games"]),
+        ("Cards (B/Y/R)", f"{s['Blue Cards']}/{s['Yellow Cards']}/{s['Red Cards']}"),
+        ("Own goals", s["Own Goals"]),
+        ("Team W-D-L", f"{record['W']}-{record['D']}-{record['L']}"),
+        ("Points / game", payload["points_per_game"]),
+    ])
+    body += "<h2>Trend</h2>" + _img(trend_png)
+    body += "<h2>Matches played</h2>" + (_log_html(payload["log"]) if len(payload["log"]) else "<p>No matches yet.</p>")
+    return _page(f"{payload['player']}: player report", body, generated)
+
+
+def season_html(payload, generated, pngs, links):
+    m = payload["metrics"]
+    body = _tiles([(k, v) for k, v in m.items()])
+    body += "<h2>Season trends</h2>" + "".join(_img(png) for png in pngs.values())
+    body += "<h2>Player statistics</h2>" + payload["table"].to_html(index=False, border=0)
+    body += "<h2>Player reports</h2><ul>" + "".join(
+        f'<li><a href="{html.escape(href)}">{html.escape(name)}</a></li>' for name, href in links
+    ) + "</ul>"
+    return _page("Season report", body, generated)
+
+
+def _pdf(path, title, rows, chart_specs):
+    """A4 pages: title and a key/value table, then one chart per page half."""
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    def draw(ax, chart):
+        if chart.data.empty:
+            ax.text(0.5, 0.5, "No data yet", ha="center", va="center", transform=ax.transAxes)
+            ax.set_axis_off()
+        else:
+            charts.DRAWERS[chart.kind](ax, chart.data, chart.options)
+
+    def write(f):
+        with PdfPages(f) as pdf:
+            fig = Figure(figsize=(8.27, 11.69))
+            top, *chart_axes = fig.subplots(1 + min(len(chart_specs), 2), 1, squeeze=False)[:, 0]
+            top.set_axis_off()
+            top.set_title(title, fontsize=16, loc="left")
+            if rows:
+                table = top.table(cellText=[[k, str(v)] for k, v in rows], loc="upper left", cellLoc="left")
+                table.scale(1, 1.3)
+            for ax, chart in zip(chart_axes, chart_specs):
+                draw(ax, chart)
+            pdf.savefig(fig)
+            for start in range(2, len(chart_specs), 2):
+                fig = Figure(figsize=(8.27, 11.69))
+                for ax, chart in zip(fig.subplots(2, 1), chart_specs[start:start + 2]):
+                    draw(ax, chart)
+                pdf.savefig(fig)
+
+    write_atomic(path, write, mode="wb")
+
+
+def _build(job):
+    """Render one report (runs in a pool worker). Returns the paths written."""
+    kind, payload, html_path, pdf_path, generated, links = job
+    if kind == "player":
+        trend = charts.Chart("player_trend", payload["trend"], {"player": payload["player"]})
+        page = player_html(payload, generated, charts.render_png(*trend))
+        title, rows, specs = f"{payload['player']}: player report", list(payload["stats"].items()), [trend]
+    else:
+        specs = list(payload["charts"].values())
+        page = season_html(payload, generated, {c.kind: charts.render_png(*c) for c in specs}, links)
+        title, rows = "Season report", list(payload["metrics"].items())
+
+    write_atomic(html_path, lambda f: f.write(page), encoding="utf-8")
+    if pdf_path:
+        _pdf(pdf_path, title, rows, specs)
+    return html_path
+
+
+def generate_reports(df, player_stats, team_metrics, squad, out_dir, players=None, pdf=False, force=False,
+                     workers=REPORT_WORKERS):
+    """
+    Write <out_dir>/season.html and <out_dir>/players/<slug>.html (+ .pdf)
+    for every squad member (or just `players`). Reports whose payload is
+    unchanged since the last run are skipped unless force=True.
+    Returns a ReportSummary of report names generated and skipped.
+    """
+    squad = squad_with(squad, player_stats["Player"])
+    os.makedirs(os.path.join(out_dir, "players"), exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    generated = datetime.now(timezone.utc).strftime("%d/%m/%Y %H:%M UTC")
+    links = [(p, f"players/{slug(p)}.html") for p in squad]
+
+    payloads = {("player", p): payload for p, payload in player_payloads(df, player_stats, squad).items()
+                if players is None or p in players}
+    payloads[("season", "Season")] = season_payload(df, player_stats, team_metrics, squad)
+
+    with file_lock(manifest_path):  # one batch at a time per directory
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+
+        jobs, done, skipped = [], {}, []
+        for (kind, name), payload in payloads.items():
+            base = os.path.join(out_dir, "season") if kind == "season" else os.path.join(out_dir, "players", slug(name))
+            key = os.path.relpath(base, out_dir)
+            digest = fingerprint([payload, links if kind == "season" else None, pdf])
+            outputs = [base + ".html"] + ([base + ".pdf"] if pdf else [])
+            if not force and manifest.get(key) == digest and all(os.path.exists(p) for p in outputs):
+                skipped.append(name)
+                continue
+            jobs.append((kind, payload, base + ".html", base + ".pdf" if pdf else None, generated, links))
+            done[key] = (name, digest)
+
+        if workers > 1 and len(jobs) > 1:
+            # Spawned, not forked: the app calls this from a threaded process
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                list(pool.map(_build, jobs))
+        else:
+            for job in jobs:
+                _build(job)
+
+        manifest.update({key: digest for key, (_, digest) in done.items()})
+        write_json_atomic(manifest_path, manifest, indent=2, sort_keys=True)
+    return ReportSummary([name for name, _ in done.values()], skipped, out_dir)
@@ -0,0 +1,263 @@
+import pandas as pd
+
+from .config import OUR_TEAM, SEASON_START_MONTH, SQUAD
+from .match_index import season_label, season_of
+
+# --------------------------------------------------------------------
+#             TEAMS, PLAYERS, ALIASES & SEASON SQUADS
+# --------------------------------------------------------------------
+# Teams and players are rows with stable integer IDs in the match
+# database. Every match belongs to a team and every appearance / event
+# points at a player ID, so renaming a player or merging a misspelling
+# changes one row, not the history. Each spelling a player goes by (their
+# name included) is an alias; names typed in the form, a backfill or an
+# old CSV resolve with one dictionary lookup, ignoring case and spacing.
+# A name nothing matches is an error, not a new player: players are only
+# created on purpose (add_player) or from the legacy history. Squads
+# are kept per team and season, and a player joins the squad of every
+# team-season they are named in a match for. The first team
+# (DEFAULT_TEAM_ID) is OUR_TEAM, seeded with config.SQUAD, and owns the
+# matches saved before teams existed.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    key  TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS players (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS player_aliases (
+    key       TEXT PRIMARY KEY,
+    player_id INTEGER NOT NULL REFERENCES players(id)
+);
+
+CREATE TABLE IF NOT EXISTS squads (
+    team_id   INTEGER NOT NULL REFERENCES teams(id),
+    season    TEXT NOT NULL,
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    PRIMARY KEY (team_id, season, player_id)
+);
+CREATE INDEX IF NOT EXISTS idx_squads_player ON squads(player_id);
+"""
+
+DEFAULT_TEAM_ID = 1
+
+# Names end up in "Name (N), Name2 (M)" strings, so these would not parse
+RESERVED_CHARACTERS = ",()"
+
+
+class RosterError(ValueError):
+    """A name is malformed, or already belongs to another player or team."""
+
+
+class UnknownPlayersError(RosterError):
+    """Names no player or alias matches; `names` lists them."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        super().__init__(
+            f"unknown player(s): {', '.join(self.names)}. Add them to the roster, or as an alias of a player"
+        )
+
+
+def name_key(name):
+    """Lookup key of a name: case and runs of spaces do not matter."""
+    return " ".join(str(name).split()).casefold()
+
+
+def clean_name(name):
+    """A new player or team name with spacing tidied; raises RosterError if unusable."""
+    name = " ".join(str(name).split())
+    if not name:
+        raise RosterError("name is empty")
+    if any(c in name for c in RESERVED_CHARACTERS):
+        raise RosterError(f"'{name}' contains one of {' '.join(RESERVED_CHARACTERS)}")
+    return name
+
+
+def season_labels(dates, start_month=SEASON_START_MONTH):
+    """Season label of each datetime (None where the date is missing)."""
+    dates = pd.DatetimeIndex(dates)
+    years = season_of(dates.fillna(pd.Timestamp(0)), start_month)
+    return [None if pd.isna(d) else season_label(int(y), start_month) for d, y in zip(dates, years)]
+
+
+def current_season(start_month=SEASON_START_MONTH):
+    return season_labels([pd.Timestamp.today()], start_month)[0]
+
+
+class Roster:
+    """
+    Snapshot of the roster tables with O(1) lookups both ways.
+
+    teams    {team_id: name}
+    players  {player_id: name}
+    aliases  {name_key: player_id}
+    squads   {(team_id, season): [player_id, ...]} in the order they joined
+    """
+
+    def __init__(self, teams, players, aliases, squads):
+        self.teams = teams
+        self.players = players
+        self.aliases = aliases
+        self.squads = squads
+        self._team_keys = {name_key(name): team_id for team_id, name in teams.items()}
+
+    def team_id(self, name):
+        """ID of the team called `name`, or None."""
+        return self._team_keys.get(name_key(name))
+
+    def player_id(self, name):
+        """ID of the player known as `name` (any alias), or None."""
+        return self.aliases.get(name_key(name))
+
+    def name(self, player_id):
+        return self.players[player_id]
+
+    def names(self, player_ids):
+        return [self.players[i] for i in player_ids]
+
+    def aliases_of(self, player_id):
+        """Alias keys of a player other than their own name."""
+        own = name_key(self.players[player_id])
+        return sorted(key for key, pid in self.aliases.items() if pid == player_id and key != own)
+
+    def seasons(self, team_id):
+        return sorted(season for team, season in self.squads if team == team_id)
+
+    def squad(self, team_id, season=None):
+        """
+        Player IDs in a team's squad for `season`; a season nobody has been
+        added to yet starts with the latest earlier season's squad. Without
+        a season, everyone who has been in any of the team's squads.
+        """
+        if season is None:
+            everyone = {}
+            for label in self.seasons(team_id):
+                everyone.update(dict.fromkeys(self.squads[(team_id, label)]))
+            return list(everyone)
+        if (team_id, season) in self.squads:
+            return list(self.squads[(team_id, season)])
+        earlier = [label for label in self.seasons(team_id) if label < season]
+        return list(self.squads[(team_id, earlier[-1])]) if earlier else []
+
+
+def load(conn):
+    """Read the whole roster (a few rows per player) into a Roster."""
+    teams = dict(conn.execute("SELECT id, name FROM teams ORDER BY id").fetchall())
+    players = dict(conn.execute("SELECT id, name FROM players ORDER BY id").fetchall())
+    aliases = dict(conn.execute("SELECT key, player_id FROM player_aliases").fetchall())
+    squads = {}
+    for team_id, season, player_id in conn.execute(
+        "SELECT team_id, season, player_id FROM squads ORDER BY rowid"
+    ):
+        squads.setdefault((team_id, season), []).append(player_id)
+    return Roster(teams, players, aliases, squads)
+
+
+# --------------------------------------------------------------------
+#                 WRITES (inside the caller's transaction)
+# --------------------------------------------------------------------
+def _alias_owner(conn, name):
+    row = conn.execute("SELECT player_id FROM player_aliases WHERE key = ?", (name_key(name),)).fetchone()
+    return row[0] if row else None
+
+
+def add_team(conn, name):
+    """Create a team and return its ID."""
+    name = clean_name(name)
+    if conn.execute("SELECT 1 FROM teams WHERE key = ?", (name_key(name),)).fetchone():
+        raise RosterError(f"there is already a team called '{name}'")
+    return conn.execute("INSERT INTO teams (name, key) VALUES (?, ?)", (name, name_key(name))).lastrowid
+
+
+def add_player(conn, name, aliases=()):
+    """Create a player known as `name` and `aliases`; returns the new ID."""
+    name = clean_name(name)
+    spellings = [name] + [clean_name(a) for a in aliases]
+    for spelling in spellings:
+        if _alias_owner(conn, spelling) is not None:
+            raise RosterError(f"'{spelling}' already names another player")
+    player_id = conn.execute("INSERT INTO players (name) VALUES (?)", (name,)).lastrowid
+    conn.executemany(
+        "INSERT OR IGNORE INTO player_aliases (key, player_id) VALUES (?, ?)",
+        [(name_key(s), player_id) for s in spellings],
+    )
+    return player_id
+
+
+def add_alias(conn, player_id, alias):
+    """Let `alias` resolve to the player from now on; raises RosterError if unusable."""
+    alias = clean_name(alias)
+    owner = _alias_owner(conn, alias)
+    if owner is not None and owner != player_id:
+        raise RosterError(f"'{alias}' already names another player")
+    conn.execute("INSERT OR IGNORE INTO player_aliases (key, player_id) VALUES (?, ?)", (name_key(alias), player_id))
+
+
+def rename_player(conn, player_id, name):
+    """Show the player as `name` everywhere; the old name stays an alias."""
+    name = clean_name(name)
+    add_alias(conn, player_id, name)
+    conn.execute("UPDATE players SET name = ? WHERE id = ?", (name, player_id))
+
+
+def resolve_players(conn, names, create=False):
+    """
+    Player ID for each name. Names no alias matches raise
+    UnknownPlayersError, so a typo cannot split a player in two; with
+    create (seeding, legacy history) they are registered as new players.
+    """
+    ids = {name: _alias_owner(conn, name) for name in dict.fromkeys(names)}
+    unknown = [name for name, player_id in ids.items() if player_id is None]
+    if unknown and not create:
+        raise UnknownPlayersError(unknown)
+    for name in unknown:
+        display = " ".join(str(name).split())
+        ids[name] = conn.execute("INSERT INTO players (name) VALUES (?)", (display,)).lastrowid
+        conn.execute("INSERT INTO player_aliases (key, player_id) VALUES (?, ?)", (name_key(display), ids[name]))
+    return [ids[name] for name in names]
+
+
+def add_to_squad(conn, team_id, season, player_ids):
+    conn.executemany(
+        "INSERT OR IGNORE INTO squads (team_id, season, player_id) VALUES (?, ?, ?)",
+        [(team_id, season, player_id) for player_id in player_ids],
+    )
+
+
+def remove_from_squad(conn, team_id, season, player_ids):
+    conn.executemany(
+        "DELETE FROM squads WHERE team_id = ? AND season = ? AND player_id = ?",
+        [(team_id, season, player_id) for player_id in player_ids],
+    )
+
+
+def record_squads(conn, first_match_id, start_month=SEASON_START_MONTH):
+    """Add everyone named in matches with id >= first_match_id to that team-season's squad."""
+    named = pd.read_sql_query(
+        "SELECT m.team_id, m.date, a.player_id FROM appearances a JOIN matches m ON m.id = a.match_id"
+        " WHERE a.match_id >= ? ORDER BY a.match_id, a.played DESC, a.position",
+        conn, params=(first_match_id,),
+    )
+    named["season"] = season_labels(pd.to_datetime(named["date"], format="%Y-%m-%d", errors="coerce"), start_month)
+    named = named.dropna(subset=["season"]).drop_duplicates(["team_id", "season", "player_id"])
+    conn.executemany(
+        "INSERT OR IGNORE INTO squads (team_id, season, player_id) VALUES (?, ?, ?)",
+        zip(named["team_id"].tolist(), named["season"].tolist(), named["player_id"].tolist()),
+    )
+
+
+def seed(conn):
+    """First run: OUR_TEAM as the default team, with config.SQUAD as this season's squad."""
+    if conn.execute("SELECT 1 FROM teams").fetchone():
+        return
+    conn.execute(
+        "INSERT INTO teams (id, name, key) VALUES (?, ?, ?)", (DEFAULT_TEAM_ID, OUR_TEAM, name_key(OUR_TEAM))
+    )
+    add_to_squad(conn, DEFAULT_TEAM_ID, current_season(), resolve_players(conn, SQUAD, create=True))
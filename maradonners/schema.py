@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from .stats_engine import EVENT_COLUMNS, NAME_LIST_COLUMNS
+
+# --------------------------------------------------------------------
+#                  COMPACT IN-MEMORY TABLE SCHEMA
+# --------------------------------------------------------------------
+# Names that repeat on every row (pitches, opponents, teams, players) are
+# held as categoricals: one copy of each string plus a small integer code
+# per row. Counters use the smallest integer type that fits a league
+# season. The event table's Player column is the player-ID dictionary:
+# its categories are the names and its codes are the IDs.
+
+# Goals in one five-a-side match, or standings counters for a season
+COUNTER_DTYPE = "int16"
+NULLABLE_COUNTER_DTYPE = "Int16"
+
+# Local match table: contribution strings repeat ("", "AJ (1)", ...);
+# Date, Players and Missed are close to unique per row, so stay strings
+LOCAL_CATEGORY_COLUMNS = ["Time", "Pitch", "Opposition"] + [
+    c for c in EVENT_COLUMNS if c not in NAME_LIST_COLUMNS
+]
+LOCAL_COUNTER_COLUMNS = ["Goals Scored", "Goals Conceded"]
+
+STANDINGS_COUNTER_COLUMNS = ["Pld", "W", "L", "D", "FF", "FA", "F", "A", "Dif", "B", "Pts"]
+RESULTS_CATEGORY_COLUMNS = ["Time", "Pitch"]
+RESULTS_TEAM_COLUMNS = ["Home Team", "Away Team"]
+
+
+def categories(values):
+    """Sorted categorical dtype over the distinct non-null values."""
+    return pd.CategoricalDtype(sorted(pd.unique(pd.Series(values).dropna()).tolist()))
+
+
+def player_dictionary(players):
+    """{player_id: name} for a categorical Player column."""
+    return dict(enumerate(players.cat.categories))
+
+
+def _counter(series, nullable):
+    values = pd.to_numeric(series, errors="coerce")
+    if nullable or values.isna().any():
+        return values.astype(NULLABLE_COUNTER_DTYPE)
+    return values.astype(COUNTER_DTYPE)
+
+
+def compact_local_table(df):
+    """The local match table with categorical names and Int16 goals."""
+    df = df.copy()
+    for column in LOCAL_CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    for column in LOCAL_COUNTER_COLUMNS:
+        if column in df.columns:
+            df[column] = _counter(df[column], nullable=True)
+    return df
+
+
+def compact_standings(df):
+    """League standings with a categorical Team and int16 counters."""
+    df = df.copy()
+    if "Team" in df.columns:
+        df["Team"] = df["Team"].astype("category")
+    for column in STANDINGS_COUNTER_COLUMNS:
+        if column in df.columns:
+            df[column] = _counter(df[column], nullable=False)
+    return df
+
+
+def compact_results(df):
+    """League fixtures; Home and Away Team share one team categorical."""
+    df = df.copy()
+    for column in RESULTS_CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    teams = [c for c in RESULTS_TEAM_COLUMNS if c in df.columns]
+    if teams:
+        dtype = categories(np.concatenate([df[c].to_numpy(dtype=object) for c in teams]))
+        for column in teams:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def memory_usage(df):
+    """Deep memory use of a DataFrame in bytes."""
+    return int(df.memory_usage(deep=True).sum())
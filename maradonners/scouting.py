@@ -0,0 +1,232 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .fileio import file_lock, write_json_atomic
+from .ratings import league_fixtures, team_key
+
+# --------------------------------------------------------------------
+#              OPPONENT SCOUTING INDEX (INCREMENTAL)
+# --------------------------------------------------------------------
+# Every team the league has shown us, keyed by ratings.team_key, with
+# all of its fixtures across scraped snapshots: a fixture that has since
+# dropped off the site (last season, a reshuffled division) stays in the
+# index. The state is saved as JSON and updated after each scrape: only
+# fixtures it has not seen (or whose score was corrected) are added, so
+# a lookup never rescans match_results.csv. Fixture keys start with the
+# ISO day and time, so each team's list sorts into date order as text.
+# Our own match history is grouped by opponent key in memory when the
+# index is loaded (OpponentIndex), and lookups are dictionary gets.
+
+STATE_VERSION = 1
+
+RESULT_POINTS = {"W": 3, "D": 1, "L": 0}
+
+
+def empty_state():
+    return {"version": STATE_VERSION, "scores": {}, "teams": {}, "names": {}, "upcoming": [], "last_snapshot": 0}
+
+
+def load_state(path):
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+    return empty_state()
+
+
+def save_state(path, state):
+    write_json_atomic(path, state, indent=1, sort_keys=True)
+
+
+def split_key(fixture_key):
+    """'2025-01-30|18:30|home|away' -> (day, time, home key, away key)."""
+    return tuple(fixture_key.split("|", 3))
+
+
+def update_index(frames, state_path, aliases=None, last_snapshot=None, rebuild=False):
+    """
+    Add the fixtures of `frames` (match_results tables, oldest first) to
+    the saved index. Upcoming fixtures are taken from the last frame only.
+    Returns (state, fixtures added, scores corrected); the file is only
+    written when something changed.
+    """
+    with file_lock(state_path):
+        state = empty_state() if rebuild else load_state(state_path)
+        before = json.dumps(state, sort_keys=True) if not rebuild else None
+        scores, teams, names = state["scores"], state["teams"], state["names"]
+        added = corrected = 0
+        touched = set()
+        upcoming = None
+        for results in frames:
+            if results.empty or not {"Date", "Home Team", "Score", "Away Team"} <= set(results.columns):
+                continue
+            fixtures = league_fixtures(results, aliases)
+            # The latest spelling of a team's name is the one shown
+            names.update(zip(fixtures["Home Key"], fixtures["Home"].astype(str)))
+            names.update(zip(fixtures["Away Key"], fixtures["Away"].astype(str)))
+
+            played = fixtures[fixtures["Played"]]
+            changed = played["Key"].map(scores) != played["Score"]
+            for key, home, away, score in zip(
+                played.loc[changed, "Key"], played.loc[changed, "Home Key"],
+                played.loc[changed, "Away Key"], played.loc[changed, "Score"],
+            ):
+                if key in scores:
+                    corrected += 1
+                else:
+                    added += 1
+                    teams.setdefault(home, []).append(key)
+                    teams.setdefault(away, []).append(key)
+                    touched.update((home, away))
+                scores[key] = score
+            upcoming = fixtures.loc[~fixtures["Played"], "Key"].tolist()
+
+        for team in touched:
+            teams[team].sort()
+        if upcoming is not None:
+            state["upcoming"] = [key for key in upcoming if key not in scores]
+        if last_snapshot is not None:
+            state["last_snapshot"] = max(state["last_snapshot"], int(last_snapshot))
+        if rebuild or json.dumps(state, sort_keys=True) != before:
+            save_state(state_path, state)
+    return state, added, corrected
+
+
+def _result(scored, conceded):
+    """'W' / 'D' / 'L' for each pair of goal counts."""
+    return np.where(scored > conceded, "W", np.where(scored == conceded, "D", "L"))
+
+
+class OpponentIndex:
+    """
+    Scouting lookups by opponent name (any spelling team_key folds
+    together). Built once per change of the index or our match history.
+
+    names    {team key: display name} of every opponent, league or local
+    options  display names sorted for the Opposition autocomplete
+    """
+
+    def __init__(self, state, local, our_team, aliases=None):
+        self.state = state
+        self.aliases = aliases
+        self.our_key = team_key(our_team, aliases)
+
+        # Our matches grouped by opponent key: factorize, then one key per distinct name
+        self.local = local.reset_index(drop=True)
+        opposition = self.local["Opposition"] if "Opposition" in self.local else pd.Series(dtype=object)
+        codes, distinct = pd.factorize(opposition.astype(object).fillna("").astype(str))
+        keys = [team_key(name, aliases) for name in distinct]
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(distinct) + 1))
+        rows = {}
+        for i, key in enumerate(keys):
+            rows.setdefault(key, []).append(order[bounds[i]:bounds[i + 1]])
+        self._local_rows = {key: np.sort(np.concatenate(parts)) for key, parts in rows.items()}
+
+        names = dict(state["names"])
+        for name, key in zip(distinct, keys):
+            names.setdefault(key, name)
+        names.pop(self.our_key, None)
+        names.pop("", None)
+        self.names = names
+        self.options = sorted(names.values(), key=str.casefold)
+
+    def key(self, name):
+        return team_key(name, self.aliases)
+
+    def known(self, name):
+        return self.key(name) in self.names
+
+    def name(self, name):
+        """The index's spelling of `name` (unchanged if the team is unknown)."""
+        return self.names.get(self.key(name), name)
+
+    def _fixtures(self, keys, team):
+        """Fixture keys -> Date, Home, Away, Score and Result for `team`, newest first."""
+        if not keys:
+            return pd.DataFrame(columns=["Date", "Home", "Away", "Score", "Result"])
+        parts = pd.DataFrame([split_key(k) for k in reversed(keys)], columns=["Day", "Time", "Home", "Away"])
+        score = pd.Series([self.state["scores"].get(k, "") for k in reversed(keys)], dtype=object)
+        goals = score.str.split("-", expand=True).reindex(columns=[0, 1])
+        home_goals = pd.to_numeric(goals[0], errors="coerce").to_numpy()
+        away_goals = pd.to_numeric(goals[1], errors="coerce").to_numpy()
+        at_home = (parts["Home"] == team).to_numpy()
+        result = _result(np.where(at_home, home_goals, away_goals), np.where(at_home, away_goals, home_goals))
+        return pd.DataFrame({
+            "Date": pd.to_datetime(parts["Day"], format="%Y-%m-%d", errors="coerce"),
+            "Time": parts["Time"],
+            "Home": parts["Home"].map(self.state["names"]).fillna(parts["Home"]),
+            "Away": parts["Away"].map(self.state["names"]).fillna(parts["Away"]),
+            "Score": score.str.replace("-", " - ").to_numpy(),
+            "Result": np.where(np.isnan(home_goals), "", result),
+        })
+
+    def league_results(self, name, limit=None):
+        """The team's played league fixtures, newest first (Result is theirs)."""
+        keys = self.state["teams"].get(self.key(name), [])
+        return self._fixtures(keys[-limit:] if limit else keys, self.key(name))
+
+    def form(self, name, window):
+        """(last `window` league results oldest first, e.g. "WDLWW", points)."""
+        letters = self.league_results(name, window)["Result"].tolist()[::-1]
+        return "".join(letters), sum(RESULT_POINTS[r] for r in letters)
+
+    def upcoming(self, name):
+        """Unplayed fixtures involving the team in the latest scrape, soonest first."""
+        team = self.key(name)
+        keys = [k for k in self.state["upcoming"] if team in split_key(k)[2:]]
+        return self._fixtures(keys[::-1], team).drop(columns=["Score", "Result"])
+
+    def head_to_head(self, name):
+        """
+        Our meetings with the team, newest first: every match in our own
+        history, plus league fixtures between us on days we have no match
+        recorded for (Source says which).
+        """
+        team = self.key(name)
+        rows = self._local_rows.get(team, np.array([], dtype=np.int64))
+        ours = self.local.iloc[rows]
+        scored = pd.to_numeric(ours["Goals Scored"], errors="coerce").to_numpy(dtype="float64")
+        conceded = pd.to_numeric(ours["Goals Conceded"], errors="coerce").to_numpy(dtype="float64")
+        local = pd.DataFrame({
+            "Date": pd.to_datetime(ours["Date"], format="%d/%m/%Y", errors="coerce").to_numpy(),
+            "Scored": scored,
+            "Conceded": conceded,
+            "Source": "Our results",
+        })
+
+        league = self._fixtures(
+            [k for k in self.state["teams"].get(team, []) if self.our_key in split_key(k)[2:]], self.our_key,
+        )
+        league = league[~league["Date"].isin(local["Date"])]
+        ours_home = (league["Home"].map(self.key) == self.our_key).to_numpy()
+        goals = league["Score"].str.split(" - ", expand=True).reindex(columns=[0, 1]).apply(pd.to_numeric)
+        league = pd.DataFrame({
+            "Date": league["Date"].to_numpy(),
+            "Scored": np.where(ours_home, goals[0], goals[1]),
+            "Conceded": np.where(ours_home, goals[1], goals[0]),
+            "Source": "League",
+        })
+
+        meetings = pd.concat([local, league], ignore_index=True).dropna(subset=["Scored", "Conceded"])
+        meetings = meetings.sort_values("Date", ascending=False, kind="stable", na_position="last")
+        meetings["Result"] = _result(meetings["Scored"].to_numpy(), meetings["Conceded"].to_numpy())
+        meetings[["Scored", "Conceded"]] = meetings[["Scored", "Conceded"]].astype(np.int64)
+        return meetings.reset_index(drop=True)[["Date", "Scored", "Conceded", "Result", "Source"]]
+
+    def record(self, name):
+        """Played, Won, Drawn, Lost, For, Against over head_to_head()."""
+        meetings = self.head_to_head(name)
+        result = meetings["Result"]
+        return {
+            "Played": len(meetings),
+            "Won": int((result == "W").sum()),
+            "Drawn": int((result == "D").sum()),
+            "Lost": int((result == "L").sum()),
+            "For": int(meetings["Scored"].sum()),
+            "Against": int(meetings["Conceded"].sum()),
+        }
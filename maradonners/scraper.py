@@ -0,0 +1,225 @@
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import instrument
+from .config import LeagueTarget, target_key  # noqa: F401 (re-exported)
+from .fileio import write_json_atomic
+
+# --------------------------------------------------------------------
+#              POOLED MULTI-DIVISION LEAGUE SCRAPER
+# --------------------------------------------------------------------
+# Fetches spawtz standings pages for any number of (league, season,
+# division) targets over one connection-pooled session, with bounded
+# parallelism, timeouts, retries with backoff, and conditional GETs
+# (ETag / Last-Modified) so an unchanged page costs a 304.
+
+LEAGUE_URL = "https://discoverysoccerpark.spawtz.com/Leagues/Standings"
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+    " AppleWebKit/537.36 (KHTML, like Gecko)"
+    " Chrome/132.0.0.0 Safari/537.36"
+)
+
+DEFAULT_WORKERS = 4
+DEFAULT_TIMEOUT = 10  # seconds, per request
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # 0.5s, 1s, 2s between retries
+
+RESULTS_HEADERS = ["Date", "Time", "Pitch", "Home Team", "Score", "Away Team"]
+
+# status: HTTP status (None if the request failed), error: exception or None
+ScrapeResult = namedtuple("ScrapeResult", ["target", "status", "standings", "results", "error"])
+
+
+def target_params(target):
+    return {
+        "SportId": target.sport_id,
+        "VenueId": target.venue_id,
+        "LeagueId": target.league_id,
+        "SeasonId": target.season_id,
+        "DivisionId": target.division_id,
+    }
+
+
+def make_session(pool_size=DEFAULT_WORKERS, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """A requests session with a connection pool sized for the workers."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+# --------------------------------------------------------------------
+#                     CONDITIONAL GET VALIDATORS
+# --------------------------------------------------------------------
+def load_validators(path):
+    """{target_key: {"etag": ..., "last_modified": ...}} from disk."""
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_validators(path, validators):
+    write_json_atomic(path, validators, indent=2, sort_keys=True)
+
+
+# --------------------------------------------------------------------
+#                            PARSING
+# --------------------------------------------------------------------
+# Only the STTable / FTable elements are turned into a tree; the rest of
+# the page (menus, scripts, sponsors) is skipped by the strainer. lxml is
+# used when installed (C parser), otherwise the stdlib html.parser.
+LEAGUE_TABLES = SoupStrainer("table", class_=["STTable", "FTable"])
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+def _cell_text(cells):
+    return [cell.get_text().strip() for cell in cells]
+
+
+def parse_standings_table(table):
+    """STTable -> DataFrame (first column, the position, is dropped)."""
+    # Header cells are the first 12 after the position cell
+    headers_row = _cell_text(table.find_all("td", limit=13)[1:13])
+    standings_data = []
+    for row in table.find_all("tr")[1:]:
+        cols = row.find_all("td", limit=13)[1:13]
+        if cols:
+            standings_data.append(_cell_text(cols))
+
+    standings_df = pd.DataFrame(standings_data, columns=headers_row)
+
+    # Extract just the numeric part from "Pts"
+    if "Pts" in standings_df.columns:
+        standings_df["Pts"] = (
+            standings_df["Pts"].str.extract(r"(\d+)").astype(int)
+        )
+    return standings_df
+
+
+def parse_results_tables(tables):
+    """FTables -> one DataFrame of fixtures; "FHeader" rows carry the date."""
+    results_data = []
+    for table in tables:
+        match_date = ""
+        for row in table.find_all("tr"):
+            if "FHeader" in row.get("class", []):
+                match_date = row.get_text().strip()
+            cols = row.find_all("td")
+            if len(cols) == 5:
+                # Date, Time, Pitch, Home Team, Score, Away Team
+                results_data.append([match_date] + _cell_text(cols))
+
+    results_df = pd.DataFrame(results_data, columns=RESULTS_HEADERS)
+
+    # A game in progress shows "LIVE" with its score: keep the marker, as
+    # "6 - 4 LIVE", so the table, ratings and simulator know it is not final
+    live = results_df["Score"].str.contains("LIVE", regex=False)
+    score = results_df["Score"].str.replace("LIVE", "", regex=False).str.strip()
+    results_df["Score"] = score.where(~live, score + " LIVE")
+    return results_df
+
+
+def parse_league_page(html, parser=None):
+    """
+    Parse a spawtz standings page into (standings_df, results_df).
+    Either frame is empty if its table is missing.
+    """
+    soup = BeautifulSoup(html, parser or HTML_PARSER, parse_only=LEAGUE_TABLES)
+
+    standings_table = soup.find("table", class_="STTable")
+    standings_df = parse_standings_table(standings_table) if standings_table else pd.DataFrame()
+
+    results_tables = soup.find_all("table", class_="FTable")
+    results_df = parse_results_tables(results_tables) if results_tables else pd.DataFrame()
+
+    return standings_df, results_df
+
+
+# --------------------------------------------------------------------
+#                           FETCHING
+# --------------------------------------------------------------------
+def _scrape_one(session, target, validators, timeout, base_url):
+    key = target_key(target)
+    cached = validators.get(key, {})
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        # Network and parsing are timed separately: a slow site vs a slow parser
+        with instrument.span("scrape.fetch", division=target.division_id) as fetch:
+            response = session.get(base_url, params=target_params(target), headers=headers, timeout=timeout)
+            fetch["status"] = response.status_code
+        instrument.count("scrape.requests")
+        if response.status_code == 304:
+            instrument.count("scrape.not_modified")
+            return ScrapeResult(target, 304, None, None, None)
+        response.raise_for_status()
+        instrument.count("scrape.bytes", len(response.content))
+        with instrument.span("scrape.parse", division=target.division_id) as parse:
+            standings_df, results_df = parse_league_page(response.text)
+            parse["rows"] = len(standings_df) + len(results_df)
+        instrument.count("scrape.rows_parsed", len(standings_df) + len(results_df))
+    except requests.RequestException as exc:
+        instrument.count("scrape.errors")
+        return ScrapeResult(target, None, None, None, exc)
+
+    fresh = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    validators[key] = {k: v for k, v in fresh.items() if v}
+    return ScrapeResult(target, response.status_code, standings_df, results_df, None)
+
+
+def scrape_targets(targets, validators=None, session=None, max_workers=DEFAULT_WORKERS,
+                   timeout=DEFAULT_TIMEOUT, base_url=None):
+    """
+    Fetch and parse every target concurrently. Returns {target: ScrapeResult}
+    in the order given. Pages answered with 304 have status 304 and no
+    frames. `validators` is updated in place; persist it only after the
+    new tables have been saved.
+    """
+    targets = list(targets)
+    base_url = base_url or LEAGUE_URL
+    validators = {} if validators is None else validators
+    own_session = session is None
+    session = make_session(pool_size=max_workers) if own_session else session
+
+    try:
+        with instrument.span("scrape", targets=len(targets)), \
+                ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets)))) as pool:
+            futures = [
+                pool.submit(_scrape_one, session, target, validators, timeout, base_url)
+                for target in targets
+            ]
+            return {target: future.result() for target, future in zip(targets, futures)}
+    finally:
+        if own_session:
+            session.close()
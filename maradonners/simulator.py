@@ -0,0 +1,136 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .league_table import league_table, parse_scores
+
+# --------------------------------------------------------------------
+#              MONTE CARLO SEASON SIMULATOR
+# --------------------------------------------------------------------
+# Plays out the remaining fixtures many times from the current table.
+# Each team gets attack and defence rates fitted from the played games
+# (shrunk towards the league average so two games do not decide
+# everything) and every remaining game is a pair of Poisson draws. A
+# batch of simulations is one (sims x fixtures) array per side; points,
+# goal difference and goals are added to the current table with a
+# matrix product against the fixture -> team incidence matrices, and
+# positions come from one lexsort per batch. Batches have their own
+# seeds (SeedSequence.spawn), so results are identical whether they run
+# in this process or in a process pool.
+
+PROMOTION_PLACES = 2
+RELEGATION_PLACES = 2
+
+DEFAULT_SIMULATIONS = 20000
+BATCH_SIZE = 5000
+
+# Games' worth of league-average scoring added to every team's record
+PRIOR_GAMES = 3
+
+
+def fit_rates(results, teams, prior_games=PRIOR_GAMES):
+    """
+    Expected goals per game for and against each team: league average
+    scaled by attack / defence strength. Returns (attack, defence, mean).
+    """
+    scores = parse_scores(results["Score"])
+    played = (scores["Home"].notna() & ~scores["Live"]).to_numpy()
+    home = results["Home Team"].to_numpy(dtype=object)[played]
+    away = results["Away Team"].to_numpy(dtype=object)[played]
+    home_goals = scores["Home"].to_numpy()[played]
+    away_goals = scores["Away"].to_numpy()[played]
+
+    index = pd.Index(teams)
+    h, a = index.get_indexer(home), index.get_indexer(away)
+    games = np.bincount(h, minlength=len(teams)) + np.bincount(a, minlength=len(teams))
+    scored = np.bincount(h, home_goals, len(teams)) + np.bincount(a, away_goals, len(teams))
+    conceded = np.bincount(h, away_goals, len(teams)) + np.bincount(a, home_goals, len(teams))
+
+    mean = (home_goals.sum() + away_goals.sum()) / max(2 * len(home_goals), 1) if len(home_goals) else 1.0
+    mean = max(mean, 0.1)
+    attack = (scored + prior_games * mean) / (games + prior_games) / mean
+    defence = (conceded + prior_games * mean) / (games + prior_games) / mean
+    return attack, defence, mean
+
+
+def _simulate_batch(args):
+    """Finishing positions (sims x teams, 0 = top) and summed final points for one batch."""
+    seed, sims, home_rate, away_rate, home_onehot, away_onehot, base = args
+    rng = np.random.default_rng(seed)
+    home_goals = rng.poisson(home_rate, size=(sims, home_rate.size))
+    away_goals = rng.poisson(away_rate, size=(sims, away_rate.size))
+
+    home_points = np.where(home_goals > away_goals, 3, np.where(home_goals == away_goals, 1, 0))
+    away_points = np.where(away_goals > home_goals, 3, np.where(home_goals == away_goals, 1, 0))
+    points = base[0] + home_points @ home_onehot + away_points @ away_onehot
+    goal_diff = base[1] + (home_goals - away_goals) @ home_onehot + (away_goals - home_goals) @ away_onehot
+    goals = base[2] + home_goals @ home_onehot + away_goals @ away_onehot
+
+    # Points, goal difference, goals for, then a coin toss
+    order = np.lexsort((rng.random(points.shape), -goals, -goal_diff, -points), axis=-1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(order.shape[1])[None, :], axis=-1)
+    return positions, points.sum(axis=0)
+
+
+def simulate_season(results, standings=None, n_sims=DEFAULT_SIMULATIONS, seed=0,
+                    workers=1, batch_size=BATCH_SIZE, promotion=PROMOTION_PLACES,
+                    relegation=RELEGATION_PLACES):
+    """
+    Play out the unplayed (and LIVE) fixtures `n_sims` times.
+
+    The current Pts / Dif / F come from the scraped `standings` when
+    given (so forfeits and bonus points count), else from the results.
+    Returns one row per team, in current table order, with the
+    probability of each finishing position ("1" .. "N"), Promotion %,
+    Relegation %, Expected Pts and Expected Position.
+    """
+    computed = league_table(results)
+    current = standings if standings is not None and not standings.empty else computed
+    current = current.assign(Team=current["Team"].astype(object))
+    teams = list(current["Team"]) + [t for t in computed["Team"] if t not in set(current["Team"])]
+    current = current.set_index("Team").reindex(teams)
+    base = np.vstack([
+        current["Pts"].fillna(0).to_numpy(dtype=np.int64),
+        current["Dif"].fillna(0).to_numpy(dtype=np.int64),
+        current["F"].fillna(0).to_numpy(dtype=np.int64),
+    ])[:, None, :]
+
+    scores = parse_scores(results["Score"])
+    remaining = (scores["Home"].isna() | scores["Live"]).to_numpy()
+    index = pd.Index(teams)
+    home = index.get_indexer(results["Home Team"].to_numpy(dtype=object)[remaining])
+    away = index.get_indexer(results["Away Team"].to_numpy(dtype=object)[remaining])
+
+    attack, defence, mean = fit_rates(results, teams)
+    home_rate = mean * attack[home] * defence[away]
+    away_rate = mean * attack[away] * defence[home]
+    home_onehot = np.eye(len(teams), dtype=np.int64)[home]
+    away_onehot = np.eye(len(teams), dtype=np.int64)[away]
+
+    sizes = [batch_size] * (n_sims // batch_size) + ([n_sims % batch_size] if n_sims % batch_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(s, size, home_rate, away_rate, home_onehot, away_onehot, base) for s, size in zip(seeds, sizes)]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(_simulate_batch, jobs))
+    else:
+        batches = [_simulate_batch(job) for job in jobs]
+    positions = np.concatenate([b[0] for b in batches])
+    total_points = np.sum([b[1] for b in batches], axis=0)
+
+    n_teams = len(teams)
+    counts = np.bincount(
+        (np.arange(n_teams)[None, :] * n_teams + positions).ravel(), minlength=n_teams * n_teams
+    ).reshape(n_teams, n_teams)
+    probabilities = counts / max(n_sims, 1)
+
+    odds = pd.DataFrame(probabilities * 100, index=index, columns=[str(p) for p in range(1, n_teams + 1)])
+    odds["Promotion %"] = odds.iloc[:, :promotion].sum(axis=1)
+    odds["Relegation %"] = odds.iloc[:, n_teams - relegation:n_teams].sum(axis=1) if relegation else 0.0
+    odds["Expected Position"] = probabilities @ np.arange(1, n_teams + 1)
+    odds["Expected Pts"] = total_points / max(n_sims, 1)
+    odds.index.name = "Team"
+    return odds.round(2).reset_index()
+
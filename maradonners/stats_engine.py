@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------------------------
+#                    COLUMNAR PLAYER STATS ENGINE
+# --------------------------------------------------------------------
+# Match rows store per-player contributions as strings such as
+# "AJ (1), Minal (2)". Instead of walking every match, all of those
+# columns are exploded once into a long-format event table
+# (Match, Player, Stat, Count) and counted with a single groupby.
+
+# Source column -> stat it feeds
+EVENT_COLUMNS = {
+    "Players": "Appearances",
+    "Missed": "Missed Games",
+    "Scorers": "Goals",
+    "Own Goals": "Own Goals",
+    "Assists": "Assists",
+    "Blue Cards": "Blue Cards",
+    "Yellow Cards": "Yellow Cards",
+    "Red Cards": "Red Cards",
+}
+
+# Columns holding plain name lists ("AJ, Bir") rather than "Name (N)"
+NAME_LIST_COLUMNS = ["Players", "Missed"]
+
+# Column order of the player stats table
+STAT_COLUMNS = [
+    "Appearances", "Goals", "Own Goals", "Assists", "Missed Games",
+    "Blue Cards", "Yellow Cards", "Red Cards"
+]
+
+# Event table dtypes: Player is categorical, so its codes act as player
+# IDs and each name is stored once (see schema.player_dictionary)
+STAT_DTYPE = pd.CategoricalDtype(STAT_COLUMNS)
+
+# "Name (N)" -> Name, N  (splits on the last " (", like rsplit did)
+ENTRY_PATTERN = r"^(?P<Player>.*) \(\s*(?P<Count>[+-]?\d+)\s*\)+$"
+
+
+def explode_events(df):
+    """
+    Explode the contribution columns of the match table into one row per
+    (match, player, stat) with an integer count. Entries that do not parse
+    are dropped, matching the old per-row behaviour.
+    Match is int32, Player categorical, Stat STAT_DTYPE and Count int16.
+    """
+    columns = [c for c in EVENT_COLUMNS if c in df.columns]
+    if df.empty or not columns:
+        return pd.DataFrame({
+            "Match": pd.Series(dtype="int32"),
+            "Player": pd.Series(dtype="category"),
+            "Stat": pd.Series(dtype=STAT_DTYPE),
+            "Count": pd.Series(dtype="int16"),
+        })
+
+    cells = df[columns].astype(object).fillna("").astype(str)
+    cells.index = pd.RangeIndex(len(cells), name="Match")
+    cells.columns.name = "Column"
+
+    entries = cells.stack()
+    entries = entries[entries != ""].str.split(", ").explode()
+    entries = entries[entries != ""]
+
+    events = entries.rename("Entry").reset_index()
+
+    # Entries repeat across matches ("AJ (1)"), so each distinct entry is
+    # parsed once and the result is taken back by category code
+    entry = pd.Categorical(events["Entry"].to_numpy(dtype=object))
+    distinct = pd.Series(entry.categories.to_numpy(dtype=object), dtype=object)
+    parsed = distinct.str.extract(ENTRY_PATTERN)
+    parsed_player = parsed["Player"].str.strip().to_numpy(dtype=object)
+    parsed_count = pd.to_numeric(parsed["Count"]).to_numpy(dtype="float64")
+
+    # Only the "Name (N)" columns use the parsed form
+    contributions = ~events["Column"].isin(NAME_LIST_COLUMNS).to_numpy()
+    codes = entry.codes
+    player = np.where(contributions, parsed_player[codes], distinct.to_numpy()[codes])
+    count = np.where(contributions, parsed_count[codes], 1.0)
+    keep = ~(pd.isna(player) | np.isnan(count))
+
+    return pd.DataFrame({
+        "Match": events["Match"].to_numpy(dtype="int32")[keep],
+        "Player": pd.Categorical(player[keep]),
+        "Stat": pd.Categorical(events["Column"].map(EVENT_COLUMNS)[keep], dtype=STAT_DTYPE),
+        "Count": count[keep].astype("int16"),
+    })
+
+
+def squad_with(squad, players):
+    """The squad, then anyone else in `players`, so nobody's stats are dropped."""
+    known = set(squad)
+    return list(squad) + [p for p in dict.fromkeys(players) if p not in known]
+
+
+def player_stats_from_events(events, squad):
+    """Count an exploded event table into one row per squad member (and anyone else with events)."""
+    counts = events.groupby(["Player", "Stat"], observed=True)["Count"].sum().unstack(fill_value=0)
+    counts.index = counts.index.astype(object)
+    counts = counts.reindex(index=squad_with(squad, counts.index), columns=STAT_COLUMNS, fill_value=0)
+    counts = counts.fillna(0).astype("int64")
+    counts.columns.name = None
+    counts.index.name = "Player"
+    return counts.reset_index()
+
+
+def compute_player_stats(df, squad):
+    """
+    Build stats from local data:
+    - Appearances, Goals, Assists, Missed Games, Own Goals, Blue Cards, Yellow Cards, Red Cards
+    """
+    return player_stats_from_events(explode_events(df), squad)
+
+
+# Column order of the Player Statistics table in the Stats tab
+DISPLAY_COLUMNS = [
+    "Player", "Appearances", "Missed Games", "Goals",
+    "Assists", "Blue Cards", "Yellow Cards", "Red Cards", "Own Goals"
+]
+
+
+def player_stats_table(ps_df, squad):
+    """
+    Player Statistics table for the Stats tab: every squad member (zeros if
+    no stats) and anyone else in ps_df, sorted by Goals (descending) then
+    name, plus a TOTAL row.
+    """
+    table = (
+        ps_df.drop_duplicates("Player").set_index("Player")
+        .reindex(index=squad_with(squad, ps_df["Player"]), columns=DISPLAY_COLUMNS[1:])
+        .fillna(0)
+        .astype("int64")
+    )
+    table.index.name = "Player"
+    table = table.reset_index().sort_values(by=["Goals", "Player"], ascending=[False, True])
+    table = table.reset_index(drop=True)
+
+    totals = table[DISPLAY_COLUMNS[1:]].sum().to_dict()
+    totals["Player"] = "TOTAL"
+    return pd.concat([table, pd.DataFrame([totals])[DISPLAY_COLUMNS]], ignore_index=True)
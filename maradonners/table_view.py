@@ -0,0 +1,148 @@
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .config import OUR_TEAM
+
+# --------------------------------------------------------------------
+#          SERVER-SIDE FILTER, SORT & PAGINATION FOR TABLES
+# --------------------------------------------------------------------
+# st.dataframe serializes every row it is given to the browser, so the
+# Match History and League Match Results views filter, sort and slice on
+# the server and only hand one page over. Text columns are dictionary
+# encoded (categoricals, or factorized on the fly): a filter, a sort key
+# or the 🔥 highlight is computed once per distinct value and taken back
+# to the rows by code, never row by row.
+
+PAGE_SIZES = (25, 50, 100)
+DATE_FORMAT = "%d/%m/%Y"
+
+Page = namedtuple("Page", ["number", "pages", "first", "last", "total"])
+
+
+def _encode(series):
+    """(codes, distinct values as an object Series); code -1 is missing."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), pd.Series(series.cat.categories, dtype=object)
+    codes, uniques = pd.factorize(series.to_numpy(dtype=object))
+    return codes, pd.Series(uniques, dtype=object)
+
+
+def _by_value(series, func, missing):
+    """func(distinct values) -> one result per row; `missing` where the value is null."""
+    codes, distinct = _encode(series)
+    values = np.asarray(func(distinct))
+    if len(values) == 0:
+        return np.full(len(codes), missing)
+    return np.where(codes >= 0, values[np.maximum(codes, 0)], missing)
+
+
+def _parse_day_first(distinct):
+    """
+    "dd/mm/YYYY" strings -> datetime64. pandas' strptime path costs ~5 µs
+    a date; the same text rearranged to ISO goes through its C parser, so
+    only strings that are not exactly dd/mm/YYYY take the slow path.
+    """
+    text = distinct.astype(str)
+    iso = text.str.slice(6, 10) + "-" + text.str.slice(3, 5) + "-" + text.str.slice(0, 2)
+    exact = text.str.fullmatch(r"\d{2}/\d{2}/\d{4}")
+    dates = pd.to_datetime(iso.where(exact), format="%Y-%m-%d", errors="coerce")
+    if (~exact).any():
+        dates[~exact] = pd.to_datetime(text[~exact], format=DATE_FORMAT, errors="coerce")
+    return dates.to_numpy(dtype="datetime64[ns]")
+
+
+def parse_dates(series):
+    """Dates as datetime64 (NaT if unparseable); "dd/mm/YYYY" text is parsed once per distinct date."""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series.to_numpy(dtype="datetime64[ns]")
+    return _by_value(series, _parse_day_first, np.datetime64("NaT", "ns")).astype("datetime64[ns]")
+
+
+def in_date_range(series, start=None, end=None):
+    """Mask of rows dated start..end (inclusive); everything when both are None."""
+    if start is None and end is None:
+        return np.ones(len(series), dtype=bool)
+    dates = parse_dates(series)
+    mask = ~np.isnat(dates)
+    if start is not None:
+        mask &= dates >= np.datetime64(pd.Timestamp(start).normalize(), "ns")
+    if end is not None:
+        mask &= dates < np.datetime64(pd.Timestamp(end).normalize() + pd.Timedelta(days=1), "ns")
+    return mask
+
+
+def equals(series, value):
+    return _by_value(series, lambda d: (d == value).to_numpy(), False).astype(bool)
+
+
+def lists_name(series, name):
+    """Rows whose "A, B (2), C" list names `name` (with or without a count)."""
+    pattern = r"(?:^|, )" + re.escape(name) + r"(?: \(\d+\))?(?:,|$)"
+    return _by_value(series, lambda d: d.astype(str).str.contains(pattern, regex=True).to_numpy(), False).astype(bool)
+
+
+def match_filter(df, opponent=None, player=None, start=None, end=None):
+    """Mask over the local match table: opponent, a player who played, and a date range."""
+    mask = in_date_range(df["Date"], start, end)
+    if opponent:
+        mask &= equals(df["Opposition"], opponent)
+    if player:
+        mask &= lists_name(df["Players"], player)
+    return mask
+
+
+def results_filter(results, team=None, start=None, end=None):
+    """Mask over the league fixtures: a team (home or away) and a date range."""
+    mask = in_date_range(results["Date"], start, end)
+    if team:
+        mask &= equals(results["Home Team"], team) | equals(results["Away Team"], team)
+    return mask
+
+
+def sort_key(series):
+    """Numeric key that orders a column: dates chronologically, text alphabetically."""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype) or series.name == "Date":
+        dates = parse_dates(series)
+        return np.where(np.isnat(dates), np.nan, dates.view("int64").astype("float64"))
+    if pd.api.types.is_numeric_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+        return pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    ranks = lambda d: np.unique(d.map(str).to_numpy(dtype=str), return_inverse=True)[1]  # noqa: E731
+    return _by_value(series, ranks, np.nan).astype("float64")
+
+
+def paginate(df, mask=None, sort_by=None, descending=False, page=1, page_size=PAGE_SIZES[0]):
+    """
+    (rows of one page, Page). Rows are filtered by `mask`, stably sorted
+    by `sort_by` (missing values last) and only the requested page is
+    taken from `df`. `page` is clamped to the pages that exist.
+    """
+    rows = np.arange(len(df)) if mask is None else np.flatnonzero(mask)
+    if sort_by is not None and len(rows):
+        key = sort_key(df[sort_by])[rows]
+        key = np.where(np.isnan(key), np.inf, -key if descending else key)
+        rows = rows[np.argsort(key, kind="stable")]
+
+    total = len(rows)
+    pages = max(1, -(-total // page_size))
+    page = min(max(1, int(page)), pages)
+    first = (page - 1) * page_size
+    view = df.iloc[rows[first:first + page_size]]
+    # A sliced categorical still carries every category; don't ship them all
+    categorical = [c for c in view.columns if isinstance(view[c].dtype, pd.CategoricalDtype)]
+    if categorical:
+        view = view.assign(**{c: view[c].cat.remove_unused_categories() for c in categorical})
+    return view, Page(page, pages, first + 1 if total else 0, first + len(view), total)
+
+
+def highlight_team(series, team=OUR_TEAM):
+    """"🔥Team🔥" for names containing `team`, decided once per distinct name."""
+    mark = lambda name: f"🔥{name}🔥" if team in str(name) else name  # noqa: E731
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.rename_categories([mark(c) for c in series.cat.categories])
+    codes, distinct = _encode(series)
+    marked = distinct.map(mark).to_numpy(dtype=object)
+    values = np.where(codes >= 0, marked[np.maximum(codes, 0)] if len(marked) else None, None)
+    return pd.Series(values, index=series.index, name=series.name, dtype=object)
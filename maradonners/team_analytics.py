@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------------------------
+#                  VECTORIZED TEAM ANALYTICS
+# --------------------------------------------------------------------
+# Everything is derived from two typed goal arrays taken from the match
+# table once (the caller's DataFrame is never modified or copied):
+# totals, points, win rate and clean sheets, rolling form over the last
+# N games, longest win / unbeaten / scoreless streaks, and cumulative
+# points and goal difference by date.
+
+EMPTY_METRICS = {
+    "Total Games": 0,
+    "Total Goals Scored": 0,
+    "Total Goals Conceded": 0,
+    "Total Points": 0,
+    "Avg Goals Scored": 0,
+    "Avg Goals Conceded": 0,
+    "Win Rate": 0,
+    "Clean Sheets": 0
+}
+
+RESULT_LETTERS = np.array(["L", "D", "W"])
+
+
+def goal_arrays(df):
+    """Goals for/against as int64 arrays (missing values count as 0)."""
+    scored = pd.to_numeric(df["Goals Scored"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    conceded = pd.to_numeric(df["Goals Conceded"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    return (
+        np.nan_to_num(scored, nan=0.0).astype(np.int64),
+        np.nan_to_num(conceded, nan=0.0).astype(np.int64),
+    )
+
+
+def date_order(df):
+    """Stable chronological order of the matches (unparseable dates last)."""
+    if "Date" not in df.columns:
+        return np.arange(len(df)), pd.Series(pd.NaT, index=df.index)
+    dates = pd.to_datetime(df["Date"], format="%d/%m/%Y", errors="coerce")
+    keys = dates.to_numpy(dtype="datetime64[ns]").view("int64").copy()
+    keys[dates.isna().to_numpy()] = np.iinfo(np.int64).max
+    return np.argsort(keys, kind="stable"), dates
+
+
+def longest_run(mask):
+    """Length of the longest run of True values in a boolean array."""
+    if mask.size == 0:
+        return 0
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return int((edges[1::2] - edges[::2]).max()) if edges.size else 0
+
+
+def current_run(mask):
+    """Length of the run of True values at the end of the array."""
+    misses = np.flatnonzero(~mask)
+    return int(mask.size - misses[-1] - 1) if misses.size else int(mask.size)
+
+
+def metrics_from_arrays(scored, conceded):
+    total_games = scored.size
+    if total_games == 0:
+        return dict(EMPTY_METRICS)
+
+    wins = scored > conceded
+    draws = scored == conceded
+    total_scored = int(scored.sum())
+    total_conceded = int(conceded.sum())
+
+    return {
+        "Total Games": int(total_games),
+        "Total Goals Scored": total_scored,
+        "Total Goals Conceded": total_conceded,
+        "Total Points": int(3 * wins.sum() + draws.sum()),
+        "Avg Goals Scored": round(total_scored / total_games, 2),
+        "Avg Goals Conceded": round(total_conceded / total_games, 2),
+        "Win Rate": round(float(wins.sum()) / total_games * 100, 2),  # Convert to %
+        "Clean Sheets": int((conceded == 0).sum())
+    }
+
+
+def compute_team_metrics(df):
+    """
+    Compute team performance metrics from match data.
+    """
+    if df.empty:
+        return dict(EMPTY_METRICS)
+    return metrics_from_arrays(*goal_arrays(df))
+
+
+def team_analytics(df, form_window=5):
+    """
+    All team analytics in one pass over the goal arrays:
+      metrics     same dict as compute_team_metrics()
+      form        last `form_window` results, oldest first ("WDLWW")
+      form_points points from those games
+      streaks     longest and current win / unbeaten / scoreless runs
+      series      per-match DataFrame in date order with rolling form
+                  points and cumulative points and goal difference
+    """
+    scored, conceded = goal_arrays(df)
+    order, dates = date_order(df)
+    scored, conceded = scored[order], conceded[order]
+
+    outcome = np.sign(scored - conceded) + 1  # 0 loss, 1 draw, 2 win
+    points = np.array([0, 1, 3], dtype=np.int64)[outcome]
+    goal_diff = scored - conceded
+
+    cum_points = np.cumsum(points)
+    # Rolling sum via the cumulative sum: points[i-w+1..i] = cum[i] - cum[i-w]
+    lagged = np.concatenate((np.zeros(form_window, dtype=np.int64), cum_points))[:cum_points.size]
+    window_points = cum_points - lagged
+
+    wins, unbeaten, scoreless = outcome == 2, outcome >= 1, scored == 0
+    letters = RESULT_LETTERS[outcome]
+
+    series = pd.DataFrame({
+        "Date": dates.to_numpy()[order],
+        "Opposition": df["Opposition"].to_numpy()[order] if "Opposition" in df.columns else "",
+        "Goals Scored": scored,
+        "Goals Conceded": conceded,
+        "Result": letters,
+        "Points": points,
+        f"Form Points (last {form_window})": window_points,
+        "Cumulative Points": cum_points,
+        "Cumulative Goal Difference": np.cumsum(goal_diff),
+    })
+
+    return {
+        "metrics": metrics_from_arrays(scored, conceded),
+        "form": "".join(letters[-form_window:]) if form_window else "",
+        "form_points": int(points[-form_window:].sum()) if form_window else 0,
+        "streaks": {
+            "Longest Win Streak": longest_run(wins),
+            "Longest Unbeaten Streak": longest_run(unbeaten),
+            "Longest Scoreless Streak": longest_run(scoreless),
+            "Current Win Streak": current_run(wins),
+            "Current Unbeaten Streak": current_run(unbeaten),
+        },
+        "series": series,
+    }